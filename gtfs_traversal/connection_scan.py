@@ -0,0 +1,106 @@
+import math
+from array import array
+from bisect import bisect_left
+
+
+class ConnectionScan:
+    def __init__(self, trip_schedules, timetable):
+        # Every pair of consecutive stops along every trip is a connection.  Connections are stored in parallel
+        #  arrays sorted by departure time, with stops and trips replaced by their indices.
+        self._stops = []
+        self._stop_indices = dict()
+        self._trips = list(trip_schedules.keys())
+
+        connections = []
+        for trip_index, (trip_id, trip_info) in enumerate(trip_schedules.items()):
+            departure_seconds = timetable.trip_departure_seconds(trip_id)
+            stop_indices = [self._stop_index(trip_info.tripStops[str(stop_number)].stopId)
+                            for stop_number in range(1, len(departure_seconds) + 1)]
+            for stop_number in range(1, len(departure_seconds)):
+                connections.append((departure_seconds[stop_number - 1], departure_seconds[stop_number], trip_index,
+                                    stop_indices[stop_number - 1], stop_indices[stop_number]))
+        connections.sort()
+
+        self._departures = array('i', (connection[0] for connection in connections))
+        self._arrivals = array('i', (connection[1] for connection in connections))
+        self._trip_indices = array('i', (connection[2] for connection in connections))
+        self._departure_stops = array('i', (connection[3] for connection in connections))
+        self._arrival_stops = array('i', (connection[4] for connection in connections))
+
+    def __len__(self):
+        return len(self._departures)
+
+    def connections(self, *, reverse=False):
+        # Yields (departure seconds, arrival seconds, trip id, departure stop, arrival stop) for every connection, in
+        #  order of departure time
+        indices = range(len(self._departures) - 1, -1, -1) if reverse else range(len(self._departures))
+        for index in indices:
+            yield (self._departures[index], self._arrivals[index], self._trips[self._trip_indices[index]],
+                   self._stops[self._departure_stops[index]], self._stops[self._arrival_stops[index]])
+
+    def earliest_arrivals(self, origin, departure_seconds, *, transfer_seconds=0, footpaths=None):
+        # Returns the earliest arrival, in seconds since midnight, at every stop reachable from origin when leaving at
+        #  departure_seconds, with one scan of the connections departing after then.  As in the solver, changing
+        #  trips at a stop takes transfer_seconds, and so does boarding after a walk.  Walks may start at the origin
+        #  or after a transfer, and may not follow another walk.  footpaths maps stops to (stop, walk seconds) pairs.
+        return self._earliest_arrivals(origin, departure_seconds, bisect_left(self._departures, departure_seconds),
+                                       transfer_seconds, footpaths or {})
+
+    def earliest_arrivals_from(self, origins, departure_seconds, *, transfer_seconds=0, footpaths=None):
+        # Returns earliest_arrivals for each of origins, all leaving at departure_seconds
+        first_connection = bisect_left(self._departures, departure_seconds)
+        return {
+            origin: self._earliest_arrivals(origin, departure_seconds, first_connection, transfer_seconds,
+                                            footpaths or {})
+            for origin in origins
+        }
+
+    def _earliest_arrivals(self, origin, departure_seconds, first_connection, transfer_seconds, footpaths):
+        earliest_arrivals = {origin: departure_seconds}
+
+        # A stop's ready time is the earliest time at which a trip departing from it can be boarded
+        ready_times = [math.inf] * len(self._stops)
+        if origin in self._stop_indices:
+            ready_times[self._stop_indices[origin]] = departure_seconds
+        self._walk(origin, departure_seconds, transfer_seconds, footpaths, earliest_arrivals, ready_times)
+
+        boarded_trips = bytearray(len(self._trips))
+        departures = self._departures
+        arrivals = self._arrivals
+        trip_indices = self._trip_indices
+        departure_stops = self._departure_stops
+        arrival_stops = self._arrival_stops
+        for index in range(first_connection, len(departures)):
+            trip_index = trip_indices[index]
+            if not boarded_trips[trip_index]:
+                if ready_times[departure_stops[index]] > departures[index]:
+                    continue
+                boarded_trips[trip_index] = 1
+
+            arrival = arrivals[index]
+            stop = self._stops[arrival_stops[index]]
+            if arrival >= earliest_arrivals.get(stop, math.inf):
+                continue
+
+            self._reach(stop, arrival, arrival + transfer_seconds, earliest_arrivals, ready_times)
+            self._walk(stop, arrival + transfer_seconds, transfer_seconds, footpaths, earliest_arrivals, ready_times)
+
+        return earliest_arrivals
+
+    def _reach(self, stop, arrival, ready_time, earliest_arrivals, ready_times):
+        if arrival < earliest_arrivals.get(stop, math.inf):
+            earliest_arrivals[stop] = arrival
+        if stop in self._stop_indices:
+            stop_index = self._stop_indices[stop]
+            ready_times[stop_index] = min(ready_times[stop_index], ready_time)
+
+    def _stop_index(self, stop):
+        if stop not in self._stop_indices:
+            self._stop_indices[stop] = len(self._stops)
+            self._stops.append(stop)
+        return self._stop_indices[stop]
+
+    def _walk(self, stop, walk_start, transfer_seconds, footpaths, earliest_arrivals, ready_times):
+        for walking_stop, walk_seconds in footpaths.get(stop, []):
+            self._reach(walking_stop, walk_start + walk_seconds, walk_start + walk_seconds + transfer_seconds,
+                        earliest_arrivals, ready_times)
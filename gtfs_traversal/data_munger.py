@@ -1,54 +1,79 @@
+from bisect import bisect_left
+from array import array
 from datetime import datetime, timedelta
 
+from gtfs_traversal.connection_scan import ConnectionScan
+from gtfs_traversal.lru_cache import LruCache
+from gtfs_traversal.route_network import RouteNetwork
+from gtfs_traversal.timetable import Timetable
+
+
+TRIP_TIME_CACHE_SIZE = 100000
+
 
 class DataMunger:
-    def __init__(self, end_date, route_types_to_solve, stops_to_solve, data, stop_join_string):
+    def __init__(self, end_date, route_types_to_solve, stops_to_solve, data, stop_join_string,
+                 trip_time_cache_size=TRIP_TIME_CACHE_SIZE, timetable=None, route_network=None):
         self.data = data
         self.stop_join_string = stop_join_string
 
         self._buffered_analysis_end_time = None
+        self._connection_scan = None
+        self._departures_by_route_stop = {}
         self._end_date = end_date
-        self._location_routes = None
+        self._minimum_route_legs = None
         self._minimum_stop_times = None
+        self._minimum_times_at_stops = None
+        self._minimum_times_at_stops_start_time = None
         self._route_list = None
+        # Likewise for a route network compiled for the same routes and stops to solve
+        self._route_network = route_network
         self._route_types_to_solve = route_types_to_solve
+        self._stop_ids_by_route_stop_number = None
+        self._stop_numbers_by_stop_route = None
         self._stops_by_route_in_solution_set = None
+        self._stops_timed_by_stop = None
+        # A timetable compiled ahead of time, such as one loaded from a cache, saves compiling it again
+        self._timetable = timetable
         self._transfer_stops = None
-        self._trip_time_cache = {}
+        # Departure datetimes are cached by the midnight they are counted from and their seconds after it, so entries
+        #  are shared by every search that departs on the same day
+        self._trip_time_cache = LruCache(trip_time_cache_size)
         self._unique_routes_to_solve = None
         self._unique_stops_to_solve = stops_to_solve
 
     def first_trip_after(self, earliest_departure_time, route_number, origin_stop_id):
         # hmmm, what is earliest_departure_time, and what if it's after midnight toward the end of the service day?
 
+        # Routes that visit one stop multiple times in a trip depart from the first visit here.  To depart from a
+        #  later visit, call first_trip_after_stop_number with one of get_stop_numbers_from_stop_id.
+        origin_stop_number = self.get_stop_number_from_stop_id(origin_stop_id, route_number)
+        return self.first_trip_after_stop_number(earliest_departure_time, route_number, origin_stop_number)
+
+    def first_trip_after_stop_number(self, earliest_departure_time, route_number, origin_stop_number):
         # handle case where the origin stop is the last stop on the route
-        if self.is_last_stop_on_route(origin_stop_id, route_number):
+        if self.is_last_stop_number_on_route(origin_stop_number, route_number):
             return None, None
 
-        # GTFS uses days longer than 24 hours, so need to add a buffer to the end date to allow 25+ hour trips
-        latest_departure_time = self.get_buffered_analysis_end_time()
+        departure_seconds, trip_ids = self.get_departures_from_stop(route_number, origin_stop_number)
 
-        origin_stop_number = self.get_stop_number_from_stop_id(origin_stop_id, route_number)
+        date_at_midnight = datetime(year=earliest_departure_time.year, month=earliest_departure_time.month,
+                                    day=earliest_departure_time.day)
+        earliest_departure_seconds = (earliest_departure_time - date_at_midnight).total_seconds()
+        departure_index = bisect_left(departure_seconds, earliest_departure_seconds)
+        if departure_index >= len(departure_seconds):
+            return None, None
 
-        solution_trip_id = None
-        for trip_id in self.get_trips_for_route(route_number):
-            raw_departure_time = self.get_stops_for_trip(trip_id)[origin_stop_number].departureTime
-            if (earliest_departure_time, raw_departure_time) in self._trip_time_cache:
-                time = self._trip_time_cache[(earliest_departure_time, raw_departure_time)]
-            else:
-                # Currently, this function does not work on routes that visit one stop multiple times in a trip.
-                #  To fix, can pass the origin_stop_number to the function, instead of origin_stop_id
-                date_at_midnight = datetime(year=earliest_departure_time.year, month=earliest_departure_time.month,
-                                            day=earliest_departure_time.day)
-                time = self.get_datetime_from_raw_string_time(date_at_midnight, raw_departure_time)
-                self._trip_time_cache[(earliest_departure_time, raw_departure_time)] = time
-            if earliest_departure_time <= time < latest_departure_time:
-                latest_departure_time = time
-                solution_trip_id = trip_id
-
-        if solution_trip_id is None:
+        seconds = departure_seconds[departure_index]
+        time = self._trip_time_cache.get((date_at_midnight, seconds))
+        if time is None:
+            time = date_at_midnight + timedelta(seconds=seconds)
+            self._trip_time_cache.put((date_at_midnight, seconds), time)
+
+        # GTFS uses days longer than 24 hours, so need to add a buffer to the end date to allow 25+ hour trips
+        if time >= self.get_buffered_analysis_end_time():
             return None, None
-        return latest_departure_time, solution_trip_id
+        return time, trip_ids[departure_index]
 
     def get_all_stop_coordinates(self):
         return self.data.stopLocations
@@ -59,9 +84,49 @@ class DataMunger:
 
         return self._buffered_analysis_end_time
 
+    def get_connection_scan(self):
+        if self._connection_scan is None:
+            self._connection_scan = ConnectionScan(self.get_trip_schedules(), self.get_timetable())
+
+        return self._connection_scan
+
     def get_datetime_from_raw_string_time(self, date_at_midnight, time_string):
         return date_at_midnight + timedelta(seconds=self.convert_to_seconds_since_midnight(time_string))
 
+    def get_departures_from_stop(self, route_id, stop_number):
+        if (route_id, stop_number) in self._departures_by_route_stop:
+            return self._departures_by_route_stop[(route_id, stop_number)]
+
+        timetable = self.get_timetable()
+        # The sort is stable, so departures at the same time keep the order of the route's trips.
+        departures = sorted(((timetable.departure_seconds(trip_id, stop_number), trip_id)
+                             for trip_id in self.get_trips_for_route(route_id)),
+                            key=lambda departure: departure[0])
+        departure_seconds = array('i', (departure[0] for departure in departures))
+        trip_ids = tuple(departure[1] for departure in departures)
+
+        self._departures_by_route_stop[(route_id, stop_number)] = departure_seconds, trip_ids
+        return self._departures_by_route_stop[(route_id, stop_number)]
+
+    def get_minimum_route_legs(self):
+        # Maps each route to {(stop, next stop): the fastest time any of the route's trips takes between them}
+        if self._minimum_route_legs is None:
+            timetable = self.get_timetable()
+            minimum_route_legs = {}
+            for route_id in self.get_route_trips().keys():
+                legs = {}
+                for trip_id in self.get_trips_for_route(route_id):
+                    trip_stops = self.get_stops_for_trip(trip_id)
+                    departure_seconds = timetable.trip_departure_seconds(trip_id)
+                    for stop_number in range(1, len(departure_seconds)):
+                        leg = (trip_stops[str(stop_number)].stopId, trip_stops[str(stop_number + 1)].stopId)
+                        seconds = departure_seconds[stop_number] - departure_seconds[stop_number - 1]
+                        legs[leg] = min(legs.get(leg, seconds), seconds)
+                minimum_route_legs[route_id] = legs
+            self._minimum_route_legs = minimum_route_legs
+
+        return self._minimum_route_legs
+
     def get_minimum_stop_times(self, start_time):
         if self._minimum_stop_times is not None:
             return self._minimum_stop_times
@@ -70,11 +135,7 @@ class DataMunger:
         # minimum_stop_times is a dictionary where keys are stops and values are half of the minimum amount of time
         #  required to travel either to or from that stop from another solution stop
         for stop in self.get_unique_stops_to_solve():
-            routes_at_stop = self.get_routes_at_stop(stop)
-            for route in routes_at_stop:
-                if route not in self.get_unique_routes_to_solve():
-                    continue
-
+            for route in self.get_solution_routes_at_stop(stop):
                 # Currently, this function does not support the situation where one trip visits the same stop
                 #  multiple times.
                 # Currently, this function assumes that the first trip of the day along each route is the fastest.
@@ -83,10 +144,9 @@ class DataMunger:
                     continue
                 stop_number = self.get_stop_number_from_stop_id(stop, route)
                 next_stop_number = str(int(stop_number) + 1)
-                if next_stop_number not in self.get_stops_for_route(route):
+                next_stop = self.get_stop_id_from_stop_number(next_stop_number, route)
+                if next_stop is None:
                     continue
-                stops_on_route = self.get_stops_for_route(route)
-                next_stop = stops_on_route[next_stop_number].stopId
                 travel_time_to_next_stop = self.get_travel_time_between_stops_in_seconds(
                     best_trip_id, stop_number, next_stop_number)
                 if next_stop not in minimum_stop_times:
@@ -100,74 +160,75 @@ class DataMunger:
         return self._minimum_stop_times
 
     def get_minimum_remaining_time(self, unvisited_stops, start_time):
-        total_minimum_remaining_time = 0
-        for stop in unvisited_stops:
-            routes_at_stop = self.get_routes_at_stop(stop)
-            best_time_at_stop = 24 * 60 * 60
-            for route in routes_at_stop:
-                if route not in self.get_unique_routes_to_solve():
-                    continue
+        unvisited_stops = set(unvisited_stops)
+        return sum(self.get_minimum_time_at_stop(stop, unvisited_stops.__contains__, start_time)
+                   for stop in unvisited_stops)
 
-                if self.is_last_stop_on_route(stop, route):
-                    stop_number = self.get_stop_number_from_stop_id(stop, route)
-                    previous_stop_number = str(int(stop_number) - 1)
-                    stops_on_route = self.get_stops_for_route(route)
-                    previous_stop = stops_on_route[previous_stop_number].stopId
-                    best_departure_time, best_trip_id = self.first_trip_after(start_time, route, previous_stop)
-                else:
-                    best_departure_time, best_trip_id = self.first_trip_after(start_time, route, stop)
+    def get_minimum_remaining_time_after_visiting(self, minimum_remaining_time, visited_stops, is_unvisited,
+                                                  start_time):
+        # minimum_remaining_time is the minimum remaining time from before visited_stops were visited.  Only the
+        #  visited stops and the unvisited stops next to them along solution routes contribute differently now.
+        visited_stops = set(visited_stops)
 
-                if best_trip_id is None:
-                    continue
+        def was_unvisited(stop):
+            return stop in visited_stops or is_unvisited(stop)
 
-                stop_number = self.get_stop_number_from_stop_id(stop, route)
-                next_stop_number = str(int(stop_number) + 1)
-                previous_stop_number = str(int(stop_number) - 1)
-                stops_on_route = self.get_stops_for_route(route)
-
-                if next_stop_number in self.get_stops_for_route(route):
-                    travel_time_to_next_stop = self.get_travel_time_between_stops_in_seconds(
-                        best_trip_id, stop_number, next_stop_number)
-                    if stops_on_route[next_stop_number].stopId in unvisited_stops:
-                        best_time_at_stop = min(best_time_at_stop, travel_time_to_next_stop / 2)
-                    else:
-                        best_time_at_stop = min(best_time_at_stop, travel_time_to_next_stop)
-
-                if previous_stop_number in self.get_stops_for_route(route):
-                    travel_time_from_previous_stop = self.get_travel_time_between_stops_in_seconds(
-                        best_trip_id, previous_stop_number, stop_number)
-                    if stops_on_route[previous_stop_number].stopId in unvisited_stops:
-                        best_time_at_stop = min(best_time_at_stop, travel_time_from_previous_stop / 2)
-                    else:
-                        best_time_at_stop = min(best_time_at_stop, travel_time_from_previous_stop)
-            total_minimum_remaining_time += best_time_at_stop
-        return total_minimum_remaining_time
+        for stop in visited_stops:
+            minimum_remaining_time -= self.get_minimum_time_at_stop(stop, was_unvisited, start_time)
+
+        neighbors = {neighbor for stop in visited_stops for neighbor in self.get_stops_timed_by_stop(stop, start_time)
+                     if is_unvisited(neighbor)}
+        for neighbor in neighbors:
+            minimum_remaining_time += self.get_minimum_time_at_stop(neighbor, is_unvisited, start_time) - \
+                self.get_minimum_time_at_stop(neighbor, was_unvisited, start_time)
+        return minimum_remaining_time
 
     def get_minimum_remaining_transfers(self, current_route, unvisited_stops):
-        minimum_remaining_transfers = 0
-        routes_accounted_for = set()
-        for stop in unvisited_stops:
-            routes_at_stop = self.get_routes_at_stop(stop)
-            solution_routes_at_stop = [s for s in routes_at_stop if s in self.get_unique_routes_to_solve()]
-            if len(solution_routes_at_stop) > 1:
-                continue
-            route = solution_routes_at_stop[0]
-            if route in routes_accounted_for:
-                continue
-            minimum_remaining_transfers += 1
-            routes_accounted_for.add(route)
-        if current_route in routes_accounted_for:
+        unvisited_stops = set(unvisited_stops)
+        minimum_remaining_transfers = self.get_num_single_solution_routes(unvisited_stops)
+        if self.is_single_solution_route_unvisited(current_route, unvisited_stops.__contains__):
             minimum_remaining_transfers -= 1
         return max(0, minimum_remaining_transfers)
 
-    def get_next_stop_id(self, stop_id, route):
-        if self.is_last_stop_on_route(stop_id, route):
-            return None
+    def get_minimum_time_at_stop(self, stop, is_unvisited, start_time):
+        # A stop takes at least as long to visit as the fastest ride to or from it along a solution route, and half as
+        #  long if the other end of that ride is also unvisited
+        minimum_time, solution_neighbors = self.get_minimum_times_at_stops(start_time).get(stop, None) or \
+            self._find_minimum_times_at_stop(stop, start_time)
+        for neighbor, travel_time in solution_neighbors:
+            minimum_time = min(minimum_time, travel_time / 2 if is_unvisited(neighbor) else travel_time)
+        return minimum_time
+
+    def get_minimum_times_at_stops(self, start_time):
+        # Maps each solution stop to the fastest ride to or from any stop that is not a solution stop, and to the
+        #  (stop, seconds) fastest rides to or from solution stops, for the first trips after start_time
+        if self._minimum_times_at_stops_start_time != start_time:
+            self._minimum_times_at_stops = {stop: self._find_minimum_times_at_stop(stop, start_time)
+                                            for stop in self.get_unique_stops_to_solve()}
+            self._minimum_times_at_stops_start_time = start_time
+            self._stops_timed_by_stop = dict()
+            for stop, (_, solution_neighbors) in self._minimum_times_at_stops.items():
+                for neighbor, _ in solution_neighbors:
+                    if neighbor not in self._stops_timed_by_stop:
+                        self._stops_timed_by_stop[neighbor] = set()
+                    self._stops_timed_by_stop[neighbor].add(stop)
+
+        return self._minimum_times_at_stops
+
+    def get_num_single_solution_routes(self, unvisited_stops):
+        # Each route that is the only solution route at an unvisited stop must be transferred to
+        single_solution_routes = self.get_single_solution_routes()
+        return len({single_solution_routes[stop] for stop in unvisited_stops if stop in single_solution_routes})
+
+    def get_num_single_solution_routes_after_visiting(self, num_single_solution_routes, visited_stops, is_unvisited):
+        # num_single_solution_routes is get_num_single_solution_routes from before visited_stops were visited
+        single_solution_routes = self.get_single_solution_routes()
+        visited_routes = {single_solution_routes[stop] for stop in visited_stops if stop in single_solution_routes}
+        return num_single_solution_routes - sum(1 for route in visited_routes
+                                                if not self.is_single_solution_route_unvisited(route, is_unvisited))
 
-        stop_number = self.get_stop_number_from_stop_id(stop_id, route)
-        next_stop_number = str(int(stop_number) + 1)
-        stops_on_route = self.get_stops_for_route(route)
-        return stops_on_route[next_stop_number].stopId
+    def get_next_stop_id(self, stop_id, route):
+        return self.get_route_network().next_stop(stop_id, route)
 
     def get_off_course_stop_locations(self):
         return {s: l for s, l in self.get_all_stop_coordinates().items() if s not in self.get_unique_stops_to_solve()}
@@ -184,47 +245,74 @@ class DataMunger:
 
         return self._route_list
 
-    def get_routes_at_stop(self, stop_id):
-        return self.get_routes_by_stop()[stop_id]
+    def get_route_network(self):
+        if self._route_network is None:
+            route_stops = {
+                route_id: [stop.stopId for _, stop in sorted(self.get_stops_for_route(route_id).items(),
+                                                             key=lambda item: int(item[0]))]
+                for route_id in self.get_route_trips().keys()
+            }
+            self._route_network = RouteNetwork(route_stops, self.get_unique_routes_to_solve(),
+                                               self.get_unique_stops_to_solve())
+
+        return self._route_network
 
-    def get_routes_by_stop(self):
-        if self._location_routes is not None:
-            return self._location_routes
+    def get_routes_at_stop(self, stop_id):
+        return self.get_route_network().routes_at_stop(stop_id)
 
-        location_routes = {}
-        for route_id, info in self.get_route_trips().items():
-            trip_id = info.tripIds[0]
-            stops = self.get_trip_schedules()[trip_id].tripStops
-            for stop, stop_info in stops.items():
-                if stop_info.stopId not in location_routes:
-                    location_routes[stop_info.stopId] = set()
-                location_routes[stop_info.stopId].add(route_id)
+    def get_single_solution_route_stops(self):
+        return self.get_route_network().single_solution_route_stops()
 
-        self._location_routes = location_routes
-        return location_routes
+    def get_single_solution_routes(self):
+        return self.get_route_network().single_solution_routes()
 
     def get_solution_routes_at_stop(self, stop_id):
-        routes_at_stop = self.get_routes_at_stop(stop_id)
-        return {route for route in routes_at_stop if route in self.get_unique_routes_to_solve()}
+        return self.get_route_network().solution_routes_at_stop(stop_id)
 
     def get_stop_locations_to_solve(self):
         return {s: l for s, l in self.get_all_stop_coordinates().items() if s in self.get_unique_stops_to_solve()}
 
+    def get_stop_id_from_stop_number(self, stop_number, route_id):
+        return self.get_stop_ids_by_route_stop_number().get((route_id, stop_number), None)
+
+    def get_stop_ids_by_route_stop_number(self):
+        if self._stop_ids_by_route_stop_number is not None:
+            return self._stop_ids_by_route_stop_number
+
+        stop_ids_by_route_stop_number = {}
+        for route_id in self.get_route_trips().keys():
+            for stop_number, stop_departure_namedtuple in self.get_stops_for_route(route_id).items():
+                stop_ids_by_route_stop_number[(route_id, stop_number)] = stop_departure_namedtuple.stopId
+
+        self._stop_ids_by_route_stop_number = stop_ids_by_route_stop_number
+        return self._stop_ids_by_route_stop_number
+
     def get_stop_number_from_stop_id(self, stop_id, route_id):
-        stops_on_route = self.get_stops_for_route(route_id)
-        for stop_number, stop_departure_namedtuple in stops_on_route.items():
-            if stop_departure_namedtuple.stopId == stop_id:
-                return stop_number
+        return self.get_stop_numbers_from_stop_id(stop_id, route_id)[0]
 
-        raise ValueError("route_id and origin_stop_id mismatch")
+    def get_stop_numbers_by_stop_route(self):
+        if self._stop_numbers_by_stop_route is not None:
+            return self._stop_numbers_by_stop_route
+
+        # Values are tuples, in trip order, so that routes visiting a stop more than once keep every visit.
+        stop_numbers_by_stop_route = {}
+        for (route_id, stop_number), stop_id in sorted(self.get_stop_ids_by_route_stop_number().items(),
+                                                       key=lambda item: int(item[0][1])):
+            stop_numbers_by_stop_route[(stop_id, route_id)] = \
+                stop_numbers_by_stop_route.get((stop_id, route_id), tuple()) + (stop_number,)
+
+        self._stop_numbers_by_stop_route = stop_numbers_by_stop_route
+        return self._stop_numbers_by_stop_route
+
+    def get_stop_numbers_from_stop_id(self, stop_id, route_id):
+        stop_numbers = self.get_stop_numbers_by_stop_route().get((stop_id, route_id), None)
+        if stop_numbers is None:
+            raise ValueError("route_id and origin_stop_id mismatch")
+
+        return stop_numbers
 
     def get_stops_at_ends_of_solution_routes(self):
-        stops_at_ends_of_solution_routes = set()
-        for r in self.get_unique_routes_to_solve():
-            trip_stops = self.get_stops_for_route(r)
-            stops_at_ends_of_solution_routes.add(trip_stops['1'].stopId)
-            stops_at_ends_of_solution_routes.add(trip_stops[str(len(trip_stops))].stopId)
-        return stops_at_ends_of_solution_routes
+        return self.get_route_network().stops_at_ends_of_solution_routes()
 
     def get_stops_by_route_in_solution_set(self):
         if self._stops_by_route_in_solution_set is not None:
@@ -233,9 +321,7 @@ class DataMunger:
         route_stops = {}
 
         for stop in self.get_unique_stops_to_solve():
-            for route in self.get_routes_at_stop(stop):
-                if route not in self.get_unique_routes_to_solve():
-                    continue
+            for route in self.get_solution_routes_at_stop(stop):
                 if route not in route_stops:
                     route_stops[route] = set()
                 route_stops[route].add(stop)
@@ -243,12 +329,23 @@ class DataMunger:
         self._stops_by_route_in_solution_set = route_stops
         return self._stops_by_route_in_solution_set
 
+    def get_stops_timed_by_stop(self, stop, start_time):
+        # Returns the solution stops whose minimum times depend on whether stop is unvisited
+        self.get_minimum_times_at_stops(start_time)
+        return self._stops_timed_by_stop.get(stop, ())
+
     def get_stops_for_route(self, route_id):
         return self.get_stops_for_trip(self.get_trips_for_route(route_id)[0])
 
     def get_stops_for_trip(self, trip_id):
         return self.get_trip_schedules()[trip_id].tripStops
 
+    def get_timetable(self):
+        if self._timetable is None:
+            self._timetable = Timetable(self.get_trip_schedules())
+
+        return self._timetable
+
     def get_total_minimum_time(self, start_time):
         total_minimum_time = 0
         for v in self.get_minimum_stop_times(start_time).values():
@@ -278,9 +375,7 @@ class DataMunger:
                     endpoint_stops.add(stop)
                     continue
 
-                next_stop_number = str(int(stop_number) + 1)
-                stops_on_route = self.get_stops_for_route(route)
-                next_stop = stops_on_route[next_stop_number].stopId
+                next_stop = self.get_stop_id_from_stop_number(str(int(stop_number) + 1), route)
 
                 if stop not in adjacent_stops:
                     adjacent_stops[stop] = set()
@@ -325,13 +420,8 @@ class DataMunger:
         return self._transfer_stops
 
     def get_travel_time_between_stops_in_seconds(self, trip, on_stop_number, off_stop_number):
-        assert float(off_stop_number) >= float(on_stop_number), 'cannot travel backwards along trip'
-        trip_stops = self.get_stops_for_trip(trip)
-        on_time_raw = trip_stops[on_stop_number].departureTime
-        on_time_seconds_since_midnight = self.convert_to_seconds_since_midnight(on_time_raw)
-        off_time_raw = trip_stops[off_stop_number].departureTime
-        off_time_seconds_since_midnight = self.convert_to_seconds_since_midnight(off_time_raw)
-        return off_time_seconds_since_midnight - on_time_seconds_since_midnight
+        assert int(off_stop_number) >= int(on_stop_number), 'cannot travel backwards along trip'
+        return self.get_timetable().travel_time_seconds(trip, on_stop_number, off_stop_number)
 
     @staticmethod
     def convert_to_seconds_since_midnight(raw_time_string):
@@ -341,6 +431,9 @@ class DataMunger:
     def get_trip_schedules(self):
         return self.data.tripSchedules
 
+    def get_trip_time_cache_stats(self):
+        return self._trip_time_cache.stats()
+
     def get_trips_for_route(self, route_id):
         return self.get_route_trips()[route_id].tripIds
 
@@ -368,8 +461,47 @@ class DataMunger:
         return unique_stops_to_solve
 
     def is_last_stop_on_route(self, stop_id, route):
-        stop_number = self.get_stop_number_from_stop_id(stop_id, route)
-        return str(int(stop_number) + 1) not in self.get_stops_for_route(route)
+        return self.get_route_network().is_last_stop_on_route(stop_id, route)
+
+    def is_last_stop_number_on_route(self, stop_number, route):
+        return (route, str(int(stop_number) + 1)) not in self.get_stop_ids_by_route_stop_number()
+
+    def is_single_solution_route_unvisited(self, route, is_unvisited):
+        return any(is_unvisited(stop) for stop in self.get_single_solution_route_stops().get(route, ()))
 
     def is_solution_route(self, route_id):
         return route_id in self.get_unique_routes_to_solve()
+
+    def _find_minimum_times_at_stop(self, stop, start_time):
+        minimum_time = 24 * 60 * 60
+        solution_neighbors = []
+        route_network = self.get_route_network()
+        for route in route_network.solution_routes_at_stop(stop):
+            stop_number = self.get_stop_number_from_stop_id(stop, route)
+            next_stop_number = str(int(stop_number) + 1)
+            previous_stop_number = str(int(stop_number) - 1)
+            next_stop = route_network.next_stop(stop, route)
+            previous_stop = route_network.previous_stop(stop, route)
+
+            if next_stop is None:
+                best_departure_time, best_trip_id = self.first_trip_after_stop_number(
+                    start_time, route, previous_stop_number)
+            else:
+                best_departure_time, best_trip_id = self.first_trip_after_stop_number(
+                    start_time, route, stop_number)
+
+            if best_trip_id is None:
+                continue
+
+            for neighbor, on_stop_number, off_stop_number in [(next_stop, stop_number, next_stop_number),
+                                                              (previous_stop, previous_stop_number, stop_number)]:
+                if neighbor is None:
+                    continue
+                travel_time = self.get_travel_time_between_stops_in_seconds(
+                    best_trip_id, on_stop_number, off_stop_number)
+                if neighbor in self.get_unique_stops_to_solve():
+                    solution_neighbors.append((neighbor, travel_time))
+                else:
+                    minimum_time = min(minimum_time, travel_time)
+
+        return minimum_time, tuple(solution_neighbors)
@@ -1,7 +1,44 @@
 from collections import namedtuple
 
 
+CacheStats = namedtuple('CacheStats', ['hits', 'misses', 'size', 'max_size'])
+CompiledNetwork = namedtuple('CompiledNetwork', ['data', 'timetable'])
 EarthLocation = namedtuple('EarthLocation', ['lat', 'long'])
 LocationStatusInfo = namedtuple('LocationStatusInfo', ['location', 'arrival_route', 'unvisited'])
-ProgressInfo = namedtuple('ProgressInfo', ['duration', 'arrival_trip', 'trip_stop_no',
-                                           'parent', 'children', 'minimum_remaining_time', 'expanded', 'eliminated'])
+TransferInfo = namedtuple('TransferInfo', ['transfer_type', 'min_transfer_time'])
+
+
+class ProgressInfo:
+    # The solver updates a node's expanded, eliminated, parent, and children fields in place as the search proceeds,
+    #  so progress is a mutable record rather than a namedtuple.  __slots__ keeps each record small.
+    _fields = ('duration', 'arrival_trip', 'trip_stop_no',
+               'parent', 'children', 'minimum_remaining_time', 'expanded', 'eliminated')
+    __slots__ = _fields
+
+    def __init__(self, duration, arrival_trip, trip_stop_no,
+                 parent, children, minimum_remaining_time, expanded, eliminated):
+        self.duration = duration
+        self.arrival_trip = arrival_trip
+        self.trip_stop_no = trip_stop_no
+        self.parent = parent
+        self.children = children
+        self.minimum_remaining_time = minimum_remaining_time
+        self.expanded = expanded
+        self.eliminated = eliminated
+
+    def __eq__(self, other):
+        if not isinstance(other, ProgressInfo):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self._fields)
+
+    # Records change in place, so they cannot be hashed by value
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ', '.join(f'{field}={getattr(self, field)!r}' for field in self._fields)
+        return f'ProgressInfo({fields})'
+
+    def _replace(self, **kwargs):
+        values = {field: getattr(self, field) for field in self._fields}
+        values.update(kwargs)
+        return ProgressInfo(**values)
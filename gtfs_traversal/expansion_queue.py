@@ -1,5 +1,10 @@
+from gtfs_traversal.stop_bitmask import bit_count
+
+
 class ExpansionQueue:
-    def __init__(self, num_solution_stops, stop_join_string):
+    def __init__(self, num_solution_stops, stop_join_string, node_unvisited=None):
+        # Nodes are LocationStatusInfo unless node_unvisited is given to look up the unvisited stops of other nodes
+        self._node_unvisited = node_unvisited
         self._one_more_than_number_of_solution_stops = num_solution_stops + 1
         self._num_remaining_stops_to_pop = self._one_more_than_number_of_solution_stops
         self._queue = dict()
@@ -10,7 +15,7 @@ class ExpansionQueue:
             self.add_node(node)
 
     def add_node(self, node):
-        num_remaining_stops = self._num_remaining_stops(node.unvisited)
+        num_remaining_stops = self._num_remaining_stops(self._unvisited(node))
         if num_remaining_stops == 0:
             return
         if num_remaining_stops not in self._queue:
@@ -38,6 +43,10 @@ class ExpansionQueue:
         return length
 
     def _num_remaining_stops(self, stops_string):
+        # Solvers may track unvisited stops as an integer bitmask instead of a joined string
+        if isinstance(stops_string, int):
+            return bit_count(stops_string)
+
         return len(stops_string.split(self._stop_join_string)) - 2
 
     def pop(self, solver_progress_dict):
@@ -57,7 +66,7 @@ class ExpansionQueue:
             self.remove_key(key)
 
     def remove_key(self, bad_key):
-        num_stops_at_key = self._num_remaining_stops(bad_key.unvisited)
+        num_stops_at_key = self._num_remaining_stops(self._unvisited(bad_key))
 
         # pruning a node that has been expanded
         if num_stops_at_key not in self._queue:
@@ -73,3 +82,9 @@ class ExpansionQueue:
             self._num_remaining_stops_to_pop = min(self._queue.keys())
         else:
             self._num_remaining_stops_to_pop = self._one_more_than_number_of_solution_stops
+
+    def _unvisited(self, node):
+        if self._node_unvisited is None:
+            return node.unvisited
+
+        return self._node_unvisited(node)
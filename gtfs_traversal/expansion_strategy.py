@@ -0,0 +1,27 @@
+from collections import namedtuple
+
+
+# An expansion strategy decides the order in which the solver expands nodes.  When bucket_by_remaining_stops is set,
+#  nodes with the fewest remaining stops are expanded first, and key orders nodes within a bucket; otherwise, key
+#  orders all nodes.  Keys are computed from a node's ProgressInfo.
+ExpansionStrategy = namedtuple('ExpansionStrategy', ['name', 'key', 'bucket_by_remaining_stops'])
+
+
+def _duration(progress):
+    return progress.duration
+
+
+def _minimum_possible_duration(progress):
+    return progress.duration + progress.minimum_remaining_time
+
+
+def weighted_a_star(weight):
+    def weighted_minimum_possible_duration(progress):
+        return progress.duration + weight * progress.minimum_remaining_time
+
+    return ExpansionStrategy(name=f'weighted a* ({weight})', key=weighted_minimum_possible_duration,
+                             bucket_by_remaining_stops=False)
+
+
+A_STAR = ExpansionStrategy(name='a*', key=_minimum_possible_duration, bucket_by_remaining_stops=False)
+DEPTH_FIRST_BY_STOPS = ExpansionStrategy(name='depth first by stops', key=_duration, bucket_by_remaining_stops=True)
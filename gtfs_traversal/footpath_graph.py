@@ -0,0 +1,49 @@
+import math
+
+from gtfs_traversal.stop_grid import StopGrid
+from gtfs_traversal.walk_time_engine import WalkTimeEngine
+
+
+# GTFS transfer_type values that affect walking between stops
+NO_TRANSFER = 3
+
+
+class FootpathGraph:
+    def __init__(self, stop_locations, walk_speed_mph, max_walk_seconds, max_footpaths_per_stop=None, transfers=None):
+        # Each stop's footpaths are (stop, integer walk seconds) pairs, sorted by walk time.  Walk times are rounded up
+        #  so that they never understate the haversine walk time.  A transfer with a minimum transfer time replaces
+        #  the walk time between its stops, even beyond max_walk_seconds, and a transfer that is not possible removes
+        #  the footpath between its stops.  When max_footpaths_per_stop is set, only that many of the fastest
+        #  footpaths from each stop are kept.
+        grid = StopGrid(stop_locations)
+        engine = WalkTimeEngine(stop_locations, walk_speed_mph)
+        radius_miles = max_walk_seconds * walk_speed_mph / 3600
+
+        footpaths = dict()
+        for stop, coordinates in stop_locations.items():
+            neighbors = [neighbor for neighbor in grid.stops_within(coordinates.lat, coordinates.long, radius_miles)
+                         if neighbor != stop]
+            footpaths[stop] = {
+                neighbor: int(math.ceil(walk_time))
+                for neighbor, walk_time in zip(neighbors, engine.walk_times_from(coordinates, neighbors))
+                if walk_time <= max_walk_seconds
+            }
+
+        for (from_stop, to_stop), transfer in (transfers or dict()).items():
+            if from_stop == to_stop or from_stop not in footpaths or to_stop not in footpaths:
+                continue
+            if transfer.transfer_type == NO_TRANSFER:
+                footpaths[from_stop].pop(to_stop, None)
+            elif transfer.min_transfer_time is not None:
+                footpaths[from_stop][to_stop] = transfer.min_transfer_time
+
+        self._footpaths = {
+            stop: sorted(stop_footpaths.items(), key=lambda footpath: footpath[1])[:max_footpaths_per_stop]
+            for stop, stop_footpaths in footpaths.items()
+        }
+
+    def __len__(self):
+        return sum(len(stop_footpaths) for stop_footpaths in self._footpaths.values())
+
+    def footpaths_from(self, stop):
+        return self._footpaths.get(stop, [])
@@ -0,0 +1,86 @@
+import heapq
+
+from gtfs_traversal.expansion_queue import ExpansionQueue
+
+
+class HeapExpansionQueue(ExpansionQueue):
+    def __init__(self, num_solution_stops, stop_join_string, key=None, bucket_by_remaining_stops=True,
+                 node_unvisited=None):
+        super().__init__(num_solution_stops, stop_join_string, node_unvisited=node_unvisited)
+        self._bucket_by_remaining_stops = bucket_by_remaining_stops
+        self._key = key if key is not None else self._duration
+
+        # Nodes are added without their progress, so they wait in _pending until their bucket is next popped.  At
+        #  that point their keys are computed from the solver's progress dictionary and they are pushed onto the
+        #  bucket's heap in _queue.  Heap entries are deleted lazily: an entry is skipped when its node is no longer a
+        #  member of the queue, or when its key is stale because the node was added again with new progress.
+        self._bucket_sizes = dict()
+        self._members = dict()
+        self._pending = dict()
+        self._sequence = 0
+
+    def add_node(self, node):
+        num_remaining_stops = self._num_remaining_stops(self._unvisited(node))
+        if num_remaining_stops == 0:
+            return
+        # Without buckets, every node shares the bucket of nodes that have visited no stops
+        if not self._bucket_by_remaining_stops:
+            num_remaining_stops = self._one_more_than_number_of_solution_stops - 1
+        if num_remaining_stops not in self._queue:
+            self._queue[num_remaining_stops] = []
+            self._pending[num_remaining_stops] = []
+            self._bucket_sizes[num_remaining_stops] = 0
+            if num_remaining_stops < self._num_remaining_stops_to_pop:
+                self._num_remaining_stops_to_pop = num_remaining_stops
+        if node not in self._members:
+            self._members[node] = num_remaining_stops
+            self._bucket_sizes[num_remaining_stops] += 1
+        self._pending[num_remaining_stops].append(node)
+
+    def _discard_member(self, node):
+        num_remaining_stops = self._members.pop(node)
+        self._bucket_sizes[num_remaining_stops] -= 1
+        if self._bucket_sizes[num_remaining_stops] == 0:
+            del self._queue[num_remaining_stops]
+            del self._pending[num_remaining_stops]
+            del self._bucket_sizes[num_remaining_stops]
+            self._reset_num_remaining_stops_to_pop()
+
+    @staticmethod
+    def _duration(progress):
+        return progress.duration
+
+    def _flush_pending(self, num_remaining_stops, solver_progress_dict):
+        heap = self._queue[num_remaining_stops]
+        for node in self._pending[num_remaining_stops]:
+            if self._members.get(node, None) != num_remaining_stops:
+                continue
+            heapq.heappush(heap, (self._key(solver_progress_dict[node]), self._sequence, node))
+            self._sequence += 1
+        self._pending[num_remaining_stops] = []
+
+    def len(self):
+        return len(self._members)
+
+    def pop(self, solver_progress_dict):
+        num_remaining_stops = self._num_remaining_stops_to_pop
+        self._flush_pending(num_remaining_stops, solver_progress_dict)
+        heap = self._queue[num_remaining_stops]
+        while True:
+            key, _, best = heapq.heappop(heap)
+            if best in self._members and key == self._key(solver_progress_dict[best]):
+                break
+        self._discard_member(best)
+        return best
+
+    def sort_latest_nodes(self, solver_progress_dict):
+        if self._num_remaining_stops_to_pop == self._one_more_than_number_of_solution_stops:
+            return
+        self._flush_pending(self._num_remaining_stops_to_pop, solver_progress_dict)
+
+    def remove_key(self, bad_key):
+        # pruning a node that has been expanded
+        if bad_key not in self._members:
+            return
+
+        self._discard_member(bad_key)
@@ -0,0 +1,37 @@
+from collections import OrderedDict
+
+from gtfs_traversal.data_structures import CacheStats
+
+
+class LruCache:
+    # A dictionary of at most max_size entries, which evicts its least recently used entry to make room for a new one.
+    #  Lookups that hit and miss are counted.
+    def __init__(self, max_size):
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._max_size = max_size
+        self._misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    def get(self, key, default=None):
+        if key not in self._entries:
+            self._misses += 1
+            return default
+
+        self._hits += 1
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        return CacheStats(hits=self._hits, misses=self._misses, size=len(self._entries), max_size=self._max_size)
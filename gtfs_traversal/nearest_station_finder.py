@@ -1,7 +1,9 @@
-from datetime import timedelta
+import heapq
+import math
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
 
 from gtfs_traversal.data_structures import *
-from gtfs_traversal.expansion_queue import ExpansionQueue
 from gtfs_traversal.solver import Solver
 
 
@@ -11,14 +13,98 @@ WALK_ROUTE = 'walk route'
 
 
 class NearestStationFinder(Solver):
+    _SECONDS_PER_DAY = 24 * 60 * 60
+
+    def __init__(self, *args, profile_search=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        # A profile search finds the best travel time over every departure with one backwards scan of the
+        #  connections between the analysis start and end times.  Otherwise, a separate best-first search runs from
+        #  each departure.  Both board the first trip of each route after a transfer, so both find the same travel
+        #  times, except where the best-first search walks to several solution stops from one stop and keeps the
+        #  travel time to the last of them rather than the nearest.
+        self._profile_search = profile_search
+
+        self._connections = None
+        self._dated_connections = dict()
+        self._trip_routes = None
+
     def travel_time_secs_to_nearest_solution_station(self, origin, solutions, analysis_start_time):
         if origin in solutions:
             return 0
         return self._find_travel_time_secs(origin, analysis_start_time)
 
+    def travel_times_secs_to_nearest_solution_station(self, horizon_seconds):
+        # Returns a lower bound on the travel time from every stop to its nearest solution stop, found with a single
+        #  Dijkstra search backwards from all solution stops at once.  Waits and transfers are free, and each leg of a
+        #  trip takes as long as the fastest trip takes between those two stops.  Walks are searched only as far as
+        #  horizon_seconds, among the stops that the stop grid places that close, so stops that cannot reach a
+        #  solution stop within horizon_seconds get horizon_seconds.
+        all_coordinates = self._data_munger.get_all_stop_coordinates()
+        solution_stops = self._data_munger.get_unique_stops_to_solve()
+        previous_stops = self._get_previous_stop_travel_times()
+
+        travel_times = {stop: horizon_seconds for stop in all_coordinates.keys()}
+        heap = []
+        for stop in solution_stops:
+            travel_times[stop] = 0
+            heap.append((0, stop))
+        heapq.heapify(heap)
+
+        finished_stops = set()
+        while heap:
+            travel_time, stop = heapq.heappop(heap)
+            if travel_time >= horizon_seconds:
+                break
+            if stop in finished_stops:
+                continue
+            finished_stops.add(stop)
+
+            reaching_times = [(previous_stop, travel_time + ride_time)
+                              for previous_stop, ride_time in previous_stops.get(stop, {}).items()]
+            if stop in all_coordinates:
+                coordinates = all_coordinates[stop]
+                radius_miles = (horizon_seconds - travel_time) * self._walk_speed_mph / 3600
+                reaching_times.extend(
+                    (walking_stop, travel_time + walk_time)
+                    for walking_stop, walk_time in self._walk_times_from(coordinates, [
+                        (walking_stop, all_coordinates[walking_stop])
+                        for walking_stop in self._get_stop_grid().stops_within(coordinates.lat, coordinates.long,
+                                                                               radius_miles)
+                        if walking_stop in all_coordinates
+                    ]).items())
+
+            for previous_stop, previous_travel_time in reaching_times:
+                if previous_travel_time < travel_times.get(previous_stop, horizon_seconds):
+                    travel_times[previous_stop] = previous_travel_time
+                    heapq.heappush(heap, (previous_travel_time, previous_stop))
+
+        return travel_times
+
     def _announce_solution(self, new_progress):
         pass
 
+    def _earliest_arrival_after_boarding(self, profiles, stop, time):
+        # Like DataMunger.first_trip_after, boarding at a time finds the first trip of each route in that day's copy
+        #  of the timetable
+        earliest_arrival = math.inf
+        for negative_departures, arrivals in profiles.get((stop, int(time // self._SECONDS_PER_DAY)), {}).values():
+            profile_index = bisect_right(negative_departures, -time) - 1
+            if profile_index >= 0:
+                earliest_arrival = min(earliest_arrival, arrivals[profile_index])
+        return earliest_arrival
+
+    def _earliest_arrival_after_transfer(self, profiles, stop, time):
+        # After a transfer, travelers may board any trip, or walk once and transfer again before boarding
+        solutions = self._data_munger.get_unique_stops_to_solve()
+        earliest_arrival = self._earliest_arrival_after_boarding(profiles, stop, time)
+        for walking_stop, walk_time in self._get_station_walks().get(stop, []):
+            if walking_stop in solutions:
+                earliest_arrival = min(earliest_arrival, time + walk_time)
+            else:
+                earliest_arrival = min(earliest_arrival, self._earliest_arrival_after_boarding(
+                    profiles, walking_stop, time + walk_time + self._transfer_duration_seconds))
+        return earliest_arrival
+
     def _find_next_departure_time(self, origin, earliest_departure_time):
         next_departure_time = None
 
@@ -38,7 +124,7 @@ class NearestStationFinder(Solver):
 
     def _find_next_travel_time_secs(self, departure_time, origin, known_best_time):
         self._initialize_progress_dict(origin, departure_time)
-        self._exp_queue = ExpansionQueue(1, STOP_JOIN_STRING)
+        self._exp_queue = self._get_new_expansion_queue(1)
         self._exp_queue.add(self._progress_dict.keys())
         while not self._exp_queue.is_empty():
             expandee = self._exp_queue.pop(self._progress_dict)
@@ -46,6 +132,9 @@ class NearestStationFinder(Solver):
         return known_best_time
 
     def _find_travel_time_secs(self, origin, analysis_start_time):
+        if self._profile_search:
+            return self._find_travel_time_secs_with_profile(origin, analysis_start_time)
+
         best_travel_time = None
 
         departure_time = self._find_next_departure_time(origin, analysis_start_time)
@@ -56,14 +145,118 @@ class NearestStationFinder(Solver):
 
         return best_travel_time
 
+    def _find_travel_time_secs_with_profile(self, origin, analysis_start_time):
+        # Connections are scanned from the latest departure to the earliest, so the earliest arrival at a solution
+        #  stop is known for every later connection.  Each stop's profile for each day holds the earliest arrival after
+        #  boarding each route's trips there, by departure time.  Times are seconds since the midnight before
+        #  analysis_start_time.  Only departures before the buffered analysis end time may be boarded, but travelers
+        #  already on a trip may ride it past then.
+        solutions = self._data_munger.get_unique_stops_to_solve()
+        date_at_midnight = datetime(year=analysis_start_time.year, month=analysis_start_time.month,
+                                    day=analysis_start_time.day)
+        start_seconds = (analysis_start_time - date_at_midnight).total_seconds()
+        end_seconds = (self._data_munger.get_buffered_analysis_end_time() - date_at_midnight).total_seconds()
+        origin_departures = self._get_origin_departures(origin, start_seconds, end_seconds)
+
+        best_travel_time = math.inf
+        profiles = dict()
+        trip_arrivals = dict()
+        for departure, arrival, trip, departure_stop, arrival_stop in self._get_dated_connections(end_seconds):
+            if departure < start_seconds:
+                break
+
+            if arrival_stop in solutions:
+                earliest_arrival = arrival
+            else:
+                earliest_arrival = min(trip_arrivals.get(trip, math.inf), self._earliest_arrival_after_transfer(
+                    profiles, arrival_stop, arrival + self._transfer_duration_seconds))
+            trip_arrivals[trip] = earliest_arrival
+            if departure >= end_seconds:
+                continue
+
+            route_profiles = profiles.setdefault((departure_stop, trip[1]), dict())
+            negative_departures, arrivals = route_profiles.setdefault(self._get_trip_routes()[trip[0]], ([], []))
+            negative_departures.append(-departure)
+            arrivals.append(earliest_arrival)
+
+            if departure_stop == origin and departure in origin_departures:
+                # Travelers at the origin may also transfer and walk before boarding
+                best_travel_time = min(best_travel_time, earliest_arrival - departure,
+                                       self._earliest_arrival_after_transfer(
+                                           profiles, origin, departure + self._transfer_duration_seconds) - departure)
+
+        return best_travel_time if best_travel_time < math.inf else None
+
+    def _get_connections(self):
+        if self._connections is None:
+            self._connections = list(self._data_munger.get_connection_scan().connections(reverse=True))
+
+        return self._connections
+
+    def _get_dated_connections(self, end_seconds):
+        # Returns (departure, arrival, (trip id, day), departure stop, arrival stop) for a copy of every connection on
+        #  each day with departures before end_seconds, latest departure first
+        if end_seconds not in self._dated_connections:
+            connections = self._get_connections()
+            earliest_departure = min((connection[0] for connection in connections), default=0)
+            dated_connections = [
+                (day * self._SECONDS_PER_DAY + departure, day * self._SECONDS_PER_DAY + arrival, (trip_id, day),
+                 departure_stop, arrival_stop)
+                for day in range(int(max(0, math.ceil((end_seconds - earliest_departure) / self._SECONDS_PER_DAY))))
+                for departure, arrival, trip_id, departure_stop, arrival_stop in connections
+            ]
+            dated_connections.sort(key=lambda connection: connection[0], reverse=True)
+            self._dated_connections[end_seconds] = dated_connections
+
+        return self._dated_connections[end_seconds]
+
     def _get_initial_unsolved_string(self):
         if self._initial_unsolved_string is None:
             self._initial_unsolved_string = self._stop_join_string + "any_solution_stop" + self._stop_join_string
         return self._initial_unsolved_string
 
+    def _get_origin_departures(self, origin, start_seconds, end_seconds):
+        # The departures from origin that _find_travel_time_secs searches from, as found by _find_next_departure_time
+        departures = sorted({connection[0] for connection in self._get_connections() if connection[3] == origin})
+        origin_departures = set()
+        time = start_seconds
+        while departures:
+            day = int(time // self._SECONDS_PER_DAY)
+            departure_index = bisect_left(departures, time - day * self._SECONDS_PER_DAY)
+            if departure_index >= len(departures) or \
+                    day * self._SECONDS_PER_DAY + departures[departure_index] >= end_seconds:
+                break
+            time = day * self._SECONDS_PER_DAY + departures[departure_index]
+            origin_departures.add(time)
+            time += 1
+        return origin_departures
+
+    def _get_previous_stop_travel_times(self):
+        # Maps each stop to the stops that trips serve immediately before it, and to the fastest time between them
+        previous_stops = dict()
+        timetable = self._data_munger.get_timetable()
+        for trip_id, trip_info in self._data_munger.get_trip_schedules().items():
+            departure_seconds = timetable.trip_departure_seconds(trip_id)
+            for stop_number in range(2, len(departure_seconds) + 1):
+                previous_stop = trip_info.tripStops[str(stop_number - 1)].stopId
+                stop = trip_info.tripStops[str(stop_number)].stopId
+                ride_time = departure_seconds[stop_number - 1] - departure_seconds[stop_number - 2]
+                if stop not in previous_stops:
+                    previous_stops[stop] = dict()
+                if ride_time < previous_stops[stop].get(previous_stop, ride_time + 1):
+                    previous_stops[stop][previous_stop] = ride_time
+        return previous_stops
+
     def _get_total_minimum_time(self, start_time):
         return 0
 
+    def _get_trip_routes(self):
+        if self._trip_routes is None:
+            self._trip_routes = {trip_id: route for route, route_info in self._data_munger.get_route_trips().items()
+                                 for trip_id in route_info.tripIds}
+
+        return self._trip_routes
+
     def _initialize_progress_dict(self, origin, earliest_departure_time):
         self._progress_dict = dict()
         departure_time = self._find_next_departure_time(origin, earliest_departure_time)
@@ -87,7 +280,7 @@ class NearestStationFinder(Solver):
                 progress = ProgressInfo(duration=0, arrival_trip=trip, trip_stop_no=origin_stop_number,
                                         children=None, eliminated=False, expanded=False,
                                         minimum_remaining_time=0, parent=None)
-                self._progress_dict[location] = progress
+                self._progress_dict[self._node_key(location)] = progress
             else:
                 print(f"trip {trip} potentially visits stop {next_stop} multiple times")
         self._start_time = departure_time
@@ -0,0 +1,52 @@
+from array import array
+
+from gtfs_traversal.data_structures import LocationStatusInfo
+
+
+class NodeTable:
+    # Issues a dense integer id to each distinct (location, arrival_route, unvisited) node.  Locations, arrival routes
+    #  and unvisited stops are interned into far fewer pairs and unvisited codes, so the reverse table only needs two
+    #  integer arrays indexed by id.  A table describes the nodes of one search; start a new one for each search.
+    _PAIR_BITS = 32
+
+    def __init__(self):
+        self._node_ids = dict()
+        self._node_pair_indices = array('l')
+        self._node_unvisited_codes = array('l')
+        self._pair_indices = dict()
+        self._pairs = []
+        self._unvisited_codes = dict()
+        self._unvisited = []
+
+    def __len__(self):
+        return len(self._node_pair_indices)
+
+    def node_id(self, location_status):
+        pair_index = self._intern(self._pair_indices, self._pairs,
+                                  (location_status.location, location_status.arrival_route))
+        unvisited_code = self._intern(self._unvisited_codes, self._unvisited, location_status.unvisited)
+
+        key = (unvisited_code << self._PAIR_BITS) | pair_index
+        node_id = self._node_ids.get(key, None)
+        if node_id is None:
+            node_id = len(self._node_pair_indices)
+            self._node_ids[key] = node_id
+            self._node_pair_indices.append(pair_index)
+            self._node_unvisited_codes.append(unvisited_code)
+        return node_id
+
+    def status(self, node_id):
+        location, arrival_route = self._pairs[self._node_pair_indices[node_id]]
+        return LocationStatusInfo(location=location, arrival_route=arrival_route, unvisited=self.unvisited(node_id))
+
+    def unvisited(self, node_id):
+        return self._unvisited[self._node_unvisited_codes[node_id]]
+
+    @staticmethod
+    def _intern(indices, values, value):
+        index = indices.get(value, None)
+        if index is None:
+            index = len(values)
+            indices[value] = index
+            values.append(value)
+        return index
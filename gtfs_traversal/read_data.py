@@ -1,7 +1,20 @@
+import csv
+import hashlib
 import json
 import os
+import pickle
+from collections.abc import Mapping
 
 import gtfs_parsing.analyses.analyses as gtfs_parser
+from gtfs_parsing.data_structures.data_structures import gtfsSchedules, uniqueRouteInfo
+
+from gtfs_traversal.data_structures import CompiledNetwork, TransferInfo
+from gtfs_traversal.timetable import Timetable
+
+
+# Raise this whenever the layout of CompiledNetwork, Timetable, or the parsed schedules changes, so that caches
+#  pickled with the old layout are not loaded
+NETWORK_CACHE_FORMAT_VERSION = 1
 
 
 def load_configuration():
@@ -14,3 +27,100 @@ def read_data(config, data_folder_name):
     data_location = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), data_folder_name)
 
     return gtfs_parser.parse(config, data_location)
+
+
+def read_network(config, data_folder_name, cache_file_name=None):
+    # Parses the feed, drops trips that do not operate within the analysis timeframe, and compiles the timetable.
+    #  Parsing can take minutes, so if cache_file_name is given, the filtered schedules and the timetable are pickled
+    #  to that file in the data folder and reloaded for as long as the feed's files and the configuration are
+    #  unchanged.  Only those are cached; DataMunger still builds its indices over them on every run.
+    if cache_file_name is None:
+        return _compile_network(config, data_folder_name)
+
+    data_location = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), data_folder_name)
+    cache_location = os.path.join(data_location, cache_file_name)
+    key = _network_cache_key(config, data_location)
+    try:
+        with open(cache_location, 'rb') as cache_file:
+            if pickle.load(cache_file) == key:
+                network = pickle.load(cache_file)
+                if isinstance(network, CompiledNetwork):
+                    return network
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        # Missing, truncated, and otherwise unreadable caches are rebuilt
+        pass
+
+    network = _compile_network(config, data_folder_name)
+    temporary_location = cache_location + '.tmp'
+    with open(temporary_location, 'wb') as cache_file:
+        pickle.dump(key, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(network, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_location, cache_location)
+    return network
+
+
+def read_transfers(data_folder_name, transfers_file_name):
+    # Reads a GTFS transfers.txt into {(from_stop_id, to_stop_id): TransferInfo}.  Feeds without one have no transfers.
+    transfers_location = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), data_folder_name,
+                                      transfers_file_name)
+    if not os.path.exists(transfers_location):
+        return dict()
+
+    with open(transfers_location, newline='') as transfers_file:
+        return {
+            (row['from_stop_id'], row['to_stop_id']): TransferInfo(
+                transfer_type=int(row['transfer_type']) if row.get('transfer_type') else 0,
+                min_transfer_time=int(row['min_transfer_time']) if row.get('min_transfer_time') else None)
+            for row in csv.DictReader(transfers_file)
+        }
+
+
+def remove_trips_that_do_not_operate_within_analysis_timeframe(raw_data):
+    all_trips = set()
+    all_stops = set()
+    for day, trips in raw_data.dateTrips.items():
+        all_trips = all_trips.union(trips)
+    for trip in all_trips:
+        all_stops = all_stops.union(set(s.stopId for s in raw_data.tripSchedules[trip].tripStops.values()))
+
+    new_data = gtfsSchedules(
+        tripSchedules={trip_id: trip_info for trip_id, trip_info in raw_data.tripSchedules.items() if
+                       trip_id in all_trips},
+        dateTrips=raw_data.dateTrips,
+        uniqueRouteTrips={route_id: uniqueRouteInfo(tripIds=[t for t in route_info.tripIds if t in all_trips],
+                                                    routeInfo=route_info.routeInfo)
+                          for route_id, route_info in raw_data.uniqueRouteTrips.items()
+                          if any(t in all_trips for t in route_info.tripIds)},
+        stopLocations={stop_id: location for stop_id, location in raw_data.stopLocations.items()
+                       if stop_id in all_stops},
+    )
+    return new_data
+
+
+def _compile_network(config, data_folder_name):
+    data = remove_trips_that_do_not_operate_within_analysis_timeframe(read_data(config, data_folder_name))
+    return CompiledNetwork(data=data, timetable=Timetable(data.tripSchedules))
+
+
+def _config_fields(config):
+    # Returns the configuration's fields by name, whether it is a mapping, a namedtuple, or another object
+    if isinstance(config, Mapping):
+        return dict(config)
+    if hasattr(config, '_asdict'):
+        return dict(config._asdict())
+    return dict(vars(config))
+
+
+def _network_cache_key(config, data_location):
+    # GTFS feeds are folders of .txt files, so other files in the data folder, including caches, do not affect the key.
+    #  The configuration's fields are hashed in order of name, so the order that they were set in does not either.
+    key = hashlib.sha256(json.dumps({'format_version': NETWORK_CACHE_FORMAT_VERSION, 'config': _config_fields(config)},
+                                    sort_keys=True, default=repr).encode('utf-8'))
+    for file_name in sorted(os.listdir(data_location)):
+        if not file_name.endswith('.txt'):
+            continue
+        key.update(file_name.encode('utf-8'))
+        with open(os.path.join(data_location, file_name), 'rb') as feed_file:
+            for chunk in iter(lambda: feed_file.read(1 << 20), b''):
+                key.update(chunk)
+    return key.hexdigest()
@@ -0,0 +1,60 @@
+class RouteNetwork:
+    # The stops along every route and the routes at every stop, compiled once into immutable lookups.  Routes are
+    #  assumed to visit each stop once; where one does not, a stop's neighbors are those of its first visit.
+    def __init__(self, route_stops, solution_routes, solution_stops):
+        # route_stops maps each route to its stops, in order
+        self._routes_at_stop = dict()
+        self._next_stops = dict()
+        self._previous_stops = dict()
+        for route, stops in route_stops.items():
+            for index, stop in enumerate(stops):
+                self._routes_at_stop[stop] = self._routes_at_stop.get(stop, frozenset()) | {route}
+                if (stop, route) not in self._next_stops:
+                    self._next_stops[(stop, route)] = stops[index + 1] if index + 1 < len(stops) else None
+                    self._previous_stops[(stop, route)] = stops[index - 1] if index > 0 else None
+
+        self._solution_routes_at_stop = {
+            stop: frozenset(route for route in routes if route in solution_routes)
+            for stop, routes in self._routes_at_stop.items()
+        }
+        self._stops_at_ends_of_solution_routes = frozenset(
+            stop for route, stops in route_stops.items() if route in solution_routes and stops
+            for stop in (stops[0], stops[-1]))
+
+        # A solution stop that only one solution route serves can only be visited by riding that route
+        self._single_solution_routes = {
+            stop: next(iter(routes)) for stop, routes in self._solution_routes_at_stop.items()
+            if stop in solution_stops and len(routes) == 1
+        }
+        single_solution_route_stops = dict()
+        for stop, route in self._single_solution_routes.items():
+            single_solution_route_stops[route] = single_solution_route_stops.get(route, tuple()) + (stop,)
+        self._single_solution_route_stops = single_solution_route_stops
+
+    def is_last_stop_on_route(self, stop, route):
+        return self.next_stop(stop, route) is None
+
+    def next_stop(self, stop, route):
+        if (stop, route) not in self._next_stops:
+            raise ValueError("route_id and origin_stop_id mismatch")
+        return self._next_stops[(stop, route)]
+
+    def previous_stop(self, stop, route):
+        if (stop, route) not in self._previous_stops:
+            raise ValueError("route_id and origin_stop_id mismatch")
+        return self._previous_stops[(stop, route)]
+
+    def routes_at_stop(self, stop):
+        return self._routes_at_stop[stop]
+
+    def single_solution_route_stops(self):
+        return self._single_solution_route_stops
+
+    def single_solution_routes(self):
+        return self._single_solution_routes
+
+    def solution_routes_at_stop(self, stop):
+        return self._solution_routes_at_stop[stop]
+
+    def stops_at_ends_of_solution_routes(self):
+        return self._stops_at_ends_of_solution_routes
@@ -1,16 +1,37 @@
+import heapq
 import math
+from bisect import bisect_right
 from datetime import datetime, timedelta
 
-from gtfs_traversal.data_munger import DataMunger
+from gtfs_traversal.data_munger import DataMunger, TRIP_TIME_CACHE_SIZE
 from gtfs_traversal.data_structures import *
+from gtfs_traversal.expansion_strategy import DEPTH_FIRST_BY_STOPS
+from gtfs_traversal.footpath_graph import FootpathGraph
+from gtfs_traversal.heap_expansion_queue import HeapExpansionQueue
+from gtfs_traversal.lru_cache import LruCache
+from gtfs_traversal.node_table import NodeTable
+from gtfs_traversal.stop_bitmask import StopBitmask
+from gtfs_traversal.stop_grid import StopGrid
 from gtfs_traversal.string_shortener import StringShortener
+from gtfs_traversal.travel_time_matrix import TravelTimeMatrix
+from gtfs_traversal.walk_time_engine import WalkTimeEngine
+
+MINIMUM_SPANNING_TREE_CACHE_SIZE = 100000
+REMAINING_TIME_PARTS_CACHE_SIZE = 100000
 
 
 class Solver:
     def __init__(self, end_date, route_types_to_solve, stops_to_solve, data,
                  progress_between_pruning_progress_dict, prune_thoroughness, stop_join_string,
-                 transfer_duration_seconds, transfer_route, walk_route, walk_speed_mph):
+                 transfer_duration_seconds, transfer_route, walk_route, walk_speed_mph,
+                 unvisited_stops_as_bitmask=False, expansion_strategy=None, intern_node_ids=False,
+                 spatial_walking_index=False, vectorized_walk_times=False, footpath_radius_seconds=None,
+                 max_footpaths_per_stop=None, transfers=None, travel_time_matrix_file=None,
+                 minimum_spanning_tree_bound=False, bound_cache_size=None, incremental_bound=False,
+                 trip_time_cache_size=TRIP_TIME_CACHE_SIZE, timetable=None,
+                 minimum_spanning_tree_cache_size=MINIMUM_SPANNING_TREE_CACHE_SIZE, route_network=None):
         self._end_date = end_date
+        self._expansion_strategy = expansion_strategy if expansion_strategy is not None else DEPTH_FIRST_BY_STOPS
         self._route_types_to_solve = route_types_to_solve
         self._walk_speed_mph = walk_speed_mph
         self._stop_join_string = stop_join_string
@@ -21,41 +42,89 @@ class Solver:
         self._expansions_to_prune = progress_between_pruning_progress_dict
         self._prune_severity = prune_thoroughness
         self._string_shortener = StringShortener()
+        self._unvisited_stops_as_bitmask = unvisited_stops_as_bitmask
+        # Interned nodes are dense integer ids, which are decoded into LocationStatusInfo as needed.  Each search
+        #  interns its nodes into a new table.
+        self._node_table = NodeTable() if intern_node_ids else None
+        self._spatial_walking_index = spatial_walking_index
+        self._vectorized_walk_times = vectorized_walk_times
+        # Walking candidates come from a precomputed footpath graph when footpath_radius_seconds is set.  When
+        #  max_footpaths_per_stop is also set, a stop only walks to that many of its nearest walkable stops, so the
+        #  search can miss solutions that walk farther.
+        self._footpath_radius_seconds = footpath_radius_seconds
+        self._max_footpaths_per_stop = max_footpaths_per_stop
+        self._transfers = transfers
+        # The travel time matrix between solution stops is cached in travel_time_matrix_file, if given
+        self._travel_time_matrix_file = travel_time_matrix_file
+        # Remaining time bounds can be raised to the weight of a minimum spanning tree over the unvisited stops
+        self._minimum_spanning_tree_bound = minimum_spanning_tree_bound
+        # Minimum spanning tree weights are cached for the minimum_spanning_tree_cache_size most recently seen
+        #  unvisited stops
+        self._minimum_spanning_tree_times = LruCache(minimum_spanning_tree_cache_size)
+        # Remaining time bounds are cached for the bound_cache_size most recently seen unvisited stops, if given
+        self._bound_cache = LruCache(bound_cache_size) if bound_cache_size is not None else None
+        # Remaining time bounds can be derived from the bounds of the nodes that they follow.  The parts of the bounds
+        #  that are derived are cached for as many unvisited stops as the bounds are, or for
+        #  REMAINING_TIME_PARTS_CACHE_SIZE without a bound cache.
+        self._incremental_bound = incremental_bound
+        self._remaining_time_parts = LruCache(bound_cache_size if bound_cache_size is not None
+                                              else REMAINING_TIME_PARTS_CACHE_SIZE)
 
         self._best_duration = None
+        self._eliminated_nodes = None
+        self._eliminated_nodes_progress_dict = None
         self._exp_queue = None
+        self._footpath_graph = None
         self._initial_unsolved_string = None
         self._initialization_time = datetime.now()
+        self._lower_bound_heap = None
+        self._lower_bound_heap_progress_dict = None
+        self._lower_bound_heap_sequence = 0
+        self._num_expansions = 0
         self._off_course_stop_locations = None
         self._progress_dict = dict()
         self._route_trips = None
         self._start_time = None
         self._start_time_in_seconds = None
+        self._station_walks = None
         self._stop_locations = None
+        self._stop_bitmask = None
+        self._stop_grid = None
         self._stop_locations_to_solve = None
         self._stops_at_ends_of_solution_routes = None
         self._time_to_nearest_station = None
         self._total_minimum_time = None
+        self._travel_time_matrix = None
         self._trip_schedules = None
+        self._num_walkable_stops = 0
+        self._walk_time_engine = None
+        self._walking_budgets = None
+        self._walking_budget_values = None
         self._walking_coordinates = None
 
         self._data_munger = DataMunger(end_date=end_date, data=data, stop_join_string=stop_join_string,
-                                       route_types_to_solve=route_types_to_solve, stops_to_solve=stops_to_solve)
+                                       route_types_to_solve=route_types_to_solve, stops_to_solve=stops_to_solve,
+                                       trip_time_cache_size=trip_time_cache_size, timetable=timetable,
+                                       route_network=route_network)
 
     def _add_child_to_parent(self, parent, child):
-        if self._progress_dict[parent].children is None:
-            self._progress_dict[parent] = self._progress_dict[parent]._replace(children=set())
-        self._progress_dict[parent].children.add(child)
+        parent_progress = self._progress_dict[parent]
+        if parent_progress.children is None:
+            parent_progress.children = set()
+        parent_progress.children.add(child)
 
     def _add_new_node_to_progress_dict(self, new_node, best_solution_duration, *, verbose=True):
-        new_location, new_progress = new_node
+        new_location_status, new_progress = new_node
+        new_location = self._node_key(new_location_status)
 
         if new_location in self._progress_dict and not self._progress_dict[new_location].eliminated:
             self._mark_nodes_as_eliminated({new_location})
         self._progress_dict[new_location] = new_progress
+        self._unindex_eliminated_node(new_location)
+        self._index_lower_bound(new_location, new_progress)
         self._add_child_to_parent(new_progress.parent, new_location)
 
-        if self._is_solution(new_location):
+        if self._is_solution(new_location_status):
             if verbose:
                 self._announce_solution(new_progress)
             best_solution_duration = new_progress.duration
@@ -82,7 +151,14 @@ class Solver:
         return f'{self._stop_join_string}{stop_name}{self._stop_join_string}'
 
     def _announce_solution(self, new_progress):
-        print(datetime.now() - self._initialization_time, 'solution:', timedelta(seconds=new_progress.duration))
+        print(datetime.now() - self._initialization_time, 'solution:', timedelta(seconds=new_progress.duration),
+              'strategy:', self._expansion_strategy.name)
+
+    def _count_unvisited_stops(self, unvisited):
+        if self._unvisited_stops_as_bitmask:
+            return self._get_stop_bitmask().count(unvisited)
+
+        return len(unvisited.split(self._stop_join_string)) - 2
 
     def _eliminate_stops_from_string(self, stops, uneliminated):
         for stop in stops:
@@ -90,58 +166,161 @@ class Solver:
         return uneliminated
 
     def _eliminate_stop_from_string(self, name, uneliminated):
+        if self._unvisited_stops_as_bitmask:
+            return self._get_stop_bitmask().eliminate(name, uneliminated)
+
         return uneliminated.replace(self._add_separators_to_stop_name(self._string_shortener.shorten(name)),
                                     self._stop_join_string)
 
-    def _expand(self, location_status, known_best_time):
-        if self._is_solution(location_status) \
-                or self._progress_dict[location_status].expanded \
-                or self._progress_dict[location_status].eliminated:
+    def _expand(self, node, known_best_time):
+        if self._is_solution(self._node_status(node)) \
+                or self._progress_dict[node].expanded \
+                or self._progress_dict[node].eliminated:
             return known_best_time
 
-        self._progress_dict[location_status] = self._progress_dict[location_status]._replace(expanded=True)
+        self._progress_dict[node].expanded = True
+        self._num_expansions += 1
+
+        new_nodes = self._get_new_nodes(node, known_best_time)
 
-        new_nodes = self._get_new_nodes(location_status, known_best_time)
+        return self._add_new_nodes_to_progress_dict(new_nodes, known_best_time, node)
 
-        return self._add_new_nodes_to_progress_dict(new_nodes, known_best_time, location_status)
+    def _find_new_minimum_remaining_time(self, prior_unvisited_stops_string, location, visited_stops):
+        # Both the travel and transfer parts of this function seem to speed things up.
+        if self._incremental_bound:
+            new_minimum_remaining_travel_time, num_single_solution_routes = self._get_remaining_time_parts(
+                prior_unvisited_stops_string, location, visited_stops)
+            if self._data_munger.is_single_solution_route_unvisited(
+                    location.arrival_route, lambda stop: self._is_unvisited(stop, location.unvisited)):
+                num_single_solution_routes -= 1
+            new_minimum_remaining_transfers = max(0, num_single_solution_routes)
+        else:
+            new_unvisited_stops = self._get_unvisited_stops(location)
+            new_minimum_remaining_travel_time = self._data_munger.get_minimum_remaining_time(new_unvisited_stops,
+                                                                                             self._start_time)
+            new_minimum_remaining_transfers = self._data_munger.get_minimum_remaining_transfers(
+                location.arrival_route, new_unvisited_stops)
+
+        new_minimum_remaining_time = \
+            new_minimum_remaining_travel_time + new_minimum_remaining_transfers * self._transfer_duration_seconds
+
+        if self._minimum_spanning_tree_bound:
+            return max(new_minimum_remaining_time,
+                       self._get_minimum_spanning_tree_time(location.unvisited, self._get_unvisited_stops(location)))
+        return new_minimum_remaining_time
+
+    def _find_time_to_nearest_station(self):
+        return {station: 0 for station in self._data_munger.get_all_stop_coordinates().keys()}
+
+    def _get_eliminated_nodes(self):
+        # The index of eliminated nodes, bucketed by number of unvisited stops, describes one progress dictionary.
+        #  It is built by a single scan the first time it is needed and kept up to date incrementally after that.
+        if self._eliminated_nodes_progress_dict is not self._progress_dict:
+            self._eliminated_nodes = dict()
+            self._eliminated_nodes_progress_dict = self._progress_dict
+            for node, progress in self._progress_dict.items():
+                if progress.eliminated:
+                    self._index_eliminated_node(node)
+
+        return self._eliminated_nodes
+
+    def _get_footpath_graph(self):
+        if self._footpath_graph is None:
+            # Footpaths are capped per stop only after filtering them by walking coordinates, in _get_walking_data
+            self._footpath_graph = FootpathGraph(self._get_stop_locations(), self._walk_speed_mph,
+                                                 self._footpath_radius_seconds, transfers=self._transfers)
+
+        return self._footpath_graph
 
     def _get_initial_unsolved_string(self):
         if self._initial_unsolved_string is None:
-            self._initial_unsolved_string = \
-                self._stop_join_string + self._stop_join_string.join(
-                    self._string_shortener.shorten(stop) for stop in self._data_munger.get_unique_stops_to_solve()) + \
-                self._stop_join_string
+            if self._unvisited_stops_as_bitmask:
+                self._initial_unsolved_string = self._get_stop_bitmask().encode(
+                    self._data_munger.get_unique_stops_to_solve())
+            else:
+                self._initial_unsolved_string = \
+                    self._stop_join_string + self._stop_join_string.join(
+                        self._string_shortener.shorten(stop)
+                        for stop in self._data_munger.get_unique_stops_to_solve()) + \
+                    self._stop_join_string
         return self._initial_unsolved_string
 
-    def _get_new_minimum_remaining_time(self, prior_minimum_remaining_time, prior_unvisited_stops_string, location):
-        # Both the travel and transfer parts of this function seem to speed things up.
+    def _get_lower_bound_heap(self):
+        # The lower bound heap is a max-heap, by minimum possible duration, of the live nodes of one progress
+        #  dictionary.  It is built the first time a solution is found, and entries are pushed as nodes are added after
+        #  that.  Entries whose nodes have since been eliminated, pruned, or replaced are dropped when they are popped,
+        #  and the heap is rebuilt if such entries come to outnumber the nodes of the progress dictionary.
+        if self._lower_bound_heap_progress_dict is not self._progress_dict or \
+                len(self._lower_bound_heap) > 2 * len(self._progress_dict):
+            self._lower_bound_heap = []
+            self._lower_bound_heap_progress_dict = self._progress_dict
+            for node, progress in self._progress_dict.items():
+                if not progress.eliminated:
+                    self._lower_bound_heap.append(self._new_lower_bound_heap_entry(node, progress))
+            heapq.heapify(self._lower_bound_heap)
+
+        return self._lower_bound_heap
+
+    def _get_minimum_spanning_tree_time(self, unvisited, unvisited_stops):
+        # Every unvisited stop must be passed through, one after another, so the remaining travel time is at least the
+        #  weight of a minimum spanning tree over the unvisited stops, weighing each pair of stops by the travel time
+        #  between them in the faster direction.  Trees are cached by unvisited stops.
+        tree_time = self._minimum_spanning_tree_times.get(unvisited)
+        if tree_time is None:
+            travel_time_matrix = self._get_travel_time_matrix()
+            tree_time = 0
+            newest_stop = unvisited_stops[0] if unvisited_stops else None
+            distances = {stop: math.inf for stop in unvisited_stops[1:]}
+            while distances:
+                for stop in distances:
+                    distances[stop] = min(distances[stop], travel_time_matrix.travel_time(newest_stop, stop),
+                                          travel_time_matrix.travel_time(stop, newest_stop))
+                newest_stop = min(distances, key=distances.get)
+                tree_time += distances.pop(newest_stop)
+            self._minimum_spanning_tree_times.put(unvisited, tree_time)
+
+        return tree_time
+
+    def _get_new_expansion_queue(self, num_solution_stops):
+        return HeapExpansionQueue(num_solution_stops, self._stop_join_string, key=self._expansion_strategy.key,
+                                  bucket_by_remaining_stops=self._expansion_strategy.bucket_by_remaining_stops,
+                                  node_unvisited=self._node_table.unvisited if self._node_table is not None else None)
+
+    def _get_new_minimum_remaining_time(self, prior_minimum_remaining_time, prior_unvisited_stops_string, location,
+                                        visited_stops=()):
+        # visited_stops should include every stop that was unvisited before location was reached and is not after
         if prior_unvisited_stops_string == location.unvisited:
             return prior_minimum_remaining_time
 
-        new_unvisited_stop_ids = location.unvisited.strip(self._stop_join_string).split(self._stop_join_string) \
-            if not self._is_solution(location) else []
-        new_unvisited_stops = [self._string_shortener.lengthen(stop_id) for stop_id in new_unvisited_stop_ids]
-        new_minimum_remaining_travel_time = self._data_munger.get_minimum_remaining_time(new_unvisited_stops,
-                                                                                         self._start_time)
+        if self._bound_cache is None:
+            return self._find_new_minimum_remaining_time(prior_unvisited_stops_string, location, visited_stops)
 
-        new_minimum_remaining_transfer_time = \
-            self._data_munger.get_minimum_remaining_transfers(location.arrival_route, new_unvisited_stops) * \
-            self._transfer_duration_seconds
-        return new_minimum_remaining_travel_time + new_minimum_remaining_transfer_time
+        # The bound depends on the arrival route only if it is a solution route, and on the start time through the
+        #  departures that the travel time part of the bound finds
+        arrival_route = location.arrival_route if self._data_munger.is_solution_route(location.arrival_route) else None
+        key = (self._start_time, location.unvisited, arrival_route)
+        new_minimum_remaining_time = self._bound_cache.get(key)
+        if new_minimum_remaining_time is None:
+            new_minimum_remaining_time = self._find_new_minimum_remaining_time(prior_unvisited_stops_string, location,
+                                                                               visited_stops)
+            self._bound_cache.put(key, new_minimum_remaining_time)
+        return new_minimum_remaining_time
 
-    def _get_new_nodes(self, location_status, known_best_time):
-        if location_status.arrival_route == self._transfer_route:
-            return self._get_nodes_after_transfer(location_status, known_best_time)
+    def _get_new_nodes(self, node, known_best_time):
+        arrival_route = self._node_status(node).arrival_route
+        if arrival_route == self._transfer_route:
+            return self._get_nodes_after_transfer(node, known_best_time)
 
-        transfer_node = self._get_transfer_data(location_status)
+        transfer_node = self._get_transfer_data(node)
 
-        if location_status.arrival_route == self._walk_route:
+        if arrival_route == self._walk_route:
             return [transfer_node]
 
-        return [transfer_node, self._get_next_stop_data_for_trip(location_status)]
+        return [transfer_node, self._get_next_stop_data_for_trip(node)]
 
-    def _get_next_stop_data_for_trip(self, location_status):
-        progress = self._progress_dict[location_status]
+    def _get_next_stop_data_for_trip(self, node):
+        location_status = self._node_status(node)
+        progress = self._progress_dict[node]
 
         if self._data_munger.is_last_stop_on_route(location_status.location, location_status.arrival_route):
             return None
@@ -156,18 +335,20 @@ class Solver:
             progress.arrival_trip, stop_number, next_stop_no)
         new_location = LocationStatusInfo(location=next_stop_id, arrival_route=location_status.arrival_route,
                                           unvisited=new_unvisited_string)
-        new_minimum_remaining_time = self._get_new_minimum_remaining_time(progress.minimum_remaining_time,
-                                                                          location_status.unvisited, new_location)
+        new_minimum_remaining_time = self._get_new_minimum_remaining_time(
+            progress.minimum_remaining_time, location_status.unvisited, new_location,
+            visited_stops=[location_status.location, next_stop_id])
         return (
             new_location,
             ProgressInfo(duration=new_duration, arrival_trip=progress.arrival_trip,
-                         trip_stop_no=next_stop_no, parent=location_status, children=None,
+                         trip_stop_no=next_stop_no, parent=node, children=None,
                          minimum_remaining_time=new_minimum_remaining_time,
                          expanded=False, eliminated=False)
         )
 
-    def _get_node_after_boarding_route(self, location_status, route):
-        progress = self._progress_dict[location_status]
+    def _get_node_after_boarding_route(self, node, route):
+        location_status = self._node_status(node)
+        progress = self._progress_dict[node]
         departure_time, trip_id = self._data_munger.first_trip_after(
             self._start_time + timedelta(seconds=progress.duration), route, location_status.location)
 
@@ -180,21 +361,22 @@ class Solver:
         return (
             location_status._replace(arrival_route=route),
             ProgressInfo(duration=new_duration, arrival_trip=trip_id,
-                         trip_stop_no=stop_number, parent=location_status, children=None,
+                         trip_stop_no=stop_number, parent=node, children=None,
                          minimum_remaining_time=progress.minimum_remaining_time,
                          expanded=False, eliminated=False)
         )
 
-    def _get_nodes_after_boarding_routes(self, location_status):
-        routes_leaving_location = [self._get_node_after_boarding_route(location_status, route)
-                                   for route in self._data_munger.get_routes_at_stop(location_status.location)
-                                   if not self._data_munger.is_last_stop_on_route(location_status.location, route)]
+    def _get_nodes_after_boarding_routes(self, node):
+        location = self._node_status(node).location
+        routes_leaving_location = [self._get_node_after_boarding_route(node, route)
+                                   for route in self._data_munger.get_routes_at_stop(location)
+                                   if not self._data_munger.is_last_stop_on_route(location, route)]
 
         return routes_leaving_location
 
-    def _get_nodes_after_transfer(self, location_status, known_best_time):
-        walking_data = self._get_walking_data(location_status, known_best_time)
-        new_route_data = self._get_nodes_after_boarding_routes(location_status)
+    def _get_nodes_after_transfer(self, node, known_best_time):
+        walking_data = self._get_walking_data(node, known_best_time)
+        new_route_data = self._get_nodes_after_boarding_routes(node)
 
         return walking_data + new_route_data
 
@@ -204,6 +386,34 @@ class Solver:
 
         return self._off_course_stop_locations
 
+    def _get_remaining_time_parts(self, prior_unvisited_stops_string, location, visited_stops):
+        # Returns the minimum remaining travel time and the number of routes that must be transferred to.  Parts are
+        #  cached by start time and unvisited stops, and derived from the parts from before visited_stops were visited
+        #  when those are cached.
+        parts = self._remaining_time_parts.get((self._start_time, location.unvisited))
+        if parts is None:
+            prior_parts = self._remaining_time_parts.get((self._start_time, prior_unvisited_stops_string))
+            visited_stops = {stop for stop in visited_stops if self._is_unvisited(stop, prior_unvisited_stops_string)
+                             and not self._is_unvisited(stop, location.unvisited)}
+
+            if prior_parts is None or not visited_stops:
+                new_unvisited_stops = self._get_unvisited_stops(location)
+                parts = (self._data_munger.get_minimum_remaining_time(new_unvisited_stops, self._start_time),
+                         self._data_munger.get_num_single_solution_routes(new_unvisited_stops))
+            else:
+                prior_travel_time, prior_num_single_solution_routes = prior_parts
+
+                def is_unvisited(stop):
+                    return self._is_unvisited(stop, location.unvisited)
+
+                parts = (self._data_munger.get_minimum_remaining_time_after_visiting(
+                             prior_travel_time, visited_stops, is_unvisited, self._start_time),
+                         self._data_munger.get_num_single_solution_routes_after_visiting(
+                             prior_num_single_solution_routes, visited_stops, is_unvisited))
+            self._remaining_time_parts.put((self._start_time, location.unvisited), parts)
+
+        return parts
+
     def _get_route_trips(self):
         if self._route_trips is not None:
             return self._route_trips
@@ -211,6 +421,40 @@ class Solver:
         self._route_trips = self._data_munger.get_route_trips()
         return self._route_trips
 
+    def _get_station_walks(self):
+        # Walks between every pair of stops that searches may walk between when no solution is known
+        if self._station_walks is None:
+            all_coordinates = self._data_munger.get_all_stop_coordinates()
+            walking_stops = [stop for stop, _ in self._get_walking_budgets()]
+            if self._footpath_radius_seconds is not None:
+                walking_stop_set = set(walking_stops)
+                self._station_walks = {
+                    stop1: [(stop2, walk_time) for stop2, walk_time in self._get_footpath_graph().footpaths_from(stop1)
+                            if stop2 in walking_stop_set and stop2 != stop1]
+                    for stop1 in walking_stops
+                }
+            else:
+                self._station_walks = {
+                    stop1: [(stop2, walk_time) for stop2, walk_time in self._walk_times_from(
+                        all_coordinates[stop1], [(stop2, all_coordinates[stop2]) for stop2 in walking_stops]).items()
+                            if stop2 != stop1]
+                    for stop1 in walking_stops
+                }
+
+        return self._station_walks
+
+    def _get_stop_bitmask(self):
+        if self._stop_bitmask is None:
+            self._stop_bitmask = StopBitmask(self._data_munger.get_unique_stops_to_solve())
+
+        return self._stop_bitmask
+
+    def _get_stop_grid(self):
+        if self._stop_grid is None:
+            self._stop_grid = StopGrid(self._get_stop_locations())
+
+        return self._stop_grid
+
     def _get_stop_locations(self):
         if self._stop_locations is None:
             self._stop_locations = self._data_munger.get_all_stop_coordinates()
@@ -241,22 +485,40 @@ class Solver:
 
         return self._total_minimum_time
 
-    def _get_transfer_data(self, location_status):
-        progress = self._progress_dict[location_status]
+    def _get_transfer_data(self, node):
+        location_status = self._node_status(node)
+        progress = self._progress_dict[node]
         minimum_remaining_time = max(
             0, progress.minimum_remaining_time - self._transfer_duration_seconds)
         new_location_status = location_status._replace(arrival_route=self._transfer_route)
         new_duration = progress.duration + self._transfer_duration_seconds
         if location_status.location in self._get_stop_locations_to_solve() and \
                 location_status.arrival_route not in self._data_munger.get_unique_routes_to_solve() and \
-                self._location_has_been_reached_faster(new_location_status, new_duration, location_status):
+                self._location_has_been_reached_faster(new_location_status, new_duration, node):
             return None
         return (new_location_status,
                 ProgressInfo(duration=new_duration, arrival_trip=self._transfer_route,
-                             trip_stop_no=self._transfer_route, parent=location_status,
+                             trip_stop_no=self._transfer_route, parent=node,
                              minimum_remaining_time=minimum_remaining_time, children=None, expanded=False,
                              eliminated=False))
 
+    def _get_travel_time_matrix(self):
+        if self._travel_time_matrix is None:
+            stops = sorted(self._data_munger.get_unique_stops_to_solve())
+            route_legs = self._data_munger.get_minimum_route_legs()
+            station_walks = self._get_station_walks()
+            key = TravelTimeMatrix.cache_key(stops, route_legs, station_walks, self._transfer_duration_seconds)
+
+            if self._travel_time_matrix_file is not None:
+                self._travel_time_matrix = TravelTimeMatrix.load(self._travel_time_matrix_file, key)
+            if self._travel_time_matrix is None:
+                self._travel_time_matrix = TravelTimeMatrix.build(stops, route_legs, station_walks,
+                                                                  self._transfer_duration_seconds)
+                if self._travel_time_matrix_file is not None:
+                    self._travel_time_matrix.save(self._travel_time_matrix_file, key)
+
+        return self._travel_time_matrix
+
     def _get_trip_schedules(self):
         if self._trip_schedules is not None:
             return self._trip_schedules
@@ -264,34 +526,93 @@ class Solver:
         self._trip_schedules = self._data_munger.get_trip_schedules()
         return self._trip_schedules
 
+    def _get_unvisited_stops(self, location):
+        if self._is_solution(location):
+            return []
+
+        if self._unvisited_stops_as_bitmask:
+            return self._get_stop_bitmask().decode(location.unvisited)
+
+        unvisited_stop_ids = location.unvisited.strip(self._stop_join_string).split(self._stop_join_string)
+        return [self._string_shortener.lengthen(stop_id) for stop_id in unvisited_stop_ids]
+
+    def _get_walk_time_engine(self):
+        if self._walk_time_engine is None:
+            self._walk_time_engine = WalkTimeEngine(self._get_stop_locations(), self._walk_speed_mph)
+
+        return self._walk_time_engine
+
+    def _get_walking_budgets(self):
+        # A stop's walking budget is the smallest global walk time ceiling under which the stop is a walking
+        #  candidate.  A stop is a candidate if it is closer to a solution stop, stop1, than the farthest solution stop
+        #  is to stop1, and if its walk time from stop1 plus its travel time to the nearest solution stop is below the
+        #  global logical walk time ceiling.  Budgets are sorted so _reset_walking_coordinates can apply new ceilings
+        #  incrementally.
+        if self._walking_budgets is None:
+            all_coordinates = self._data_munger.get_all_stop_coordinates()
+            solution_stops = self._data_munger.get_unique_stops_to_solve()
+            budgets = dict()
+            for stop1 in solution_stops:
+                # find walk time to farthest station from stop1
+                max_walk_time = max(self._walk_times_from(
+                    all_coordinates[stop1], [(stop2, all_coordinates[stop2]) for stop2 in solution_stops]).values(),
+                    default=0)
+
+                stop_walk_times = self._walk_times_from(all_coordinates[stop1], list(
+                    self._walkable_coordinates(all_coordinates[stop1], max_walk_time, all_coordinates)))
+                for stop3, wts in stop_walk_times.items():
+                    # hm, what if there is a transfer between stops that are distant but have very fast travel times
+                    #  to solution stops?
+                    budget = wts + self._get_time_to_nearest_station()[stop3]
+                    if budget <= max_walk_time and budget < budgets.get(stop3, math.inf):
+                        budgets[stop3] = budget
+
+            self._walking_budgets = sorted(budgets.items(), key=lambda stop_budget: stop_budget[1])
+            self._walking_budget_values = [budget for _, budget in self._walking_budgets]
+            # Walking coordinates are rebuilt from the new budgets the next time they are needed
+            self._walking_coordinates = None
+
+        return self._walking_budgets
+
     def _get_walking_coordinates(self):
         if self._walking_coordinates is None:
             self._reset_walking_coordinates(None)
 
         return self._walking_coordinates
 
-    def _get_walking_data(self, location_status, known_best_time):
-        progress = self._progress_dict[location_status]
+    def _get_walking_data(self, node, known_best_time):
+        location_status = self._node_status(node)
+        progress = self._progress_dict[node]
         walking_coordinates = self._get_walking_coordinates()
 
         if progress.parent is None:
             return []
-        if progress.parent.arrival_route == self._walk_route:
+        if self._node_status(progress.parent).arrival_route == self._walk_route:
             return []
         if location_status.location not in walking_coordinates:
             return []
 
-        max_walk_time = known_best_time - self._progress_dict[location_status].duration - \
-            self._progress_dict[location_status].minimum_remaining_time \
+        max_walk_time = known_best_time - progress.duration - progress.minimum_remaining_time \
             if known_best_time is not None else None
 
-        current_coordinates = walking_coordinates[location_status.location]
-        stop_walk_times = {
-            stop: self._walk_time_seconds(current_coordinates.lat, coordinates.lat,
-                                          current_coordinates.long, coordinates.long)
-            for stop, coordinates in walking_coordinates.items()
-            if max_walk_time is None or self._get_time_to_nearest_station()[stop] <= max_walk_time
-        }
+        if self._footpath_radius_seconds is not None:
+            # Footpaths are sorted by walk time, so the nearest walkable stops are kept
+            walkable_footpaths = [
+                (stop, wts) for stop, wts in self._get_footpath_graph().footpaths_from(location_status.location)
+                if stop in walking_coordinates
+            ][:self._max_footpaths_per_stop]
+            stop_walk_times = {
+                stop: wts for stop, wts in walkable_footpaths
+                if max_walk_time is None or self._get_time_to_nearest_station()[stop] <= max_walk_time
+            }
+        else:
+            current_coordinates = walking_coordinates[location_status.location]
+            stop_walk_times = self._walk_times_from(current_coordinates, [
+                (stop, coordinates)
+                for stop, coordinates in self._walkable_coordinates(current_coordinates, max_walk_time,
+                                                                    walking_coordinates)
+                if max_walk_time is None or self._get_time_to_nearest_station()[stop] <= max_walk_time
+            ])
 
         # Filtering walk times to exclude non-solution stops whose next stop is closer doesn't seem to improve speed.
         #  But, this was determined before working to reduce the number of walking expansions - 0ef8ae6 can revert this
@@ -303,7 +624,7 @@ class Solver:
             (
                 LocationStatusInfo(location=loc, arrival_route=self._walk_route, unvisited=location_status.unvisited),
                 ProgressInfo(duration=progress.duration + wts,
-                             arrival_trip=self._walk_route, trip_stop_no=self._walk_route, parent=location_status,
+                             arrival_trip=self._walk_route, trip_stop_no=self._walk_route, parent=node,
                              minimum_remaining_time=progress.minimum_remaining_time, children=None,
                              expanded=False, eliminated=False)
             )
@@ -311,7 +632,31 @@ class Solver:
             if max_walk_time is None or wts + self._get_time_to_nearest_station()[loc] <= max_walk_time
         ]
 
+    def _index_eliminated_node(self, node):
+        if self._eliminated_nodes_progress_dict is not self._progress_dict:
+            return
+
+        num_unvisited_stops = self._count_unvisited_stops(self._node_unvisited(node))
+        if num_unvisited_stops not in self._eliminated_nodes:
+            self._eliminated_nodes[num_unvisited_stops] = set()
+        self._eliminated_nodes[num_unvisited_stops].add(node)
+
+    def _index_lower_bound(self, node, progress):
+        if self._lower_bound_heap_progress_dict is not self._progress_dict:
+            return
+
+        heapq.heappush(self._get_lower_bound_heap(), self._new_lower_bound_heap_entry(node, progress))
+
+    def _is_unvisited(self, stop, unvisited):
+        if self._unvisited_stops_as_bitmask:
+            return unvisited & self._get_stop_bitmask().bit(stop) != 0
+
+        return self._add_separators_to_stop_name(self._string_shortener.shorten(stop)) in unvisited
+
     def _is_solution(self, location):
+        if self._unvisited_stops_as_bitmask:
+            return location.unvisited == 0
+
         return location.unvisited == self._stop_join_string
 
     @staticmethod
@@ -320,11 +665,11 @@ class Solver:
             return False
         return progress_info.duration + progress_info.minimum_remaining_time >= best_duration
 
-    def _last_improving_ancestor(self, location):
-        parent = self._progress_dict[location].parent
-        while parent is not None and location.unvisited == parent.unvisited:
-            location, parent = parent, self._progress_dict[parent].parent
-        return location
+    def _last_improving_ancestor(self, node):
+        parent = self._progress_dict[node].parent
+        while parent is not None and self._node_unvisited(node) == self._node_unvisited(parent):
+            node, parent = parent, self._progress_dict[parent].parent
+        return node
 
     def _location_has_been_reached_faster(self, new_location, new_duration, parent):
         last_ancestor_to_improve = self._last_improving_ancestor(parent)
@@ -336,7 +681,7 @@ class Solver:
             if subject_progress.duration >= new_duration:
                 continue
 
-            if subject != parent and subject.location == new_location.location and \
+            if subject != parent and self._node_status(subject).location == new_location.location and \
                     subject_progress.duration < new_duration:
                 return True
 
@@ -346,43 +691,68 @@ class Solver:
         return False
 
     def _mark_nodes_as_eliminated(self, nodes_to_eliminate):
-        while len(nodes_to_eliminate) > 0:
-            node_to_eliminate = nodes_to_eliminate.pop()
+        worklist = list(nodes_to_eliminate)
+        while worklist:
+            node_to_eliminate = worklist.pop()
+            progress = self._progress_dict[node_to_eliminate]
 
             # Sometimes, you might reasonably try to eliminate an eliminated node.
-            if self._progress_dict[node_to_eliminate].eliminated:
+            if progress.eliminated:
                 continue
 
-            # eliminate node
-            self._progress_dict[node_to_eliminate] = self._progress_dict[node_to_eliminate]._replace(eliminated=True)
+            # eliminate node, detaching it from its parent and children
+            children = progress.children
+            parent = progress.parent
+            progress.eliminated = True
+            progress.parent = None
+            if children is not None:
+                progress.children = set()
+            self._index_eliminated_node(node_to_eliminate)
 
             # eliminate node's children
-            if self._progress_dict[node_to_eliminate].children is not None:
-                nodes_to_eliminate = nodes_to_eliminate.union(self._progress_dict[node_to_eliminate].children)
-                self._progress_dict[node_to_eliminate] = self._progress_dict[node_to_eliminate]._replace(children=set())
+            if children is not None:
+                worklist.extend(children)
 
             # eliminate node's parent (if it hasn't already been eliminated)
-            parent = self._progress_dict[node_to_eliminate].parent
-            self._progress_dict[node_to_eliminate] = self._progress_dict[node_to_eliminate]._replace(parent=None)
-            if parent and not self._progress_dict[parent].eliminated:
-                self._progress_dict[parent].children.remove(node_to_eliminate)
-                if len(self._progress_dict[parent].children) == 0:
-                    nodes_to_eliminate.add(parent)
+            if parent is not None and not self._progress_dict[parent].eliminated:
+                siblings = self._progress_dict[parent].children
+                siblings.remove(node_to_eliminate)
+                if len(siblings) == 0:
+                    worklist.append(parent)
 
     def _mark_slow_nodes_as_eliminated(self, best_solution_duration, *, preserve):
-        nodes_to_eliminate = {k for k, v in self._progress_dict.items() if
-                              self._is_too_slow(k, v, best_solution_duration, preserve)}
+        lower_bound_heap = self._get_lower_bound_heap()
+        nodes_to_eliminate = set()
+        preserved_entries = []
+        while lower_bound_heap and -lower_bound_heap[0][0] >= best_solution_duration:
+            entry = heapq.heappop(lower_bound_heap)
+            node = entry[2]
+            progress = self._progress_dict.get(node, None)
+            if progress is None or progress.eliminated or -entry[0] != self._minimum_possible_duration(progress):
+                continue
+            if not self._is_too_slow(node, progress, best_solution_duration, preserve):
+                preserved_entries.append(entry)
+                continue
+            nodes_to_eliminate.add(node)
+
+        for entry in preserved_entries:
+            heapq.heappush(lower_bound_heap, entry)
         self._mark_nodes_as_eliminated(nodes_to_eliminate)
 
     @staticmethod
     def _minimum_possible_duration(progress):
         return progress.duration + progress.minimum_remaining_time
 
+    def _new_lower_bound_heap_entry(self, node, progress):
+        self._lower_bound_heap_sequence += 1
+        return -self._minimum_possible_duration(progress), self._lower_bound_heap_sequence, node
+
     def _node_is_valid(self, node, best_solution_duration):
         if node is None:
             return False
 
-        new_location, new_progress = node
+        new_location_status, new_progress = node
+        new_location = self._node_key(new_location_status)
 
         if new_progress.eliminated:
             return False
@@ -397,43 +767,53 @@ class Solver:
 
         return True
 
+    def _node_key(self, location_status):
+        if self._node_table is None:
+            return location_status
+
+        return self._node_table.node_id(location_status)
+
+    def _node_status(self, node):
+        if self._node_table is None:
+            return node
+
+        return self._node_table.status(node)
+
+    def _node_unvisited(self, node):
+        if self._node_table is None:
+            return node.unvisited
+
+        return self._node_table.unvisited(node)
+
+    def _reset_node_table(self):
+        if self._node_table is not None:
+            self._node_table = NodeTable()
+
     def _reset_time_to_nearest_station(self):
-        self._time_to_nearest_station = {
-            station: 0 for station in self._data_munger.get_all_stop_coordinates().keys()
-        }
+        self._time_to_nearest_station = self._find_time_to_nearest_station()
+        # Walking budgets, and so the walks between stations, depend on travel times to the nearest station
+        self._station_walks = None
+        self._walking_budgets = None
 
     def _reset_walking_coordinates(self, known_best_time):
         abs_max_walk_time = None if known_best_time is None else \
             known_best_time - self._get_total_minimum_time(self._start_time)
+        walking_budgets = self._get_walking_budgets()
+        if self._walking_coordinates is None:
+            self._walking_coordinates = dict()
+            self._num_walkable_stops = 0
+        num_walkable_stops = len(walking_budgets) if abs_max_walk_time is None else \
+            bisect_right(self._walking_budget_values, abs_max_walk_time)
+
+        # Known best times usually only improve, so this usually only removes the stops whose budgets are exceeded
         all_coordinates = self._data_munger.get_all_stop_coordinates()
-        solution_stops = self._data_munger.get_unique_stops_to_solve()
-        self._walking_coordinates = dict()
-        for stop1 in solution_stops:
-            # find walk time to farthest station from stop1
-            max_walk_time = 0
-            for stop2 in solution_stops:
-                wts = self._walk_time_seconds(all_coordinates[stop1].lat, all_coordinates[stop2].lat,
-                                              all_coordinates[stop1].long, all_coordinates[stop2].long)
-                max_walk_time = max(wts, max_walk_time)
-
-            # If a global ceiling is more strict than the time to the farthest station, use the global ceiling
-            if abs_max_walk_time is not None:
-                max_walk_time = min(max_walk_time, abs_max_walk_time)
-
-            # add any station closer to stop1 than max_walk_time to self._walking_coordinates if it's below the global
-            #  logical walk time ceiling and the travel time to the nearest solution stop is below the global walk
-            #  time ceiling
-            for stop3, coordinates in all_coordinates.items():
-                if stop3 in self._walking_coordinates:
-                    continue
-
-                wts = self._walk_time_seconds(all_coordinates[stop1].lat, coordinates.lat,
-                                              all_coordinates[stop1].long, coordinates.long)
-
-                # hm, what if there is a transfer between stops that are distant but have very fast travel times to
-                #  solution stops?
-                if wts + self._get_time_to_nearest_station()[stop3] <= max_walk_time:
-                    self._walking_coordinates[stop3] = coordinates
+        while self._num_walkable_stops > num_walkable_stops:
+            self._num_walkable_stops -= 1
+            del self._walking_coordinates[walking_budgets[self._num_walkable_stops][0]]
+        while self._num_walkable_stops < num_walkable_stops:
+            stop = walking_budgets[self._num_walkable_stops][0]
+            self._walking_coordinates[stop] = all_coordinates[stop]
+            self._num_walkable_stops += 1
 
     def _start_time_in_seconds(self):
         if self._start_time_in_seconds is None:
@@ -445,6 +825,40 @@ class Solver:
     def _to_radians_from_degrees(degrees):
         return degrees * math.pi / 180
 
+    def _unindex_eliminated_node(self, node):
+        if self._eliminated_nodes_progress_dict is not self._progress_dict:
+            return
+
+        num_unvisited_stops = self._count_unvisited_stops(self._node_unvisited(node))
+        if num_unvisited_stops in self._eliminated_nodes:
+            self._eliminated_nodes[num_unvisited_stops].discard(node)
+
+    def _walk_times_from(self, origin_coordinates, stops_and_coordinates):
+        # Returns a dictionary of walk times, in seconds, from origin_coordinates to each stop
+        if self._vectorized_walk_times:
+            stops = [stop for stop, _ in stops_and_coordinates]
+            return dict(zip(stops, self._get_walk_time_engine().walk_times_from(origin_coordinates, stops)))
+
+        return {
+            stop: self._walk_time_seconds(origin_coordinates.lat, coordinates.lat,
+                                          origin_coordinates.long, coordinates.long)
+            for stop, coordinates in stops_and_coordinates
+        }
+
+    def _walkable_coordinates(self, origin_coordinates, max_walk_time, stop_coordinates):
+        # Without a spatial index, or without a limit on walking time, every stop is a walking candidate.  Otherwise,
+        #  only stops that the grid places within max_walk_time of the origin are.
+        if not self._spatial_walking_index or max_walk_time is None:
+            return stop_coordinates.items()
+
+        radius_miles = max_walk_time * self._walk_speed_mph / 3600
+        return [
+            (stop, stop_coordinates[stop])
+            for stop in self._get_stop_grid().stops_within(origin_coordinates.lat, origin_coordinates.long,
+                                                           radius_miles)
+            if stop in stop_coordinates
+        ]
+
     def _walk_time_seconds(self, lat1, lat2, long1, long2):
         origin_lat = self._to_radians_from_degrees(lat1)
         origin_long = self._to_radians_from_degrees(long1)
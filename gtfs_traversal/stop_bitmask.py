@@ -0,0 +1,32 @@
+try:
+    bit_count = int.bit_count
+except AttributeError:
+    # int.bit_count was added in Python 3.10
+    def bit_count(mask):
+        return bin(mask).count('1')
+
+
+class StopBitmask:
+    def __init__(self, stops):
+        self._stops = tuple(sorted(stops))
+        self._bits = {stop: 1 << index for index, stop in enumerate(self._stops)}
+
+    def bit(self, stop):
+        # Stops outside the bitmask are never unvisited, so eliminating one is a no-op.
+        return self._bits.get(stop, 0)
+
+    @staticmethod
+    def count(mask):
+        return bit_count(mask)
+
+    def decode(self, mask):
+        return [stop for stop, bit in self._bits.items() if mask & bit]
+
+    def eliminate(self, stop, mask):
+        return mask & ~self.bit(stop)
+
+    def encode(self, stops):
+        mask = 0
+        for stop in stops:
+            mask |= self.bit(stop)
+        return mask
@@ -0,0 +1,72 @@
+import math
+
+
+EARTH_RADIUS_MILES = 3959
+
+
+class StopGrid:
+    def __init__(self, stop_locations, cell_degrees=None):
+        self._stop_locations = stop_locations
+        self._cell_degrees = cell_degrees if cell_degrees is not None else self._default_cell_degrees(stop_locations)
+
+        self._cells = dict()
+        for stop, coordinates in stop_locations.items():
+            cell = self._cell(coordinates.lat, coordinates.long)
+            if cell not in self._cells:
+                self._cells[cell] = []
+            self._cells[cell].append(stop)
+
+    def _cell(self, lat, long):
+        return math.floor(lat / self._cell_degrees), math.floor(long / self._cell_degrees)
+
+    @staticmethod
+    def _default_cell_degrees(stop_locations):
+        # Size cells so that there is about one stop per cell over the area the stops cover
+        if len(stop_locations) < 2:
+            return 1.0
+
+        lats = [coordinates.lat for coordinates in stop_locations.values()]
+        longs = [coordinates.long for coordinates in stop_locations.values()]
+        area = (max(lats) - min(lats)) * (max(longs) - min(longs))
+        return math.sqrt(area / len(stop_locations)) if area > 0 else 1.0
+
+    def stops_within(self, lat, long, radius_miles):
+        # Returns every stop within radius_miles of (lat, long), as well as some stops just outside of it, by scanning
+        #  the cells that overlap a bounding box of the radius.  Callers filter the result by exact distance.
+        if radius_miles < 0:
+            return []
+
+        # The radius is padded slightly so that rounding never excludes a stop exactly at the radius
+        half_angle = radius_miles * (1 + 1e-9) / EARTH_RADIUS_MILES / 2
+        delta_lat = math.degrees(2 * half_angle)
+        min_lat, max_lat = lat - delta_lat, lat + delta_lat
+
+        # Two points within the radius differ in longitude by no more than this, as long as both are no farther
+        #  from the equator than the farthest latitude of the bounding box.
+        cos_lat = math.cos(math.radians(min(90, max(abs(min_lat), abs(max_lat)))))
+        all_longs = max_lat >= 90 or min_lat <= -90 or math.sin(min(half_angle, math.pi / 2)) >= cos_lat
+        if not all_longs:
+            delta_long = math.degrees(2 * math.asin(math.sin(half_angle) / cos_lat))
+            min_long, max_long = long - delta_long, long + delta_long
+            # Boxes that wrap around the antimeridian cover every longitude
+            all_longs = min_long < -180 or max_long > 180
+        if all_longs:
+            min_long, max_long = long, long
+
+        min_row, min_column = self._cell(min_lat, min_long)
+        max_row, max_column = self._cell(max_lat, max_long)
+        num_box_cells = (max_row - min_row + 1) * (max_column - min_column + 1)
+        if all_longs or num_box_cells > len(self._cells):
+            return [
+                stop
+                for (row, column), stops in self._cells.items()
+                if min_row <= row <= max_row and (all_longs or min_column <= column <= max_column)
+                for stop in stops
+            ]
+
+        return [
+            stop
+            for row in range(min_row, max_row + 1)
+            for column in range(min_column, max_column + 1)
+            for stop in self._cells.get((row, column), [])
+        ]
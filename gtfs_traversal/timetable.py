@@ -0,0 +1,33 @@
+from array import array
+
+
+class Timetable:
+    def __init__(self, trip_schedules):
+        # Each trip's departure times are compiled once into integer seconds since midnight, stored in stop order.
+        #  Departure times along a trip never decrease, so the array doubles as a prefix sum of travel times.
+        self._trip_departure_seconds = {
+            trip_id: self._compile_trip(trip_info.tripStops) for trip_id, trip_info in trip_schedules.items()
+        }
+
+    def __len__(self):
+        return len(self._trip_departure_seconds)
+
+    @classmethod
+    def _compile_trip(cls, trip_stops):
+        return array('i', (cls.seconds_since_midnight(trip_stops[str(stop_number)].departureTime)
+                           for stop_number in range(1, len(trip_stops) + 1)))
+
+    def departure_seconds(self, trip_id, stop_number):
+        return self._trip_departure_seconds[trip_id][int(stop_number) - 1]
+
+    @staticmethod
+    def seconds_since_midnight(raw_time_string):
+        hours, minutes, seconds = raw_time_string.split(':')
+        return int(round(3600 * float(hours) + 60 * float(minutes) + float(seconds)))
+
+    def travel_time_seconds(self, trip_id, on_stop_number, off_stop_number):
+        departure_seconds = self._trip_departure_seconds[trip_id]
+        return departure_seconds[int(off_stop_number) - 1] - departure_seconds[int(on_stop_number) - 1]
+
+    def trip_departure_seconds(self, trip_id):
+        return self._trip_departure_seconds[trip_id]
@@ -0,0 +1,136 @@
+import hashlib
+import heapq
+import json
+import math
+import sys
+from array import array
+
+
+UNREACHABLE = -1
+
+_READY = 0
+_WALKED = 1
+_RIDING = 2
+
+
+class TravelTimeMatrix:
+    # Minimum travel times, in whole seconds, between every pair of stops, stored row by row in one integer array.
+    #  Travel times are lower bounds: trips wait for travelers, and each leg of a route takes as long as the route's
+    #  fastest trip takes between those two stops.  Transfers and walks take as long as they do in a search.
+    def __init__(self, stops, travel_times):
+        self._stops = list(stops)
+        self._indices = {stop: index for index, stop in enumerate(self._stops)}
+        self._travel_times = array('i', travel_times)
+
+    def __len__(self):
+        return len(self._stops)
+
+    @classmethod
+    def build(cls, stops, route_legs, footpaths, transfer_seconds):
+        # route_legs maps each route to {(stop, next stop): seconds}, and footpaths maps stops to (stop, seconds) pairs
+        #  that searches may walk between
+        legs_from = dict()
+        for route, legs in route_legs.items():
+            for (stop, next_stop), seconds in legs.items():
+                if (route, stop) not in legs_from:
+                    legs_from[(route, stop)] = []
+                legs_from[(route, stop)].append((next_stop, seconds))
+
+        routes_at_stop = dict()
+        for route, stop in legs_from.keys():
+            if stop not in routes_at_stop:
+                routes_at_stop[stop] = []
+            routes_at_stop[stop].append(route)
+
+        travel_times = []
+        for origin in stops:
+            travel_times.extend(cls._travel_times_from(origin, stops, legs_from, routes_at_stop, footpaths,
+                                                       transfer_seconds))
+        return cls(stops, travel_times)
+
+    @staticmethod
+    def cache_key(stops, route_legs, footpaths, transfer_seconds):
+        # Identifies the inputs to build, so that a saved matrix is only loaded for the inputs it was built from
+        inputs = repr((
+            sorted(repr(stop) for stop in stops),
+            sorted((repr(route), sorted((repr(leg), seconds) for leg, seconds in legs.items()))
+                   for route, legs in route_legs.items()),
+            sorted((repr(stop), sorted((repr(walking_stop), seconds) for walking_stop, seconds in stop_footpaths))
+                   for stop, stop_footpaths in footpaths.items()),
+            transfer_seconds,
+        ))
+        return hashlib.sha256(inputs.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def load(cls, file_name, key):
+        # Returns the matrix saved in file_name, or None if there is none or it was saved for other inputs
+        try:
+            with open(file_name, 'rb') as matrix_file:
+                header = json.loads(matrix_file.readline().decode('utf-8'))
+                if header != cls._header(key, header.get('stops', [])):
+                    return None
+
+                travel_times = array('i')
+                travel_times.frombytes(matrix_file.read())
+        except (OSError, ValueError):
+            return None
+
+        if len(travel_times) != len(header['stops']) ** 2:
+            return None
+        return cls(header['stops'], travel_times)
+
+    def save(self, file_name, key):
+        with open(file_name, 'wb') as matrix_file:
+            matrix_file.write(json.dumps(self._header(key, self._stops)).encode('utf-8') + b'\n')
+            matrix_file.write(self._travel_times.tobytes())
+
+    def stops(self):
+        return list(self._stops)
+
+    def travel_time(self, origin, destination):
+        # Returns the minimum travel time from origin to destination, or infinity if destination is unreachable
+        travel_time = self._travel_times[self._indices[origin] * len(self._stops) + self._indices[destination]]
+        return math.inf if travel_time == UNREACHABLE else travel_time
+
+    @staticmethod
+    def _header(key, stops):
+        return {'byteorder': sys.byteorder, 'itemsize': array('i').itemsize, 'key': key, 'stops': stops}
+
+    @staticmethod
+    def _travel_times_from(origin, stops, legs_from, routes_at_stop, footpaths, transfer_seconds):
+        # Dijkstra's algorithm over travelers that are ready to board or walk at a stop, that have walked to a stop,
+        #  or that are riding a route at a stop.  Travelers must transfer after riding or walking.
+        arrival_times = dict()
+        finished_states = set()
+        heap = [(0, 0, (_READY, origin))]
+        sequence = 1
+        unreached_stops = set(stops)
+        while heap and unreached_stops:
+            travel_time, _, state = heapq.heappop(heap)
+            if state in finished_states:
+                continue
+            finished_states.add(state)
+
+            stop = state[-1]
+            if stop in unreached_stops:
+                unreached_stops.remove(stop)
+                arrival_times[stop] = travel_time
+
+            if state[0] == _READY:
+                next_states = [((_RIDING, route, stop), 0) for route in routes_at_stop.get(stop, [])]
+                next_states.extend(((_WALKED, walking_stop), walk_seconds)
+                                   for walking_stop, walk_seconds in footpaths.get(stop, []))
+            elif state[0] == _WALKED:
+                next_states = [((_READY, stop), transfer_seconds)]
+            else:
+                route = state[1]
+                next_states = [((_RIDING, route, next_stop), seconds)
+                               for next_stop, seconds in legs_from.get((route, stop), [])]
+                next_states.append(((_READY, stop), transfer_seconds))
+
+            for next_state, seconds in next_states:
+                if next_state not in finished_states:
+                    heapq.heappush(heap, (travel_time + seconds, sequence, next_state))
+                    sequence += 1
+
+        return [math.floor(arrival_times[stop]) if stop in arrival_times else UNREACHABLE for stop in stops]
@@ -2,13 +2,23 @@ import math
 from datetime import datetime
 
 from gtfs_traversal.data_structures import *
-from gtfs_traversal.expansion_queue import ExpansionQueue
 from gtfs_traversal.nearest_station_finder import NearestStationFinder
 from gtfs_traversal.solver import Solver
 
 
 class Traverser(Solver):
+    def _find_time_to_nearest_station(self):
+        # Walking pruning never compares travel times to the nearest station against more than the longest walk
+        #  between two solution stops, so the search for them stops there.
+        all_coordinates = self._data_munger.get_all_stop_coordinates()
+        solution_stops = self._data_munger.get_unique_stops_to_solve()
+        horizon_seconds = max((max(self._walk_times_from(all_coordinates[stop1], [
+            (stop2, all_coordinates[stop2]) for stop2 in solution_stops]).values(), default=0)
+            for stop1 in solution_stops), default=0)
+        return self._get_nearest_station_finder().travel_times_secs_to_nearest_solution_station(horizon_seconds)
+
     def _get_nearest_station_finder(self):
+        # The finder shares this traverser's compiled timetable and route network rather than compiling its own
         return NearestStationFinder(data=self._data_munger.data,
                                     progress_between_pruning_progress_dict=self._expansions_to_prune,
                                     prune_thoroughness=self._prune_severity, stop_join_string=self._stop_join_string,
@@ -16,9 +26,17 @@ class Traverser(Solver):
                                     transfer_route=self._transfer_route, walk_route=self._walk_route,
                                     walk_speed_mph=self._walk_speed_mph, end_date=self._end_date,
                                     route_types_to_solve=self._route_types_to_solve,
-                                    stops_to_solve=self._stops_to_solve)
+                                    stops_to_solve=self._stops_to_solve,
+                                    spatial_walking_index=self._spatial_walking_index,
+                                    vectorized_walk_times=self._vectorized_walk_times,
+                                    timetable=self._data_munger.get_timetable(),
+                                    route_network=self._data_munger.get_route_network())
+
+    def bound_cache_stats(self):
+        return self._bound_cache.stats() if self._bound_cache is not None else None
 
     def initialize_progress_dict(self, begin_time):
+        self._reset_node_table()
         progress_dict = dict()
         best_departure_time = None
         optimal_start_locations = set()
@@ -34,8 +52,8 @@ class Traverser(Solver):
                     best_departure_time = departure_time
                     optimal_start_locations = set()
                 stop_number = self._data_munger.get_stop_number_from_stop_id(stop, route)
-                location_info = LocationStatusInfo(location=stop, arrival_route=route,
-                                                   unvisited=self._get_initial_unsolved_string())
+                location_info = self._node_key(LocationStatusInfo(location=stop, arrival_route=route,
+                                                                  unvisited=self._get_initial_unsolved_string()))
                 progress_info = ProgressInfo(duration=0, parent=None, children=None,
                                              arrival_trip=trip, trip_stop_no=stop_number,
                                              minimum_remaining_time=self._get_total_minimum_time(begin_time),
@@ -49,47 +67,77 @@ class Traverser(Solver):
         self._progress_dict = progress_dict
         self._start_time = best_departure_time
 
+    def minimum_spanning_tree_cache_stats(self):
+        return self._minimum_spanning_tree_times.stats()
+
+    def num_expansions(self):
+        return self._num_expansions
+
+    def num_prunable_nodes(self):
+        return sum(len(nodes) for nodes in self._get_eliminated_nodes().values())
+
     def prunable_nodes(self):
-        return [k for k, v in self._progress_dict.items() if v.eliminated]
+        return [node for nodes in self._get_eliminated_nodes().values() for node in nodes]
 
     def prune_progress_dict(self):
-        def ineffectiveness(node):
-            return len(node.unvisited.split(self._stop_join_string))
-
-        prunable_nodes = self.prunable_nodes()
-        num_nodes_to_prune = math.floor(self._prune_severity * float(len(prunable_nodes)))
+        eliminated_nodes = self._get_eliminated_nodes()
+        num_nodes_to_prune = math.floor(self._prune_severity * float(self.num_prunable_nodes()))
         if num_nodes_to_prune == 0:
             return
 
-        node_ineffectiveness = zip(prunable_nodes, [ineffectiveness(k) for k in prunable_nodes])
-        node_ineffectiveness_order = sorted(node_ineffectiveness, key=lambda x: x[1])
+        # The least effective nodes, those with the most unvisited stops, are pruned first
         num_pruned_nodes = 0
-        while num_pruned_nodes < num_nodes_to_prune and node_ineffectiveness_order:
-            node_ineffectiveness_to_prune = node_ineffectiveness_order.pop()
-            node_to_prune = node_ineffectiveness_to_prune[0]
-            del self._progress_dict[node_to_prune]
-            self._exp_queue.remove_key(node_to_prune)
-            num_pruned_nodes += 1
+        for ineffectiveness in sorted(eliminated_nodes.keys(), reverse=True):
+            nodes_to_prune = eliminated_nodes[ineffectiveness]
+            while num_pruned_nodes < num_nodes_to_prune and nodes_to_prune:
+                node_to_prune = nodes_to_prune.pop()
+                del self._progress_dict[node_to_prune]
+                self._exp_queue.remove_key(node_to_prune)
+                num_pruned_nodes += 1
+            if not nodes_to_prune:
+                del eliminated_nodes[ineffectiveness]
+            if num_pruned_nodes >= num_nodes_to_prune:
+                break
 
     def print_path(self, progress_dict):
-        solution_locations = [k for k in progress_dict if self._is_solution(k.unvisited)]
-        for location in solution_locations:
+        self.print_solution_paths(self.solution_paths(progress_dict))
+
+    @staticmethod
+    def print_solution_paths(solution_paths):
+        for path in solution_paths:
+            print("solution:")
+            for stop in path:
+                print(stop)
+
+    def solution_paths(self, progress_dict):
+        # Returns the (arrival route, location) steps to each solution in progress_dict.  Node ids only describe the
+        #  latest search's nodes, so paths to keep past the next search must be found before it starts.
+        solution_paths = []
+        for location in [k for k in progress_dict if self._is_solution(self._node_status(k))]:
             path = list()
             _location = location
             while _location is not None:
-                path.append((_location.arrival_route, _location.location))
+                location_status = self._node_status(_location)
+                path.append((location_status.arrival_route, location_status.location))
                 _location = progress_dict[_location].parent
-            path = reversed(path)
-            print("solution:")
-            for stop in path:
-                print(stop)
+            solution_paths.append(list(reversed(path)))
+        return solution_paths
+
+    def trip_time_cache_stats(self):
+        return self._data_munger.get_trip_time_cache_stats()
+
+    def _announce_progress(self, *progress):
+        print(*progress, datetime.now() - self._initialization_time, self._exp_queue.len(),
+              len(self._progress_dict), self.num_prunable_nodes(), self._expansion_strategy.name)
 
     def find_solution(self, begin_time, known_best_time):
         self.initialize_progress_dict(begin_time)
-        self._exp_queue = ExpansionQueue(len(self._data_munger.get_unique_stops_to_solve()), self._stop_join_string)
+        self._exp_queue = self._get_new_expansion_queue(len(self._data_munger.get_unique_stops_to_solve()))
         if len(self._progress_dict) > 0:
             self._exp_queue.add(self._progress_dict.keys())
 
+        # Progress through the search can only be estimated when nodes are expanded in order of remaining stops
+        estimate_progress = self._expansion_strategy.bucket_by_remaining_stops
         num_stations = len(self._data_munger.get_unique_stops_to_solve())
         num_start_points = self._exp_queue.len()
         num_completed_stations = 0
@@ -100,20 +148,22 @@ class Traverser(Solver):
         num_expansions = 0
         while not self._exp_queue.is_empty():
             num_expansions += 1
-            if self._exp_queue._num_remaining_stops_to_pop == num_stations:
+            if estimate_progress and self._exp_queue._num_remaining_stops_to_pop == num_stations:
                 num_completed_stations = min(num_initial_start_points - 1, num_initial_start_points - num_start_points)
                 num_start_points = max(num_start_points - 1, 0)
             expandee = self._exp_queue.pop(self._progress_dict)
             known_best_time = self._expand(expandee, known_best_time)
             if known_best_time is not None:
-                if int((num_stations * num_completed_stations +
-                        self._exp_queue._num_remaining_stops_to_pop) / stations_denominator * 100.0) > best_progress:
+                if estimate_progress and int((num_stations * num_completed_stations +
+                                              self._exp_queue._num_remaining_stops_to_pop) /
+                                             stations_denominator * 100.0) > best_progress:
                     best_progress = int((num_stations * num_completed_stations +
                                          self._exp_queue._num_remaining_stops_to_pop) / stations_denominator * 100.0)
-                    print(best_progress, datetime.now() - self._initialization_time, self._exp_queue.len(),
-                          len(self._progress_dict), len(self.prunable_nodes()))
+                    self._announce_progress(best_progress)
                 if num_expansions % self._expansions_to_prune == 0:
                     num_expansions = 0
+                    if not estimate_progress:
+                        self._announce_progress()
                     self.prune_progress_dict()
 
         return known_best_time, self._progress_dict, self._start_time
@@ -0,0 +1,79 @@
+import math
+
+from gtfs_traversal.stop_grid import EARTH_RADIUS_MILES
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class WalkTimeEngine:
+    # Computes the same haversine walk times as Solver._walk_time_seconds, but from one stop to many stops at once.
+    #  NumPy is used when it is installed; otherwise, walk times are computed one at a time in pure Python.
+    def __init__(self, stop_locations, walk_speed_mph, use_numpy=None):
+        self._use_numpy = numpy is not None if use_numpy is None else use_numpy
+        if self._use_numpy and numpy is None:
+            raise ImportError("NumPy is required to compute vectorized walk times")
+        self._stop_locations = stop_locations
+        self._walk_speed_mph = walk_speed_mph
+
+        self._indices = {stop: index for index, stop in enumerate(stop_locations.keys())}
+        lats = [self._to_radians_from_degrees(coordinates.lat) for coordinates in stop_locations.values()]
+        longs = [self._to_radians_from_degrees(coordinates.long) for coordinates in stop_locations.values()]
+        if self._use_numpy:
+            self._lats = numpy.array(lats)
+            self._longs = numpy.array(longs)
+            self._cos_lats = numpy.cos(self._lats)
+        else:
+            self._lats = lats
+            self._longs = longs
+            self._cos_lats = [math.cos(lat) for lat in lats]
+
+    def _seconds_from_haversine(self, haversine):
+        return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(min(1, haversine))) * 3600 / self._walk_speed_mph
+
+    def _seconds_from_haversines(self, haversines):
+        return (2 * EARTH_RADIUS_MILES * numpy.arcsin(numpy.sqrt(numpy.minimum(1, haversines))) * 3600 /
+                self._walk_speed_mph).tolist()
+
+    @staticmethod
+    def _to_radians_from_degrees(degrees):
+        return degrees * math.pi / 180
+
+    def walk_times_from(self, origin_coordinates, stops):
+        # Returns the walk time, in seconds, from origin_coordinates to each of stops, in order
+        origin_lat = self._to_radians_from_degrees(origin_coordinates.lat)
+        origin_long = self._to_radians_from_degrees(origin_coordinates.long)
+        cos_origin_lat = math.cos(origin_lat)
+
+        if self._use_numpy:
+            indices = numpy.fromiter((self._indices[stop] for stop in stops), dtype=numpy.intp, count=len(stops))
+            haversines = numpy.sin((origin_lat - self._lats[indices]) / 2) ** 2 + \
+                cos_origin_lat * self._cos_lats[indices] * numpy.sin((origin_long - self._longs[indices]) / 2) ** 2
+            return self._seconds_from_haversines(haversines)
+
+        walk_times = []
+        for stop in stops:
+            index = self._indices[stop]
+            haversine = math.pow(math.sin((origin_lat - self._lats[index]) / 2), 2) + \
+                cos_origin_lat * self._cos_lats[index] * math.pow(math.sin((origin_long - self._longs[index]) / 2), 2)
+            walk_times.append(self._seconds_from_haversine(haversine))
+        return walk_times
+
+    def walk_time_matrix(self, origin_stops, destination_stops):
+        # Returns a list of rows of walk times, in seconds, from each of origin_stops to each of destination_stops
+        if self._use_numpy:
+            origins = numpy.fromiter((self._indices[stop] for stop in origin_stops), dtype=numpy.intp,
+                                     count=len(origin_stops))
+            destinations = numpy.fromiter((self._indices[stop] for stop in destination_stops), dtype=numpy.intp,
+                                          count=len(destination_stops))
+            origin_lats = self._lats[origins][:, numpy.newaxis]
+            origin_longs = self._longs[origins][:, numpy.newaxis]
+            origin_cos_lats = self._cos_lats[origins][:, numpy.newaxis]
+            haversines = numpy.sin((origin_lats - self._lats[destinations]) / 2) ** 2 + \
+                origin_cos_lats * self._cos_lats[destinations] * \
+                numpy.sin((origin_longs - self._longs[destinations]) / 2) ** 2
+            return self._seconds_from_haversines(haversines)
+
+        return [self.walk_times_from(self._stop_locations[stop], destination_stops) for stop in origin_stops]
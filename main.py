@@ -2,60 +2,74 @@ if __name__ == "__main__":
     from datetime import datetime, timedelta
 
     import gtfs_parsing.analyses.analyses as gtfs_analyses
-    from gtfs_parsing.data_structures.data_structures import gtfsSchedules, uniqueRouteInfo
+    from gtfs_traversal.expansion_strategy import DEPTH_FIRST_BY_STOPS
     from gtfs_traversal.read_data import *
     from gtfs_traversal.traverser import Traverser
 
+    EXPANSION_STRATEGY = DEPTH_FIRST_BY_STOPS
+    INTERN_NODE_IDS = True
     STOP_JOIN_STRING = '~~'
     TRANSFER_ROUTE = 'transfer'
     TRANSFER_DURATION_SECONDS = 60
+    UNVISITED_STOPS_AS_BITMASK = True
     WALK_ROUTE = 'walk between stations'
     WALK_SPEED_MPH = 4.5
-    MAX_WALK_NODES = 2
+    # Set FOOTPATH_RADIUS_SECONDS to take walking candidates from a footpath graph of stops within that many seconds
+    #  of each other, rather than from stop coordinates during the search.  That is faster, but drops longer walks,
+    #  which can change the solution.  Set MAX_FOOTPATHS_PER_STOP as well to only walk to that many of the nearest
+    #  walkable stops, which can miss the fastest solution too.
+    FOOTPATH_RADIUS_SECONDS = None
+    MAX_FOOTPATHS_PER_STOP = None
+    # Raises remaining time bounds to the weight of a minimum spanning tree over the unvisited stops, using a matrix
+    #  of travel times between solution stops that is cached in TRAVEL_TIME_MATRIX_FILE_NAME
+    MINIMUM_SPANNING_TREE_BOUND = True
+    TRAVEL_TIME_MATRIX_FILE_NAME = 'data/travel_time_matrix.bin'
+    # Minimum spanning tree weights are cached for this many of the most recently seen sets of unvisited stops
+    MINIMUM_SPANNING_TREE_CACHE_SIZE = 100000
+    # Remaining time bounds are cached for this many of the most recently seen sets of unvisited stops
+    BOUND_CACHE_SIZE = 1000000
+    # Derives each remaining time bound from the bound before the stops that were just visited were visited
+    INCREMENTAL_BOUND = True
+    # Departure times are cached for this many of the most recently seen (day, departure) pairs
+    TRIP_TIME_CACHE_SIZE = 100000
+    TRANSFERS_FILE_NAME = 'transfers.txt'
+    # The parsed feed and its compiled timetable are cached in this file in the data folder; set to None to parse the
+    #  feed on every run
+    NETWORK_CACHE_FILE_NAME = 'network_cache.pickle'
+    SPATIAL_WALKING_INDEX = True
+    VECTORIZED_WALK_TIMES = True
     MAX_EXPANSION_QUEUE = 2500000
     MAX_PROGRESS_DICT = 3000000
 
     analyses = gtfs_analyses.determine_analysis_parameters(load_configuration())
     analysis = analyses[1]
 
-    data = read_data(analysis, "data")
+    network = read_network(analysis, "data", NETWORK_CACHE_FILE_NAME)
+    data = network.data
+    transfers = read_transfers("data", TRANSFERS_FILE_NAME)
 
     start_date_midnight = datetime.strptime(analysis.start_date, '%Y-%m-%d')
     start_time = start_date_midnight + timedelta(seconds=0)
     # must analyze all start times in completely separate trees because trip durations change throughout the day
     end_date_midnight = datetime.strptime(analysis.end_date, '%Y-%m-%d') + timedelta(days=1)
 
-    def remove_trips_that_do_not_operate_within_analysis_timeframe(raw_data):
-        all_trips = set()
-        all_stops = set()
-        for day, trips in raw_data.dateTrips.items():
-            all_trips = all_trips.union(trips)
-        for trip in all_trips:
-            all_stops = all_stops.union(set(s.stopId for s in data.tripSchedules[trip].tripStops.values()))
-
-        new_data = gtfsSchedules(
-            tripSchedules={trip_id: trip_info for trip_id, trip_info in raw_data.tripSchedules.items() if
-                           trip_id in all_trips},
-            dateTrips=raw_data.dateTrips,
-            uniqueRouteTrips={route_id: uniqueRouteInfo(tripIds=[t for t in route_info.tripIds if t in all_trips],
-                                                        routeInfo=route_info.routeInfo)
-                              for route_id, route_info in raw_data.uniqueRouteTrips.items()
-                              if any(t in all_trips for t in route_info.tripIds)},
-            stopLocations={stop_id: location for stop_id, location in data.stopLocations.items()
-                           if stop_id in all_stops},
-        )
-        return new_data
-
-    data = remove_trips_that_do_not_operate_within_analysis_timeframe(data)
-
     traverser = Traverser(end_date=analysis.end_date, route_types_to_solve=analysis.route_types, stops_to_solve=None,
                           data=data, progress_between_pruning_progress_dict=10000, prune_thoroughness=.001,
                           stop_join_string=STOP_JOIN_STRING, transfer_duration_seconds=TRANSFER_DURATION_SECONDS,
-                          transfer_route=TRANSFER_ROUTE, walk_route=WALK_ROUTE, walk_speed_mph=WALK_SPEED_MPH)
+                          transfer_route=TRANSFER_ROUTE, walk_route=WALK_ROUTE, walk_speed_mph=WALK_SPEED_MPH,
+                          unvisited_stops_as_bitmask=UNVISITED_STOPS_AS_BITMASK, expansion_strategy=EXPANSION_STRATEGY,
+                          intern_node_ids=INTERN_NODE_IDS, spatial_walking_index=SPATIAL_WALKING_INDEX,
+                          vectorized_walk_times=VECTORIZED_WALK_TIMES, footpath_radius_seconds=FOOTPATH_RADIUS_SECONDS,
+                          max_footpaths_per_stop=MAX_FOOTPATHS_PER_STOP, transfers=transfers,
+                          travel_time_matrix_file=TRAVEL_TIME_MATRIX_FILE_NAME,
+                          minimum_spanning_tree_bound=MINIMUM_SPANNING_TREE_BOUND, bound_cache_size=BOUND_CACHE_SIZE,
+                          incremental_bound=INCREMENTAL_BOUND, trip_time_cache_size=TRIP_TIME_CACHE_SIZE,
+                          timetable=network.timetable,
+                          minimum_spanning_tree_cache_size=MINIMUM_SPANNING_TREE_CACHE_SIZE)
 
     # end_date_midnight
     best_time = None
-    best_progress_dictionary = None
+    best_solution_paths = None
     best_start_time = None
     # start_time = datetime(year=2018, month=10, day=13, hour=22, minute=25)
     while start_time < end_date_midnight:
@@ -65,7 +79,7 @@ if __name__ == "__main__":
         assert new_best_time is not None
         if best_time is None or new_best_time < best_time:
             best_time = new_best_time
-            best_progress_dictionary = new_best_progress_dictionary.copy()
+            best_solution_paths = traverser.solution_paths(new_best_progress_dictionary)
             best_start_time = earliest_departure_time
 
         if earliest_departure_time is None:
@@ -75,5 +89,10 @@ if __name__ == "__main__":
 
     print('best start time:', best_start_time)
     print('best time:', best_time)
-    traverser.print_path(best_progress_dictionary)
+    print('expansions:', traverser.num_expansions(),
+          'with minimum spanning tree bound' if MINIMUM_SPANNING_TREE_BOUND else 'with adjacent stop bound')
+    print('bound cache:', traverser.bound_cache_stats())
+    print('minimum spanning tree cache:', traverser.minimum_spanning_tree_cache_stats())
+    print('trip time cache:', traverser.trip_time_cache_stats())
+    traverser.print_solution_paths(best_solution_paths)
     print("finished successfully.")
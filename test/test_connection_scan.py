@@ -0,0 +1,111 @@
+import unittest
+
+from gtfs_traversal.connection_scan import ConnectionScan
+from gtfs_traversal.timetable import Timetable
+
+
+class TestConnectionScan(unittest.TestCase):
+    def test_connections(self):
+        subject = create_subject()
+        self.assertEqual(len(subject), 6)
+
+        actual = list(subject.connections())
+        self.assertEqual(actual[0], (6 * 3600, 7 * 3600, 'red-6AM', 'A', 'B'))
+        self.assertEqual(actual[-1], (9 * 3600, 10 * 3600, 'blue-9AM', 'B', 'D'))
+        self.assertEqual([connection[0] for connection in actual], sorted(connection[0] for connection in actual))
+        self.assertEqual(list(subject.connections(reverse=True)), list(reversed(actual)))
+
+    def test_earliest_arrivals(self):
+        def test_rides_and_transfers():
+            subject = create_subject()
+            expected = {'A': 6 * 3600, 'B': 7 * 3600, 'C': 8 * 3600, 'D': 8 * 3600 + 30 * 60}
+            self.assertDictEqual(expected, subject.earliest_arrivals('A', 6 * 3600))
+
+        def test_departs_after_departure_time():
+            subject = create_subject()
+            expected = {'A': 6 * 3600 + 1, 'B': 8 * 3600, 'C': 9 * 3600, 'D': 10 * 3600}
+            self.assertDictEqual(expected, subject.earliest_arrivals('A', 6 * 3600 + 1))
+
+        def test_transfer_seconds():
+            subject = create_subject()
+            expected = {'A': 6 * 3600, 'B': 7 * 3600, 'C': 8 * 3600, 'D': 10 * 3600}
+            self.assertDictEqual(expected, subject.earliest_arrivals('A', 6 * 3600, transfer_seconds=30 * 60 + 1))
+
+        def test_stays_on_trip_without_transfer():
+            subject = create_subject()
+            actual = subject.earliest_arrivals('A', 6 * 3600, transfer_seconds=24 * 3600)
+            self.assertEqual(actual['C'], 8 * 3600)
+            self.assertNotIn('D', actual)
+
+        def test_footpaths():
+            subject = create_subject()
+            footpaths = {'C': [('E', 600)], 'A': [('F', 60)]}
+            actual = subject.earliest_arrivals('A', 6 * 3600, footpaths=footpaths)
+            self.assertEqual(actual['E'], 8 * 3600 + 600)
+            self.assertEqual(actual['F'], 6 * 3600 + 60)
+
+            # Walks after riding start after a transfer
+            actual = subject.earliest_arrivals('A', 6 * 3600, transfer_seconds=60, footpaths=footpaths)
+            self.assertEqual(actual['E'], 8 * 3600 + 60 + 600)
+
+        def test_transfer_seconds_after_walking():
+            subject = create_subject()
+            footpaths = {'A': [('B', 60)]}
+            actual = subject.earliest_arrivals('A', 7 * 3600, footpaths=footpaths)
+            self.assertEqual(actual['D'], 8 * 3600 + 30 * 60)
+
+            actual = subject.earliest_arrivals('A', 7 * 3600, transfer_seconds=29 * 60 + 1, footpaths=footpaths)
+            self.assertEqual(actual['B'], 7 * 3600 + 60)
+            self.assertEqual(actual['D'], 10 * 3600)
+
+        def test_unknown_origin():
+            subject = create_subject()
+            self.assertDictEqual({'Z': 0}, subject.earliest_arrivals('Z', 0))
+
+        def test_footpaths_from_origin_without_connections():
+            subject = create_subject()
+            actual = subject.earliest_arrivals('Z', 7 * 3600, footpaths={'Z': [('B', 60)]})
+            self.assertEqual(actual['B'], 7 * 3600 + 60)
+            self.assertEqual(actual['D'], 8 * 3600 + 30 * 60)
+
+        test_rides_and_transfers()
+        test_departs_after_departure_time()
+        test_transfer_seconds()
+        test_stays_on_trip_without_transfer()
+        test_footpaths()
+        test_transfer_seconds_after_walking()
+        test_unknown_origin()
+        test_footpaths_from_origin_without_connections()
+
+    def test_earliest_arrivals_from(self):
+        subject = create_subject()
+        footpaths = {'Z': [('B', 60)]}
+        actual = subject.earliest_arrivals_from(['A', 'B', 'Z'], 7 * 3600, transfer_seconds=60, footpaths=footpaths)
+        for origin in ['A', 'B', 'Z']:
+            self.assertDictEqual(actual[origin], subject.earliest_arrivals(origin, 7 * 3600, transfer_seconds=60,
+                                                                           footpaths=footpaths))
+
+
+def create_subject():
+    trip_schedules = {
+        'red-6AM': MockTripInfo([('A', '6:00:00'), ('B', '7:00:00'), ('C', '8:00:00')]),
+        'red-7AM': MockTripInfo([('A', '7:00:00'), ('B', '8:00:00'), ('C', '9:00:00')]),
+        'blue-7AM': MockTripInfo([('B', '7:30:00'), ('D', '8:30:00')]),
+        'blue-9AM': MockTripInfo([('B', '9:00:00'), ('D', '10:00:00')]),
+        'single-stop': MockTripInfo([('D', '11:00:00')]),
+    }
+    return ConnectionScan(trip_schedules, Timetable(trip_schedules))
+
+
+class MockTripInfo:
+    def __init__(self, stop_departures):
+        self.tripStops = {
+            str(stop_number): MockStopDeparture(stop_id, departure_time)
+            for stop_number, (stop_id, departure_time) in enumerate(stop_departures, 1)
+        }
+
+
+class MockStopDeparture:
+    def __init__(self, stop_id, departure_time):
+        self.stopId = stop_id
+        self.departureTime = departure_time
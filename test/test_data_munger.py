@@ -2,6 +2,8 @@ import unittest
 from unittest.mock import patch
 from datetime import datetime, timedelta
 from gtfs_traversal.data_munger import DataMunger
+from gtfs_traversal.data_structures import CacheStats
+from gtfs_traversal.timetable import Timetable
 
 
 DEFAULT_START_DATE = '2020-01-01'
@@ -75,9 +77,42 @@ class TestDataMunger(unittest.TestCase):
                     expected_18)
                 self.assertEqual(subject.first_trip_after(DEFAULT_START_TIME, 3, 'Wonderland'), expected_blue)
 
+        def test_handles_service_after_midnight():
+            subject = self.get_subject_with_mock_data(end_date='2020-01-02', route_types_to_solve=[2])
+            subject.data.tripSchedules['3-8AM'] = MockTripInfo(3, 'Alewife', 'Wonderland', 'Back of the Hill', 22)
+
+            expected = DEFAULT_START_TIME + timedelta(hours=25), '3-8AM'
+
+            self.assertEqual(subject.first_trip_after(DEFAULT_START_TIME + timedelta(hours=10.01), 1, 'Wonderland'),
+                             expected)
+            self.assertEqual(subject.first_trip_after(DEFAULT_START_TIME + timedelta(hours=25.01), 1, 'Wonderland'),
+                             (DEFAULT_START_TIME + timedelta(hours=33), '3-6AM'))
+
+        def test_returns_none_after_buffered_end_of_analysis():
+            subject = self.get_subject_with_mock_data(**create_mock_analysis())
+            subject.data.tripSchedules['3-8AM'] = MockTripInfo(3, 'Alewife', 'Wonderland', 'Back of the Hill', 22)
+
+            self.assertEqual(subject.first_trip_after(DEFAULT_START_TIME + timedelta(hours=10.01), 1, 'Wonderland'),
+                             (None, None))
+
+        def test_bounds_trip_time_cache():
+            subject = DataMunger(data=MockData(), stop_join_string=None, stops_to_solve=None, trip_time_cache_size=1,
+                                 **create_mock_analysis())
+            expected = DEFAULT_START_TIME + timedelta(hours=6), '3-6AM'
+
+            self.assertEqual(subject.first_trip_after(DEFAULT_START_TIME + timedelta(hours=5), 1, 'Alewife'), expected)
+            self.assertEqual(subject.first_trip_after(DEFAULT_START_TIME + timedelta(hours=6), 1, 'Alewife'), expected)
+            self.assertEqual(subject.get_trip_time_cache_stats(), CacheStats(hits=1, misses=1, size=1, max_size=1))
+
+            subject.first_trip_after(DEFAULT_START_TIME + timedelta(hours=7.99), 2, 'Heath Street')
+            self.assertEqual(subject.get_trip_time_cache_stats().size, 1)
+
         test_returns_correct_trip()
         test_returns_none_after_last_trip_of_day()
+        test_bounds_trip_time_cache()
         test_returns_none_for_last_stop_on_route()
+        test_handles_service_after_midnight()
+        test_returns_none_after_buffered_end_of_analysis()
         test_caches()
 
     def test_get_datetime_from_raw_string_time(self):
@@ -112,6 +147,25 @@ class TestDataMunger(unittest.TestCase):
         test_handles_after_noon()
         test_handles_after_midnight()
 
+    def test_get_departures_from_stop(self):
+        def test_sorts_departures():
+            subject = self.get_subject_with_mock_data(**create_mock_analysis())
+            subject.data.uniqueRouteTrips[1].tripIds = ['3-8AM', '3-6AM', '3-7AM']
+
+            expected_departure_seconds = [9 * 60 * 60, 10 * 60 * 60, 11 * 60 * 60]
+            expected_trip_ids = ('3-6AM', '3-7AM', '3-8AM')
+            actual_departure_seconds, actual_trip_ids = subject.get_departures_from_stop(1, '2')
+            self.assertListEqual(expected_departure_seconds, list(actual_departure_seconds))
+            self.assertEqual(expected_trip_ids, actual_trip_ids)
+
+        def test_memoizes():
+            subject = self.get_blank_subject()
+            subject._departures_by_route_stop[(1, '2')] = 'some result'
+            self.assertEqual('some result', subject.get_departures_from_stop(1, '2'))
+
+        test_sorts_departures()
+        test_memoizes()
+
     def test_get_minimum_remaining_time(self):
         subject = self.get_subject_with_mock_data(**create_mock_analysis(route_types_to_solve=[1, 2]))
         unvisited_stops = ['Wonderland', 'Back of the Hill', 'Lynn', 'Heath Street']
@@ -119,6 +173,17 @@ class TestDataMunger(unittest.TestCase):
         actual = subject.get_minimum_remaining_time(unvisited_stops, DEFAULT_START_TIME)
         self.assertEqual(expected, actual)
 
+    def test_get_minimum_remaining_time_after_visiting(self):
+        subject = self.get_subject_with_mock_data(**create_mock_analysis(route_types_to_solve=[1, 2]))
+        unvisited_stops = ['Wonderland', 'Back of the Hill', 'Lynn', 'Heath Street']
+        minimum_remaining_time = subject.get_minimum_remaining_time(unvisited_stops, DEFAULT_START_TIME)
+        for visited_stops in [['Wonderland'], ['Back of the Hill', 'Heath Street'], unvisited_stops]:
+            new_unvisited_stops = {stop for stop in unvisited_stops if stop not in visited_stops}
+            expected = subject.get_minimum_remaining_time(new_unvisited_stops, DEFAULT_START_TIME)
+            actual = subject.get_minimum_remaining_time_after_visiting(
+                minimum_remaining_time, visited_stops, new_unvisited_stops.__contains__, DEFAULT_START_TIME)
+            self.assertEqual(expected, actual)
+
     def test_get_minimum_remaining_transfers(self):
         subject = self.get_subject_with_mock_data(**create_mock_analysis(route_types_to_solve=[1, 2]))
         unvisited_stops = ['Alewife', 'Wonderland', 'Lechmere', 'Back of the Hill', 'Heath Street']
@@ -127,6 +192,37 @@ class TestDataMunger(unittest.TestCase):
         actual = subject.get_minimum_remaining_transfers(current_route, unvisited_stops)
         self.assertEqual(expected, actual)
 
+    def test_get_num_single_solution_routes_after_visiting(self):
+        subject = self.get_subject_with_mock_data(**create_mock_analysis(route_types_to_solve=[1, 2]))
+        unvisited_stops = ['Alewife', 'Wonderland', 'Lechmere', 'Back of the Hill', 'Heath Street']
+        num_single_solution_routes = subject.get_num_single_solution_routes(unvisited_stops)
+        for visited_stops in [['Alewife'], ['Alewife', 'Wonderland'], ['Heath Street'], unvisited_stops]:
+            new_unvisited_stops = {stop for stop in unvisited_stops if stop not in visited_stops}
+            expected = subject.get_num_single_solution_routes(new_unvisited_stops)
+            actual = subject.get_num_single_solution_routes_after_visiting(
+                num_single_solution_routes, visited_stops, new_unvisited_stops.__contains__)
+            self.assertEqual(expected, actual)
+
+    def test_get_minimum_route_legs(self):
+        def test_calculates_correct_result():
+            subject = self.get_subject_with_mock_data()
+
+            expected = {
+                1: {('Alewife', 'Wonderland'): 3 * 60 * 60, ('Wonderland', 'Back of the Hill'): 60 * 60},
+                2: {('Heath Street', 'Lechmere'): 3 * 60 * 60, ('Lechmere', 'Back of the Hill'): 60 * 60},
+                3: {('Wonderland', 'Bowdoin'): 3 * 60 * 60, ('Bowdoin', 'Lynn'): 60 * 60},
+            }
+            self.assertDictEqual(expected, subject.get_minimum_route_legs())
+
+        def test_memoizes():
+            subject = self.get_blank_subject()
+            expected = 'some result'
+            subject._minimum_route_legs = expected
+            self.assertEqual(expected, subject.get_minimum_route_legs())
+
+        test_calculates_correct_result()
+        test_memoizes()
+
     def test_get_minimum_stop_times(self):
         def test_calculates_correct_result():
             subject = self.get_subject_with_mock_data(**create_mock_analysis(route_types_to_solve=[1, 2]))
@@ -196,32 +292,35 @@ class TestDataMunger(unittest.TestCase):
         test_munges_correctly()
         test_memoizes()
 
-    def test_get_routes_by_stop(self):
-        def test_munges_correctly():
-            subject = self.get_subject_with_mock_data()
-            self.assertEqual(subject._location_routes, None)
-
-            expected = {
-                'Alewife': {1},
-                'Wonderland': {1, 3},
-                'Back of the Hill': {1, 2},
-                'Heath Street': {2},
-                'Lechmere': {2},
-                'Bowdoin': {3},
-                'Lynn': {3},
-            }
-            actual = subject.get_routes_by_stop()
-
-            self.assertEqual(expected, actual)
+    def test_get_route_network(self):
+        def test_compiles_routes():
+            subject = self.get_subject_with_mock_data(**create_mock_analysis(route_types_to_solve=[1, 2]))
+            actual = subject.get_route_network()
+            self.assertEqual('Wonderland', actual.next_stop('Alewife', 1))
+            self.assertEqual('Alewife', actual.previous_stop('Wonderland', 1))
+            self.assertEqual(frozenset({1, 2}), actual.solution_routes_at_stop('Back of the Hill'))
 
         def test_memoizes():
             subject = self.get_blank_subject()
             expected = 'some result'
-            subject._location_routes = expected
-            self.assertEqual(expected, subject.get_routes_by_stop())
+            subject._route_network = expected
+            self.assertEqual(expected, subject.get_route_network())
 
+        test_compiles_routes()
         test_memoizes()
-        test_munges_correctly()
+
+    def test_get_routes_at_stop(self):
+        subject = self.get_subject_with_mock_data(**create_mock_analysis())
+        expected = {
+            'Alewife': {1},
+            'Wonderland': {1, 3},
+            'Back of the Hill': {1, 2},
+            'Heath Street': {2},
+            'Lechmere': {2},
+            'Bowdoin': {3},
+            'Lynn': {3},
+        }
+        self.assertEqual(expected, {stop: set(subject.get_routes_at_stop(stop)) for stop in expected})
 
     def test_get_solution_routes_by_stop(self):
         subject = self.get_subject_with_mock_data(**create_mock_analysis())
@@ -229,6 +328,60 @@ class TestDataMunger(unittest.TestCase):
         self.assertSetEqual({2}, subject.get_solution_routes_at_stop('Heath Street'))
         self.assertSetEqual(set(), subject.get_solution_routes_at_stop('Bowdoin'))
 
+    def test_get_stop_ids_by_route_stop_number(self):
+        def test_munges_correctly():
+            subject = self.get_subject_with_mock_data(**create_mock_analysis())
+            actual = subject.get_stop_ids_by_route_stop_number()
+
+            self.assertEqual(len(actual), 9)
+            self.assertEqual(actual[(1, '1')], 'Alewife')
+            self.assertEqual(actual[(2, '2')], 'Lechmere')
+            self.assertEqual(actual[(3, '3')], 'Lynn')
+
+        def test_memoizes():
+            subject = self.get_blank_subject()
+            expected = 'some result'
+            subject._stop_ids_by_route_stop_number = expected
+            self.assertEqual(expected, subject.get_stop_ids_by_route_stop_number())
+
+        test_munges_correctly()
+        test_memoizes()
+
+    def test_get_stop_numbers_from_stop_id(self):
+        def test_returns_every_visit_to_stop():
+            subject = self.get_subject_with_mock_data(**create_mock_analysis())
+            for trip_id in subject.get_trips_for_route(1):
+                subject.data.tripSchedules[trip_id] = MockTripInfo(3, 'Alewife', 'Wonderland', 'Alewife',
+                                                                   int(trip_id[2]))
+
+            self.assertEqual(('1', '3'), subject.get_stop_numbers_from_stop_id('Alewife', 1))
+            self.assertEqual('1', subject.get_stop_number_from_stop_id('Alewife', 1))
+            self.assertEqual(('2',), subject.get_stop_numbers_from_stop_id('Wonderland', 1))
+            self.assertEqual((DEFAULT_START_TIME + timedelta(hours=7), '3-7AM'),
+                             subject.first_trip_after(DEFAULT_START_TIME + timedelta(hours=6.01), 1, 'Alewife'))
+            self.assertEqual((None, None),
+                             subject.first_trip_after_stop_number(DEFAULT_START_TIME, 1, '3'))
+
+        def test_returns_visits_in_trip_order():
+            subject = self.get_subject_with_mock_data(**create_mock_analysis())
+            for trip_id in subject.get_trips_for_route(1):
+                trip_info = MockTripInfo(3, 'Alewife', 'Wonderland', 'Alewife', int(trip_id[2]))
+                trip_info.tripStops = dict(reversed(list(trip_info.tripStops.items())))
+                subject.data.tripSchedules[trip_id] = trip_info
+
+            self.assertEqual(('1', '3'), subject.get_stop_numbers_from_stop_id('Alewife', 1))
+            self.assertEqual('1', subject.get_stop_number_from_stop_id('Alewife', 1))
+            self.assertEqual('Wonderland', subject.get_next_stop_id('Alewife', 1))
+
+        def test_raises_for_stop_not_on_route():
+            subject = self.get_subject_with_mock_data(**create_mock_analysis())
+            with self.assertRaises(ValueError):
+                subject.get_stop_numbers_from_stop_id('Lynn', 1)
+
+        test_returns_every_visit_to_stop()
+        test_returns_visits_in_trip_order()
+        test_raises_for_stop_not_on_route()
+
     def test_get_stops_by_route_in_solution_set(self):
         def test_returns_correct_result():
             subject = self.get_subject_with_mock_data(**create_mock_analysis(route_types_to_solve=[1, 2]))
@@ -263,6 +416,29 @@ class TestDataMunger(unittest.TestCase):
         test_finds_midpoint_and_endpoint_transfers()
         test_memoizes()
 
+    def test_get_timetable(self):
+        def test_compiles_trip_schedules():
+            subject = self.get_subject_with_mock_data(**create_mock_analysis())
+            actual = subject.get_timetable()
+            self.assertIsInstance(actual, Timetable)
+            self.assertEqual(len(subject.get_trip_schedules()), len(actual))
+
+        def test_memoizes():
+            subject = self.get_blank_subject()
+            expected = 'some result'
+            subject._timetable = expected
+            self.assertEqual(expected, subject.get_timetable())
+
+        def test_uses_compiled_timetable():
+            timetable = Timetable(MockData().tripSchedules)
+            subject = DataMunger(data=MockData(), stop_join_string=None, stops_to_solve=None, timetable=timetable,
+                                 **create_mock_analysis())
+            self.assertIs(timetable, subject.get_timetable())
+
+        test_compiles_trip_schedules()
+        test_memoizes()
+        test_uses_compiled_timetable()
+
     def test_get_travel_time_between_stops(self):
         subject = self.get_subject_with_mock_data(**create_mock_analysis(route_types_to_solve=[1, 2]))
 
@@ -288,7 +464,6 @@ class TestDataMunger(unittest.TestCase):
     def test_get_unique_stops_to_solve(self):
         def test_returns_correct_result():
             subject = self.get_subject_with_mock_data(**create_mock_analysis(route_types_to_solve=[1, 2]))
-            self.assertEqual(subject._location_routes, None)
             expected = {'Alewife', 'Wonderland', 'Heath Street', 'Lechmere', 'Bowdoin', 'Back of the Hill', 'Lynn'}
             self.assertSetEqual(expected, subject.get_unique_stops_to_solve())
 
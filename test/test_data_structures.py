@@ -0,0 +1,37 @@
+import unittest
+
+from gtfs_traversal.data_structures import ProgressInfo
+
+
+class TestProgressInfo(unittest.TestCase):
+    def test_is_mutable(self):
+        subject = create_progress_info()
+        subject.eliminated = True
+        self.assertTrue(subject.eliminated)
+        with self.assertRaises(AttributeError):
+            subject.not_a_field = True
+
+    def test_is_not_hashable(self):
+        with self.assertRaises(TypeError):
+            hash(create_progress_info())
+
+    def test_replace(self):
+        def test_returns_new_record():
+            subject = create_progress_info()
+            actual = subject._replace(duration=5)
+            self.assertEqual(actual.duration, 5)
+            self.assertEqual(subject.duration, 1)
+            self.assertEqual(actual.arrival_trip, 'trip')
+
+        def test_equality():
+            subject = create_progress_info()
+            self.assertEqual(subject, subject._replace())
+            self.assertNotEqual(subject, subject._replace(expanded=True))
+
+        test_returns_new_record()
+        test_equality()
+
+
+def create_progress_info():
+    return ProgressInfo(duration=1, arrival_trip='trip', trip_stop_no='1', parent=None, children=None,
+                        minimum_remaining_time=2, expanded=False, eliminated=False)
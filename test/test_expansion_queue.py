@@ -21,6 +21,19 @@ class TestExpansionQueue(unittest.TestCase):
         self.assertDictEqual(expected_queue, actual_queue)
         self.assertEqual(expected_stop_to_pop, actual_stop_to_pop)
 
+    def test_add_bitmask_nodes(self):
+        location_a = LocationStatusInfo(location='a', arrival_route=None, unvisited=0b1)
+        location_b = LocationStatusInfo(location='b', arrival_route=None, unvisited=0b101)
+        location_c = LocationStatusInfo(location='c', arrival_route=None, unvisited=0)
+        subject = ExpansionQueue(num_solution_stops=3, stop_join_string="~~")
+        subject.add([location_a, location_b, location_c])
+        expected_queue = {
+            1: {location_a},
+            2: {location_b},
+        }
+        self.assertDictEqual(expected_queue, subject._queue)
+        self.assertEqual(1, subject._num_remaining_stops_to_pop)
+
     def test_is_empty(self):
         location_a = LocationStatusInfo(location='a', arrival_route=None, unvisited="~~a~~")
         subject = ExpansionQueue(num_solution_stops=2, stop_join_string="~~")
@@ -0,0 +1,25 @@
+import unittest
+
+from gtfs_traversal.data_structures import ProgressInfo
+from gtfs_traversal.expansion_strategy import A_STAR, DEPTH_FIRST_BY_STOPS, weighted_a_star
+
+
+def progress_info(duration, minimum_remaining_time):
+    return ProgressInfo(arrival_trip=None, duration=duration, trip_stop_no=None, expanded=None, eliminated=None,
+                        children=None, parent=None, minimum_remaining_time=minimum_remaining_time)
+
+
+class TestExpansionStrategy(unittest.TestCase):
+    def test_a_star(self):
+        self.assertEqual(A_STAR.key(progress_info(100, 30)), 130)
+        self.assertFalse(A_STAR.bucket_by_remaining_stops)
+
+    def test_depth_first_by_stops(self):
+        self.assertEqual(DEPTH_FIRST_BY_STOPS.key(progress_info(100, 30)), 100)
+        self.assertTrue(DEPTH_FIRST_BY_STOPS.bucket_by_remaining_stops)
+
+    def test_weighted_a_star(self):
+        subject = weighted_a_star(3)
+        self.assertEqual(subject.key(progress_info(100, 30)), 190)
+        self.assertFalse(subject.bucket_by_remaining_stops)
+        self.assertIn('3', subject.name)
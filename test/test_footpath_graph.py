@@ -0,0 +1,50 @@
+import unittest
+
+from gtfs_traversal.data_structures import EarthLocation, TransferInfo
+from gtfs_traversal.footpath_graph import FootpathGraph
+
+
+class TestFootpathGraph(unittest.TestCase):
+    def test_footpaths_from(self):
+        def test_within_radius():
+            subject = FootpathGraph(create_mock_stop_locations(), walk_speed_mph=3, max_walk_seconds=30 * 60)
+            actual = subject.footpaths_from('Alewife')
+            self.assertListEqual(['Davis', 'Porter'], [stop for stop, _ in actual])
+            self.assertTrue(all(isinstance(walk_seconds, int) for _, walk_seconds in actual))
+            self.assertLess(actual[0][1], actual[1][1])
+            self.assertEqual(6, len(subject))
+
+        def test_max_footpaths_per_stop():
+            subject = FootpathGraph(create_mock_stop_locations(), walk_speed_mph=3, max_walk_seconds=30 * 60,
+                                    max_footpaths_per_stop=1)
+            self.assertListEqual(['Davis'], [stop for stop, _ in subject.footpaths_from('Alewife')])
+
+        def test_transfers():
+            transfers = {
+                ('Alewife', 'Davis'): TransferInfo(transfer_type=3, min_transfer_time=None),
+                ('Alewife', 'Wonderland'): TransferInfo(transfer_type=2, min_transfer_time=600),
+                ('Alewife', 'Alewife'): TransferInfo(transfer_type=2, min_transfer_time=60),
+                ('Alewife', 'Nowhere'): TransferInfo(transfer_type=2, min_transfer_time=60),
+            }
+            subject = FootpathGraph(create_mock_stop_locations(), walk_speed_mph=3, max_walk_seconds=30 * 60,
+                                    transfers=transfers)
+            self.assertListEqual(['Wonderland', 'Porter'], [stop for stop, _ in subject.footpaths_from('Alewife')])
+            self.assertEqual(('Wonderland', 600), subject.footpaths_from('Alewife')[0])
+
+        def test_unknown_stop():
+            subject = FootpathGraph(create_mock_stop_locations(), walk_speed_mph=3, max_walk_seconds=30 * 60)
+            self.assertListEqual([], subject.footpaths_from('Nowhere'))
+
+        test_within_radius()
+        test_max_footpaths_per_stop()
+        test_transfers()
+        test_unknown_stop()
+
+
+def create_mock_stop_locations():
+    return {
+        'Alewife': EarthLocation(lat=42.3954, long=-71.1425),
+        'Davis': EarthLocation(lat=42.3967, long=-71.1218),
+        'Porter': EarthLocation(lat=42.3884, long=-71.1191),
+        'Wonderland': EarthLocation(lat=42.4134, long=-70.9916),
+    }
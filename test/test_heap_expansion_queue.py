@@ -0,0 +1,129 @@
+from gtfs_traversal.data_structures import LocationStatusInfo, ProgressInfo
+from gtfs_traversal.heap_expansion_queue import HeapExpansionQueue
+import unittest
+
+
+def progress_info_with_duration(duration, minimum_remaining_time=None):
+    return ProgressInfo(arrival_trip=None, duration=duration, trip_stop_no=None, expanded=None, eliminated=None,
+                        children=None, parent=None, minimum_remaining_time=minimum_remaining_time)
+
+
+class TestHeapExpansionQueue(unittest.TestCase):
+    def test_add(self):
+        location_a = LocationStatusInfo(location='a', arrival_route=None, unvisited="~~a~~")
+        location_b = LocationStatusInfo(location='b', arrival_route=None, unvisited="~~a~~b~~")
+        location_c = LocationStatusInfo(location='c', arrival_route=None, unvisited="~~")
+        subject = HeapExpansionQueue(num_solution_stops=2, stop_join_string="~~")
+        subject.add([location_a, location_b, location_b, location_c])
+
+        self.assertDictEqual({location_a: 1, location_b: 2}, subject._members)
+        self.assertDictEqual({1: 1, 2: 1}, subject._bucket_sizes)
+        self.assertEqual(1, subject._num_remaining_stops_to_pop)
+        self.assertEqual(2, subject.len())
+
+    def test_is_empty(self):
+        location_a = LocationStatusInfo(location='a', arrival_route=None, unvisited="~~a~~")
+        subject = HeapExpansionQueue(num_solution_stops=2, stop_join_string="~~")
+        solver_progress_dict = {location_a: progress_info_with_duration(1)}
+        self.assertTrue(subject.is_empty())
+
+        subject.add([location_a])
+        self.assertFalse(subject.is_empty())
+
+        subject.pop(solver_progress_dict)
+        self.assertTrue(subject.is_empty())
+
+    def test_pop(self):
+        def test_pops_fewest_remaining_stops_then_lowest_duration():
+            location_a = LocationStatusInfo(location='a', arrival_route=None, unvisited="~~a~~")
+            location_b = LocationStatusInfo(location='b', arrival_route=None, unvisited="~~a~~b~~")
+            location_c = LocationStatusInfo(location='c', arrival_route=None, unvisited="~~a~~b~~")
+            location_d = LocationStatusInfo(location='d', arrival_route=None, unvisited="~~a~~b~~")
+            solver_progress_dict = {
+                location_a: progress_info_with_duration(10),
+                location_b: progress_info_with_duration(3),
+                location_c: progress_info_with_duration(1),
+                location_d: progress_info_with_duration(2),
+            }
+            subject = HeapExpansionQueue(num_solution_stops=2, stop_join_string="~~")
+            subject.add([location_b, location_c, location_a, location_d])
+
+            actual = [subject.pop(solver_progress_dict) for _ in range(4)]
+            self.assertListEqual([location_a, location_c, location_d, location_b], actual)
+            self.assertTrue(subject.is_empty())
+            self.assertEqual(0, subject.len())
+            self.assertDictEqual({}, subject._queue)
+
+        def test_uses_latest_progress_of_readded_node():
+            location_b = LocationStatusInfo(location='b', arrival_route=None, unvisited="~~a~~b~~")
+            location_c = LocationStatusInfo(location='c', arrival_route=None, unvisited="~~a~~b~~")
+            solver_progress_dict = {
+                location_b: progress_info_with_duration(3),
+                location_c: progress_info_with_duration(2),
+            }
+            subject = HeapExpansionQueue(num_solution_stops=2, stop_join_string="~~")
+            subject.add([location_b, location_c])
+            subject.sort_latest_nodes(solver_progress_dict)
+
+            solver_progress_dict[location_b] = progress_info_with_duration(1)
+            subject.add_node(location_b)
+            self.assertEqual(2, subject.len())
+
+            self.assertEqual(location_b, subject.pop(solver_progress_dict))
+            self.assertEqual(location_c, subject.pop(solver_progress_dict))
+            self.assertTrue(subject.is_empty())
+
+        def test_uses_configurable_key():
+            location_b = LocationStatusInfo(location='b', arrival_route=None, unvisited="~~a~~b~~")
+            location_c = LocationStatusInfo(location='c', arrival_route=None, unvisited="~~a~~b~~")
+            solver_progress_dict = {
+                location_b: progress_info_with_duration(3, minimum_remaining_time=1),
+                location_c: progress_info_with_duration(2, minimum_remaining_time=5),
+            }
+            subject = HeapExpansionQueue(num_solution_stops=2, stop_join_string="~~",
+                                         key=lambda progress: progress.duration + progress.minimum_remaining_time)
+            subject.add([location_c, location_b])
+
+            self.assertEqual(location_b, subject.pop(solver_progress_dict))
+            self.assertEqual(location_c, subject.pop(solver_progress_dict))
+
+        def test_ignores_remaining_stops_without_buckets():
+            location_a = LocationStatusInfo(location='a', arrival_route=None, unvisited="~~a~~")
+            location_b = LocationStatusInfo(location='b', arrival_route=None, unvisited="~~a~~b~~")
+            solver_progress_dict = {
+                location_a: progress_info_with_duration(10),
+                location_b: progress_info_with_duration(3),
+            }
+            subject = HeapExpansionQueue(num_solution_stops=2, stop_join_string="~~", bucket_by_remaining_stops=False)
+            subject.add([location_a, location_b])
+            self.assertEqual(2, subject._num_remaining_stops_to_pop)
+
+            self.assertEqual(location_b, subject.pop(solver_progress_dict))
+            self.assertEqual(location_a, subject.pop(solver_progress_dict))
+            self.assertTrue(subject.is_empty())
+
+        test_pops_fewest_remaining_stops_then_lowest_duration()
+        test_uses_latest_progress_of_readded_node()
+        test_uses_configurable_key()
+        test_ignores_remaining_stops_without_buckets()
+
+    def test_remove_keys(self):
+        location_a = LocationStatusInfo(location='a', arrival_route=None, unvisited="~~a~~")
+        location_b = LocationStatusInfo(location='b', arrival_route=None, unvisited="~~a~~b~~")
+        location_c = LocationStatusInfo(location='c', arrival_route=None, unvisited="~~a~~b~~")
+        location_d = LocationStatusInfo(location='d', arrival_route=None, unvisited="~~a~~b~~")
+        solver_progress_dict = {
+            location_a: progress_info_with_duration(3),
+            location_b: progress_info_with_duration(2),
+            location_c: progress_info_with_duration(1),
+        }
+        subject = HeapExpansionQueue(num_solution_stops=2, stop_join_string="~~")
+        subject.add([location_a, location_b, location_c, location_c])
+        subject.sort_latest_nodes(solver_progress_dict)
+
+        subject.remove_keys([location_a, location_c, location_d])
+
+        self.assertEqual(1, subject.len())
+        self.assertEqual(2, subject._num_remaining_stops_to_pop)
+        self.assertEqual(location_b, subject.pop(solver_progress_dict))
+        self.assertTrue(subject.is_empty())
@@ -0,0 +1,46 @@
+import unittest
+
+from gtfs_traversal.data_structures import CacheStats
+from gtfs_traversal.lru_cache import LruCache
+
+
+class TestLruCache(unittest.TestCase):
+    def test_get(self):
+        def test_counts_hits_and_misses():
+            subject = LruCache(2)
+            subject.put('a', 1)
+            self.assertEqual(subject.get('a'), 1)
+            self.assertIsNone(subject.get('b'))
+            self.assertEqual(subject.get('b', 0), 0)
+            self.assertEqual(subject.stats(), CacheStats(hits=1, misses=2, size=1, max_size=2))
+
+        def test_caches_falsy_values():
+            subject = LruCache(2)
+            subject.put('a', None)
+            self.assertIsNone(subject.get('a', 5))
+            self.assertEqual(subject.stats().hits, 1)
+
+        test_counts_hits_and_misses()
+        test_caches_falsy_values()
+
+    def test_put(self):
+        def test_evicts_least_recently_used():
+            subject = LruCache(2)
+            subject.put('a', 1)
+            subject.put('b', 2)
+            subject.get('a')
+            subject.put('c', 3)
+            self.assertEqual(len(subject), 2)
+            self.assertEqual(subject.get('a'), 1)
+            self.assertIsNone(subject.get('b'))
+            self.assertEqual(subject.get('c'), 3)
+
+        def test_replaces_value():
+            subject = LruCache(1)
+            subject.put('a', 1)
+            subject.put('a', 2)
+            self.assertEqual(len(subject), 1)
+            self.assertEqual(subject.get('a'), 2)
+
+        test_evicts_least_recently_used()
+        test_replaces_value()
@@ -100,9 +100,159 @@ class TestNearestStationFinder(unittest.TestCase):
                                                                           DEFAULT_START_TIME)
             self.assertLess(abs(expected - actual), 0.001)
 
+        def test_profile_search_matches_reference():
+            for walk_speed_mph in [1, 100]:
+                for origin in ['Alewife', 'Wonderland', 'Lechmere', 'Lynn']:
+                    def travel_time_secs(profile_search):
+                        subject = NearestStationFinder(**create_mock_analysis(route_types_to_solve=[1]),
+                                                       data=MockData(), progress_between_pruning_progress_dict=None,
+                                                       prune_thoroughness=None, stop_join_string='~~',
+                                                       transfer_duration_seconds=60,
+                                                       transfer_route='transfer_route', walk_route='walk_route',
+                                                       walk_speed_mph=walk_speed_mph, profile_search=profile_search)
+                        return subject.travel_time_secs_to_nearest_solution_station(
+                            origin, ['Heath Street', 'Bowdoin', 'Back of the Hill'], DEFAULT_START_TIME)
+
+                    expected = travel_time_secs(False)
+                    actual = travel_time_secs(True)
+                    if expected is None:
+                        self.assertIsNone(actual)
+                    else:
+                        self.assertAlmostEqual(expected, actual, places=6)
+
+        def test_profile_search_does_not_restart_per_departure():
+            subject = NearestStationFinder(**create_mock_analysis(route_types_to_solve=[1]), data=MockData(),
+                                           progress_between_pruning_progress_dict=None, prune_thoroughness=None,
+                                           stop_join_string='~~', transfer_duration_seconds=60,
+                                           transfer_route='transfer_route', walk_route='walk_route', walk_speed_mph=1,
+                                           profile_search=True)
+
+            with patch.object(subject, '_find_next_travel_time_secs') as travel_time_patch:
+                actual = subject.travel_time_secs_to_nearest_solution_station('Lechmere', ['Back of the Hill'],
+                                                                              DEFAULT_START_TIME)
+                self.assertEqual(travel_time_patch.call_count, 0)
+
+            self.assertEqual(actual, 1200)
+
+        def profile_and_reference_travel_time_secs(origin, start_time, end_date, walk_speed_mph):
+            # Returns the travel times found with and without a profile search
+            def travel_time_secs(profile_search):
+                subject = NearestStationFinder(**create_mock_analysis(route_types_to_solve=[1], end_date=end_date),
+                                               data=create_mock_data_with_late_trips(),
+                                               progress_between_pruning_progress_dict=None, prune_thoroughness=None,
+                                               stop_join_string='~~', transfer_duration_seconds=60,
+                                               transfer_route='transfer_route', walk_route='walk_route',
+                                               walk_speed_mph=walk_speed_mph, profile_search=profile_search)
+                return subject.travel_time_secs_to_nearest_solution_station(
+                    origin, ['Heath Street', 'Bowdoin', 'Back of the Hill'], start_time)
+
+            return travel_time_secs(True), travel_time_secs(False)
+
+        def test_profile_search_matches_reference_late_in_analysis():
+            for hours in [7.5, 8, 22]:
+                for origin in ['Alewife', 'Wonderland', 'Lechmere', 'Lynn']:
+                    actual, expected = profile_and_reference_travel_time_secs(
+                        origin, DEFAULT_START_TIME + timedelta(hours=hours), DEFAULT_START_DATE, 1)
+                    if expected is None:
+                        self.assertIsNone(actual)
+                    else:
+                        self.assertAlmostEqual(expected, actual, places=6)
+
+            # The last trip departs before the analysis ends and may be ridden past midnight
+            actual, expected = profile_and_reference_travel_time_secs(
+                'Wonderland', DEFAULT_START_TIME + timedelta(hours=22), DEFAULT_START_DATE, 1)
+            self.assertAlmostEqual(expected, 9600, places=6)
+            self.assertAlmostEqual(actual, 9600, places=6)
+
+        def test_profile_search_matches_reference_across_midnight():
+            next_date = (DEFAULT_START_TIME + timedelta(days=1)).strftime('%Y-%m-%d')
+            for origin in ['Alewife', 'Wonderland', 'Lechmere', 'Lynn']:
+                actual, expected = profile_and_reference_travel_time_secs(
+                    origin, DEFAULT_START_TIME + timedelta(hours=22), next_date, 1)
+                if expected is None:
+                    self.assertIsNone(actual)
+                else:
+                    self.assertAlmostEqual(expected, actual, places=6)
+
+            # The 11PM trip from Alewife reaches Wonderland at midnight, in time for the next morning's first trip
+            actual, expected = profile_and_reference_travel_time_secs(
+                'Alewife', DEFAULT_START_TIME + timedelta(hours=22), next_date, 1)
+            self.assertAlmostEqual(expected, 39600, places=6)
+            self.assertAlmostEqual(actual, 39600, places=6)
+
         test_return_0_for_solution_station()
         test_calculate_correct_result_with_mocking()
         test_calculate_correct_result_without_mocking()
+        test_profile_search_matches_reference()
+        test_profile_search_does_not_restart_per_departure()
+        test_profile_search_matches_reference_late_in_analysis()
+        test_profile_search_matches_reference_across_midnight()
+
+    def test_travel_times_secs_to_nearest_solution_station(self):
+        def test_riding():
+            subject = NearestStationFinder(**create_mock_analysis(route_types_to_solve=[1]), data=MockData(),
+                                           progress_between_pruning_progress_dict=None, prune_thoroughness=None,
+                                           stop_join_string='~~', transfer_duration_seconds=60,
+                                           transfer_route='transfer_route', walk_route='walk_route', walk_speed_mph=1)
+
+            expected = {
+                'Alewife': 8400,
+                'Wonderland': 4800,
+                'Back of the Hill': 0,
+                'Heath Street': 0,
+                'Lechmere': 1200,
+                'Bowdoin': 0,
+                'Lynn': 10000,  # Lynn cannot reach a solution stop within the horizon
+            }
+            actual = subject.travel_times_secs_to_nearest_solution_station(10000)
+            self.assertDictEqual(expected, actual)
+
+        def test_walking():
+            # Walks are only searched between stops that are close enough at walk_speed_mph
+            subject = NearestStationFinder(**create_mock_analysis(route_types_to_solve=[1]), data=MockData(),
+                                           progress_between_pruning_progress_dict=None, prune_thoroughness=None,
+                                           stop_join_string='~~', transfer_duration_seconds=60,
+                                           transfer_route='transfer_route', walk_route='walk_route',
+                                           walk_speed_mph=1000)
+
+            with patch.object(subject, '_walk_time_seconds', return_value=2000):
+                actual = subject.travel_times_secs_to_nearest_solution_station(10000)
+
+            self.assertEqual(actual['Lechmere'], 1200)
+            self.assertEqual(actual['Wonderland'], 2000)
+            self.assertEqual(actual['Alewife'], 2000)
+            self.assertEqual(actual['Lynn'], 2000)
+
+        def test_lower_bound():
+            subject = NearestStationFinder(**create_mock_analysis(route_types_to_solve=[1]), data=MockData(),
+                                           progress_between_pruning_progress_dict=None, prune_thoroughness=None,
+                                           stop_join_string='~~', transfer_duration_seconds=60,
+                                           transfer_route='transfer_route', walk_route='walk_route', walk_speed_mph=1)
+
+            solutions = ['Heath Street', 'Bowdoin', 'Back of the Hill']
+            actual = subject.travel_times_secs_to_nearest_solution_station(100000)
+            for origin in ['Alewife', 'Wonderland', 'Lechmere']:
+                self.assertLessEqual(actual[origin], subject.travel_time_secs_to_nearest_solution_station(
+                    origin, solutions, DEFAULT_START_TIME))
+
+        def test_walking_is_bounded_by_distance():
+            subject = NearestStationFinder(**create_mock_analysis(route_types_to_solve=[1]), data=MockData(),
+                                           progress_between_pruning_progress_dict=None, prune_thoroughness=None,
+                                           stop_join_string='~~', transfer_duration_seconds=60,
+                                           transfer_route='transfer_route', walk_route='walk_route', walk_speed_mph=1)
+
+            with patch.object(subject, '_walk_time_seconds', return_value=2000) as mock_walk_time:
+                actual = subject.travel_times_secs_to_nearest_solution_station(10000)
+
+            # Only stops in or next to the grid cells around each stop are considered, rather than every pair of stops
+            self.assertLess(mock_walk_time.call_count, len(MockData().stopLocations) ** 2)
+            self.assertNotIn(7, [call[0][1] for call in mock_walk_time.call_args_list])
+            self.assertEqual(actual['Lynn'], 10000)
+
+        test_riding()
+        test_walking()
+        test_walking_is_bounded_by_distance()
+        test_lower_bound()
 
 
 class MockData:
@@ -176,9 +326,18 @@ class MockStopLocation:
         self.long = long
 
 
-def create_mock_analysis(route_types_to_solve=None):
+def create_mock_analysis(route_types_to_solve=None, end_date=DEFAULT_START_DATE):
     return {
         "route_types_to_solve": [1, 2] if route_types_to_solve is None else route_types_to_solve,
-        "end_date": DEFAULT_START_DATE,
+        "end_date": end_date,
         "stops_to_solve": None,
     }
+
+
+def create_mock_data_with_late_trips():
+    data = MockData()
+    data.tripSchedules['3-11PM'] = MockTripInfo(3, 'Alewife', 'Wonderland', 'Lynn', 23, 1)
+    data.tripSchedules['18-11PM'] = MockTripInfo(18, 'Wonderland', 'Lechmere', 'Back of the Hill', 23, 2)
+    data.uniqueRouteTrips[1].tripIds.append('3-11PM')
+    data.uniqueRouteTrips[2].tripIds.append('18-11PM')
+    return data
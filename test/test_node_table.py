@@ -0,0 +1,48 @@
+import unittest
+
+from gtfs_traversal.data_structures import LocationStatusInfo
+from gtfs_traversal.node_table import NodeTable
+
+
+class TestNodeTable(unittest.TestCase):
+    def test_node_id(self):
+        def test_bitmask():
+            subject = NodeTable()
+            location_a = LocationStatusInfo(location='a', arrival_route=1, unvisited=0b101)
+            location_b = LocationStatusInfo(location='a', arrival_route=1, unvisited=0b100)
+            location_c = LocationStatusInfo(location='b', arrival_route=1, unvisited=0b101)
+            node_ids = [subject.node_id(location) for location in [location_a, location_b, location_c]]
+            self.assertEqual([0, 1, 2], node_ids)
+            self.assertEqual(node_ids[0], subject.node_id(location_a._replace()))
+            self.assertEqual([location_a, location_b, location_c], [subject.status(node_id) for node_id in node_ids])
+
+        def test_string():
+            subject = NodeTable()
+            location_a = LocationStatusInfo(location='a', arrival_route=None, unvisited='~~a~~b~~')
+            location_b = LocationStatusInfo(location='a', arrival_route='walk route', unvisited='~~a~~b~~')
+            location_c = LocationStatusInfo(location='a', arrival_route=None, unvisited='~~b~~')
+            node_ids = [subject.node_id(location) for location in [location_a, location_b, location_c]]
+            self.assertEqual([0, 1, 2], node_ids)
+            self.assertEqual([location_a, location_b, location_c], [subject.status(node_id) for node_id in node_ids])
+
+        def test_large_bitmask():
+            subject = NodeTable()
+            location = LocationStatusInfo(location='a', arrival_route=1, unvisited=1 << 500)
+            self.assertEqual(0, subject.node_id(location))
+            self.assertEqual(location, subject.status(0))
+
+        test_bitmask()
+        test_string()
+        test_large_bitmask()
+
+    def test_len(self):
+        subject = NodeTable()
+        subject.node_id(LocationStatusInfo(location='a', arrival_route=1, unvisited='~~a~~'))
+        subject.node_id(LocationStatusInfo(location='a', arrival_route=1, unvisited='~~a~~'))
+        subject.node_id(LocationStatusInfo(location='a', arrival_route=1, unvisited='~~'))
+        self.assertEqual(2, len(subject))
+
+    def test_unvisited(self):
+        subject = NodeTable()
+        node_id = subject.node_id(LocationStatusInfo(location='a', arrival_route=1, unvisited='~~a~~'))
+        self.assertEqual('~~a~~', subject.unvisited(node_id))
@@ -0,0 +1,201 @@
+import os
+import pickle
+import tempfile
+import unittest
+from collections import namedtuple
+from unittest.mock import patch
+
+try:
+    from gtfs_traversal import read_data
+except ImportError:
+    read_data = None
+
+MockAnalysis = namedtuple('MockAnalysis', ['start_date', 'end_date', 'route_types'])
+DEFAULT_ANALYSIS = MockAnalysis(start_date='2020-01-01', end_date='2020-01-01', route_types=[1])
+
+
+@unittest.skipIf(read_data is None, 'gtfs_parsing is not installed')
+class TestReadData(unittest.TestCase):
+    def test_network_cache_key(self):
+        def test_ignores_files_other_than_feed_files():
+            with tempfile.TemporaryDirectory() as data_location:
+                write_feed(data_location)
+                expected = read_data._network_cache_key(DEFAULT_ANALYSIS, data_location)
+                with open(os.path.join(data_location, 'network_cache.pickle'), 'w') as cache_file:
+                    cache_file.write('cache')
+                self.assertEqual(expected, read_data._network_cache_key(DEFAULT_ANALYSIS, data_location))
+
+        def test_changes_with_feed_files():
+            with tempfile.TemporaryDirectory() as data_location:
+                write_feed(data_location)
+                expected = read_data._network_cache_key(DEFAULT_ANALYSIS, data_location)
+                write_feed(data_location, stops='stop_id\nAlewife\nWonderland\n')
+                self.assertNotEqual(expected, read_data._network_cache_key(DEFAULT_ANALYSIS, data_location))
+
+        def test_changes_with_config():
+            with tempfile.TemporaryDirectory() as data_location:
+                write_feed(data_location)
+                self.assertNotEqual(read_data._network_cache_key(DEFAULT_ANALYSIS, data_location),
+                                    read_data._network_cache_key(DEFAULT_ANALYSIS._replace(end_date='2020-01-02'),
+                                                                 data_location))
+
+        def test_does_not_depend_on_order_of_config_fields():
+            with tempfile.TemporaryDirectory() as data_location:
+                write_feed(data_location)
+                self.assertEqual(
+                    read_data._network_cache_key({'start_date': '2020-01-01', 'end_date': '2020-01-02'},
+                                                 data_location),
+                    read_data._network_cache_key({'end_date': '2020-01-02', 'start_date': '2020-01-01'},
+                                                 data_location))
+                self.assertEqual(
+                    read_data._network_cache_key(DEFAULT_ANALYSIS, data_location),
+                    read_data._network_cache_key(dict(DEFAULT_ANALYSIS._asdict()), data_location))
+
+        def test_changes_with_format_version():
+            with tempfile.TemporaryDirectory() as data_location:
+                write_feed(data_location)
+                expected = read_data._network_cache_key(DEFAULT_ANALYSIS, data_location)
+                format_version = read_data.NETWORK_CACHE_FORMAT_VERSION + 1
+                with patch.object(read_data, 'NETWORK_CACHE_FORMAT_VERSION', format_version):
+                    self.assertNotEqual(expected, read_data._network_cache_key(DEFAULT_ANALYSIS, data_location))
+
+        test_ignores_files_other_than_feed_files()
+        test_changes_with_feed_files()
+        test_changes_with_config()
+        test_changes_with_format_version()
+        test_does_not_depend_on_order_of_config_fields()
+
+    def test_read_network(self):
+        def read_network(data_location, config=DEFAULT_ANALYSIS):
+            with patch.object(read_data.gtfs_parser, 'parse', side_effect=create_mock_data) as mock_parse:
+                network = read_data.read_network(config, data_location, 'network_cache.pickle')
+            return network, mock_parse.call_count
+
+        def assert_network(network):
+            self.assertEqual(set(network.data.tripSchedules.keys()), {'3-6AM'})
+            self.assertEqual(set(network.data.stopLocations.keys()), {'Alewife', 'Wonderland'})
+            self.assertEqual(network.timetable.travel_time_seconds('3-6AM', 1, 2), 3600)
+
+        def test_writes_cache_on_miss():
+            with tempfile.TemporaryDirectory() as data_location:
+                write_feed(data_location)
+                network, parse_count = read_network(data_location)
+                self.assertEqual(parse_count, 1)
+                assert_network(network)
+                self.assertTrue(os.path.exists(os.path.join(data_location, 'network_cache.pickle')))
+                self.assertFalse(os.path.exists(os.path.join(data_location, 'network_cache.pickle.tmp')))
+
+        def test_reads_cache_on_hit():
+            with tempfile.TemporaryDirectory() as data_location:
+                write_feed(data_location)
+                read_network(data_location)
+                network, parse_count = read_network(data_location)
+                self.assertEqual(parse_count, 0)
+                assert_network(network)
+
+        def test_parses_again_after_feed_changes():
+            with tempfile.TemporaryDirectory() as data_location:
+                write_feed(data_location)
+                read_network(data_location)
+                write_feed(data_location, stops='stop_id\nAlewife\nWonderland\n')
+                _, parse_count = read_network(data_location)
+                self.assertEqual(parse_count, 1)
+                _, parse_count = read_network(data_location)
+                self.assertEqual(parse_count, 0)
+
+        def test_parses_again_after_config_changes():
+            with tempfile.TemporaryDirectory() as data_location:
+                write_feed(data_location)
+                read_network(data_location)
+                _, parse_count = read_network(data_location, DEFAULT_ANALYSIS._replace(route_types=[1, 2]))
+                self.assertEqual(parse_count, 1)
+
+        def test_parses_again_after_cache_is_corrupted():
+            for corrupt in [truncate_file, overwrite_file]:
+                with tempfile.TemporaryDirectory() as data_location:
+                    write_feed(data_location)
+                    read_network(data_location)
+                    corrupt(os.path.join(data_location, 'network_cache.pickle'))
+
+                    network, parse_count = read_network(data_location)
+                    self.assertEqual(parse_count, 1)
+                    assert_network(network)
+                    _, parse_count = read_network(data_location)
+                    self.assertEqual(parse_count, 0)
+
+        def test_parses_again_after_cache_holds_something_else():
+            with tempfile.TemporaryDirectory() as data_location:
+                write_feed(data_location)
+                with open(os.path.join(data_location, 'network_cache.pickle'), 'wb') as cache_file:
+                    pickle.dump(read_data._network_cache_key(DEFAULT_ANALYSIS, data_location), cache_file)
+                    pickle.dump('not a network', cache_file)
+
+                network, parse_count = read_network(data_location)
+                self.assertEqual(parse_count, 1)
+                assert_network(network)
+
+        def test_raises_unexpected_errors():
+            with tempfile.TemporaryDirectory() as data_location:
+                write_feed(data_location)
+                read_network(data_location)
+                with patch.object(read_data.pickle, 'load', side_effect=TypeError):
+                    with self.assertRaises(TypeError):
+                        read_network(data_location)
+
+        test_writes_cache_on_miss()
+        test_reads_cache_on_hit()
+        test_parses_again_after_feed_changes()
+        test_parses_again_after_config_changes()
+        test_parses_again_after_cache_is_corrupted()
+        test_parses_again_after_cache_holds_something_else()
+        test_raises_unexpected_errors()
+
+    def test_read_network_without_cache(self):
+        with tempfile.TemporaryDirectory() as data_location:
+            write_feed(data_location)
+            with patch.object(read_data.gtfs_parser, 'parse', side_effect=create_mock_data) as mock_parse:
+                read_data.read_network(DEFAULT_ANALYSIS, data_location)
+                read_data.read_network(DEFAULT_ANALYSIS, data_location)
+            self.assertEqual(mock_parse.call_count, 2)
+            self.assertEqual(os.listdir(data_location), ['stops.txt'])
+
+
+def create_mock_data(config, data_location):
+    return read_data.gtfsSchedules(
+        tripSchedules={
+            '3-6AM': MockTripInfo([('Alewife', '6:00:00'), ('Wonderland', '7:00:00')]),
+            '3-7AM': MockTripInfo([('Alewife', '7:00:00'), ('Lynn', '8:00:00')]),
+        },
+        dateTrips={'2020-01-01': {'3-6AM'}},
+        uniqueRouteTrips={3: read_data.uniqueRouteInfo(tripIds=['3-6AM', '3-7AM'], routeInfo=None)},
+        stopLocations={'Alewife': (1, -2), 'Wonderland': (2, -2.5), 'Lynn': (7, 4.5)},
+    )
+
+
+def overwrite_file(file_location):
+    with open(file_location, 'wb') as cache_file:
+        cache_file.write(b'not a pickle')
+
+
+def truncate_file(file_location):
+    with open(file_location, 'r+b') as cache_file:
+        cache_file.truncate(os.path.getsize(file_location) // 2)
+
+
+def write_feed(data_location, stops='stop_id\nAlewife\n'):
+    with open(os.path.join(data_location, 'stops.txt'), 'w') as stops_file:
+        stops_file.write(stops)
+
+
+class MockStopDeparture:
+    def __init__(self, stop_id, departure_time):
+        self.stopId = stop_id
+        self.departureTime = departure_time
+
+
+class MockTripInfo:
+    def __init__(self, stops):
+        self.tripStops = {
+            str(stop_number): MockStopDeparture(stop_id, departure_time)
+            for stop_number, (stop_id, departure_time) in enumerate(stops, 1)
+        }
@@ -0,0 +1,40 @@
+import unittest
+
+from gtfs_traversal.route_network import RouteNetwork
+
+
+class TestRouteNetwork(unittest.TestCase):
+    def test_neighbors(self):
+        subject = create_subject()
+        self.assertEqual('B', subject.next_stop('A', 'red'))
+        self.assertIsNone(subject.next_stop('C', 'red'))
+        self.assertIsNone(subject.previous_stop('A', 'red'))
+        self.assertEqual('B', subject.previous_stop('C', 'red'))
+        self.assertTrue(subject.is_last_stop_on_route('D', 'blue'))
+        self.assertFalse(subject.is_last_stop_on_route('B', 'blue'))
+        with self.assertRaises(ValueError):
+            subject.next_stop('A', 'blue')
+
+    def test_routes_at_stop(self):
+        subject = create_subject()
+        self.assertEqual(frozenset({'red', 'blue', 'bus'}), subject.routes_at_stop('B'))
+        self.assertEqual(frozenset({'red', 'blue'}), subject.solution_routes_at_stop('B'))
+        self.assertEqual(frozenset(), subject.solution_routes_at_stop('E'))
+
+    def test_single_solution_routes(self):
+        subject = create_subject()
+        self.assertDictEqual({'A': 'red', 'C': 'red', 'D': 'blue'}, subject.single_solution_routes())
+        self.assertDictEqual({'red': ('A', 'C'), 'blue': ('D',)}, subject.single_solution_route_stops())
+
+    def test_stops_at_ends_of_solution_routes(self):
+        subject = create_subject()
+        self.assertEqual(frozenset({'A', 'B', 'C', 'D'}), subject.stops_at_ends_of_solution_routes())
+
+
+def create_subject():
+    route_stops = {
+        'red': ['A', 'B', 'C'],
+        'blue': ['B', 'D'],
+        'bus': ['E', 'B'],
+    }
+    return RouteNetwork(route_stops, {'red', 'blue'}, {'A', 'B', 'C', 'D'})
@@ -1,3 +1,6 @@
+import math
+import os
+import tempfile
 import unittest
 from datetime import datetime, timedelta
 from unittest.mock import patch
@@ -5,6 +8,7 @@ from unittest.mock import patch
 from gtfs_traversal.data_structures import *
 from gtfs_traversal.expansion_queue import ExpansionQueue
 from gtfs_traversal.solver import Solver
+from gtfs_traversal.travel_time_matrix import TravelTimeMatrix, UNREACHABLE
 
 DEFAULT_START_DATE = '2020-01-01'
 DEFAULT_START_TIME = datetime.strptime(DEFAULT_START_DATE, '%Y-%m-%d')
@@ -163,6 +167,37 @@ class TestSolver(unittest.TestCase):
         test_improvement()
         test_solution()
 
+    def test_eliminate_stops_from_string(self):
+        def test_string():
+            subject = Solver(**create_mock_analysis(), data=MockData(), progress_between_pruning_progress_dict=None,
+                             prune_thoroughness=None, stop_join_string='~~', transfer_duration_seconds=None,
+                             transfer_route=None, walk_route=None, walk_speed_mph=None)
+            subject._string_shortener = MockStringShortener()
+            expected = '~~Alewife~~'
+            actual = subject._eliminate_stops_from_string(['Wonderland', 'Back of the Hill'],
+                                                          '~~Alewife~~Wonderland~~Back of the Hill~~')
+            self.assertEqual(expected, actual)
+
+        def test_bitmask():
+            subject = Solver(**create_mock_analysis(route_types_to_solve=[2]), data=MockData(),
+                             progress_between_pruning_progress_dict=None, prune_thoroughness=None,
+                             stop_join_string='~~', transfer_duration_seconds=None, transfer_route=None,
+                             walk_route=None, walk_speed_mph=None, unvisited_stops_as_bitmask=True)
+            unvisited = subject._get_initial_unsolved_string()
+            actual = subject._eliminate_stops_from_string(['Wonderland', 'Back of the Hill'], unvisited)
+            self.assertEqual(3, subject._count_unvisited_stops(actual))
+            self.assertSetEqual({'Alewife', 'Heath Street', 'Lechmere'},
+                                set(subject._get_unvisited_stops(LocationStatusInfo(
+                                    location=None, arrival_route=None, unvisited=actual))))
+
+            solved = subject._eliminate_stops_from_string(['Alewife', 'Heath Street', 'Lechmere'], actual)
+            self.assertEqual(0, solved)
+            self.assertTrue(subject._is_solution(LocationStatusInfo(location=None, arrival_route=None,
+                                                                    unvisited=solved)))
+
+        test_string()
+        test_bitmask()
+
     def test_expand(self):
         def test_solved():
             subject = Solver(**create_mock_analysis(), data=MockData(), progress_between_pruning_progress_dict=None,
@@ -237,6 +272,66 @@ class TestSolver(unittest.TestCase):
         test_expanded()
         test_calculate_expansion()
 
+    def test_get_eliminated_nodes(self):
+        def progress_info(eliminated, parent=None, children=None):
+            return ProgressInfo(duration=10, arrival_trip=None, trip_stop_no=None, parent=parent, children=children,
+                                minimum_remaining_time=10, expanded=False, eliminated=eliminated)
+
+        subject = Solver(**create_mock_analysis(), data=MockData(), progress_between_pruning_progress_dict=None,
+                         prune_thoroughness=None, stop_join_string='~~', transfer_duration_seconds=None,
+                         transfer_route=None, walk_route=None, walk_speed_mph=None)
+        location_1 = LocationStatusInfo(location='1', arrival_route=1, unvisited='~~a~~b~~c~~')
+        location_2 = LocationStatusInfo(location='2', arrival_route=1, unvisited='~~a~~b~~')
+        location_3 = LocationStatusInfo(location='3', arrival_route=1, unvisited='~~a~~')
+        subject._progress_dict = {
+            location_1: progress_info(eliminated=False, children={location_2}),
+            location_2: progress_info(eliminated=False, parent=location_1, children={location_3}),
+            location_3: progress_info(eliminated=True, parent=location_2),
+        }
+        subject._exp_queue = ExpansionQueue(3, '~~')
+
+        self.assertDictEqual({1: {location_3}}, subject._get_eliminated_nodes())
+
+        subject._mark_nodes_as_eliminated({location_2})
+        self.assertDictEqual({1: {location_3}, 2: {location_2}, 3: {location_1}}, subject._get_eliminated_nodes())
+
+        subject._add_new_node_to_progress_dict((location_2, progress_info(eliminated=False, parent=location_1)), None)
+        self.assertDictEqual({1: {location_3}, 2: set(), 3: {location_1}}, subject._get_eliminated_nodes())
+
+        subject._progress_dict = dict()
+        self.assertDictEqual(dict(), subject._get_eliminated_nodes())
+
+    def test_get_lower_bound_heap(self):
+        def progress_info(duration, eliminated=False, parent=None):
+            return ProgressInfo(duration=duration, arrival_trip=None, trip_stop_no=None, parent=parent, children=None,
+                                minimum_remaining_time=10, expanded=False, eliminated=eliminated)
+
+        subject = Solver(**create_mock_analysis(), data=MockData(), progress_between_pruning_progress_dict=None,
+                         prune_thoroughness=None, stop_join_string='~~', transfer_duration_seconds=None,
+                         transfer_route=None, walk_route=None, walk_speed_mph=None)
+        location_1 = LocationStatusInfo(location='1', arrival_route=1, unvisited='~~a~~b~~')
+        location_2 = LocationStatusInfo(location='2', arrival_route=1, unvisited='~~a~~b~~')
+        location_3 = LocationStatusInfo(location='3', arrival_route=1, unvisited='~~a~~b~~')
+        subject._progress_dict = {
+            location_1: progress_info(5),
+            location_2: progress_info(20),
+            location_3: progress_info(30, eliminated=True),
+        }
+        subject._exp_queue = ExpansionQueue(2, '~~')
+
+        self.assertListEqual([location_2, location_1], [entry[2] for entry in sorted(subject._get_lower_bound_heap())])
+
+        subject._add_new_node_to_progress_dict((location_3, progress_info(1, parent=location_1)), None)
+        self.assertEqual(3, len(subject._get_lower_bound_heap()))
+
+        subject._mark_slow_nodes_as_eliminated(20, preserve=set())
+        self.assertTrue(subject._progress_dict[location_2].eliminated)
+        self.assertFalse(subject._progress_dict[location_1].eliminated)
+        self.assertListEqual([location_1, location_3], [entry[2] for entry in sorted(subject._get_lower_bound_heap())])
+
+        subject._progress_dict = dict()
+        self.assertListEqual([], subject._get_lower_bound_heap())
+
     def test_get_new_minimum_remaining_time(self):
         def test_route_not_on_solution_set():
             subject = Solver(**create_mock_analysis(), data=MockData(), progress_between_pruning_progress_dict=None,
@@ -260,8 +355,128 @@ class TestSolver(unittest.TestCase):
             actual = subject._get_new_minimum_remaining_time(input_time, '##Bowdoin##Lynn##Wonderland##', location)
             self.assertEqual(expected, actual)
 
+        def test_minimum_spanning_tree_bound():
+            subject = Solver(**create_mock_analysis(), data=MockData(), progress_between_pruning_progress_dict=None,
+                             prune_thoroughness=None, stop_join_string='##', transfer_duration_seconds=5,
+                             transfer_route=None, walk_route=None, walk_speed_mph=None,
+                             minimum_spanning_tree_bound=True)
+            subject._string_shortener = MockStringShortener()
+            subject._start_time = DEFAULT_START_TIME
+            location = LocationStatusInfo(location='Lynn', arrival_route=3, unvisited='##Wonderland##')
+
+            with patch.object(subject, '_get_minimum_spanning_tree_time', return_value=2 * 60 * 60):
+                actual = subject._get_new_minimum_remaining_time(0, '##Bowdoin##Lynn##Wonderland##', location)
+            self.assertEqual(2 * 60 * 60, actual)
+
+            with patch.object(subject, '_get_minimum_spanning_tree_time', return_value=60):
+                actual = subject._get_new_minimum_remaining_time(0, '##Bowdoin##Lynn##Wonderland##', location)
+            self.assertEqual(60 * 60, actual)
+
+        def test_bound_cache():
+            subject = Solver(**create_mock_analysis(), data=MockData(), progress_between_pruning_progress_dict=None,
+                             prune_thoroughness=None, stop_join_string='##', transfer_duration_seconds=5,
+                             transfer_route='transfer route', walk_route=None, walk_speed_mph=None,
+                             bound_cache_size=2)
+            subject._string_shortener = MockStringShortener()
+            subject._start_time = DEFAULT_START_TIME
+            location = LocationStatusInfo(location='Lynn', arrival_route=3, unvisited='##Wonderland##')
+            transfer_location = location._replace(arrival_route='transfer route')
+            walk_location = location._replace(arrival_route='walk route')
+
+            with patch.object(subject, '_find_new_minimum_remaining_time', return_value=60 * 60) as mock_find:
+                self.assertEqual(60 * 60, subject._get_new_minimum_remaining_time(0, '##Lynn##Wonderland##', location))
+                self.assertEqual(60 * 60, subject._get_new_minimum_remaining_time(0, '##Lynn##Wonderland##', location))
+                self.assertEqual(1, mock_find.call_count)
+
+                # Routes that are not solution routes share a bound
+                subject._get_new_minimum_remaining_time(0, '##Lynn##Wonderland##', transfer_location)
+                subject._get_new_minimum_remaining_time(0, '##Lynn##Wonderland##', walk_location)
+                self.assertEqual(2, mock_find.call_count)
+
+                subject._start_time = DEFAULT_START_TIME + timedelta(seconds=1)
+                subject._get_new_minimum_remaining_time(0, '##Lynn##Wonderland##', location)
+                self.assertEqual(3, mock_find.call_count)
+
+            self.assertEqual(subject._bound_cache.stats(), CacheStats(hits=2, misses=3, size=2, max_size=2))
+
+        def test_incremental_bound():
+            subject = Solver(**create_mock_analysis(), data=MockData(), progress_between_pruning_progress_dict=None,
+                             prune_thoroughness=None, stop_join_string='##', transfer_duration_seconds=5,
+                             transfer_route=None, walk_route=None, walk_speed_mph=None, incremental_bound=True)
+            subject._string_shortener = MockStringShortener()
+            subject._start_time = DEFAULT_START_TIME
+            location = LocationStatusInfo(location='Lynn', arrival_route=3, unvisited='##Wonderland##')
+            actual = subject._get_new_minimum_remaining_time(400 * 60, '##Bowdoin##Lynn##Wonderland##', location,
+                                                             visited_stops=['Bowdoin', 'Lynn'])
+            self.assertEqual(60 * 60, actual)
+
+            # Later bounds are derived from earlier ones
+            subject._remaining_time_parts.put((DEFAULT_START_TIME, '##Wonderland##'), (10 * 60, 0))
+            location = LocationStatusInfo(location='Wonderland', arrival_route=3, unvisited='##')
+            with patch.object(subject._data_munger, 'get_minimum_remaining_time_after_visiting',
+                              return_value=0) as mock_after_visiting:
+                actual = subject._get_new_minimum_remaining_time(10 * 60, '##Wonderland##', location,
+                                                                 visited_stops=['Lynn', 'Wonderland'])
+            self.assertEqual(0, actual)
+            mock_after_visiting.assert_called_once()
+            self.assertEqual({'Wonderland'}, mock_after_visiting.call_args[0][1])
+
+        def test_incremental_bound_cache_size():
+            subject = Solver(**create_mock_analysis(), data=MockData(), progress_between_pruning_progress_dict=None,
+                             prune_thoroughness=None, stop_join_string='##', transfer_duration_seconds=5,
+                             transfer_route=None, walk_route=None, walk_speed_mph=None, incremental_bound=True,
+                             bound_cache_size=1)
+            subject._string_shortener = MockStringShortener()
+            subject._start_time = DEFAULT_START_TIME
+            for unvisited in ['##Lynn##Wonderland##', '##Wonderland##']:
+                location = LocationStatusInfo(location='Lynn', arrival_route=3, unvisited=unvisited)
+                subject._get_new_minimum_remaining_time(400 * 60, '##Bowdoin##Lynn##Wonderland##', location,
+                                                        visited_stops=['Bowdoin', 'Lynn'])
+
+            self.assertEqual(len(subject._remaining_time_parts), 1)
+            self.assertEqual(subject._remaining_time_parts.stats().max_size, 1)
+
         test_route_not_on_solution_set()
         test_route_on_solution_set()
+        test_incremental_bound()
+        test_incremental_bound_cache_size()
+        test_minimum_spanning_tree_bound()
+        test_bound_cache()
+
+    def test_get_minimum_spanning_tree_time(self):
+        subject = Solver(**create_mock_analysis(), data=MockData(), progress_between_pruning_progress_dict=None,
+                         prune_thoroughness=None, stop_join_string='~~', transfer_duration_seconds=None,
+                         transfer_route=None, walk_route=None, walk_speed_mph=None, minimum_spanning_tree_bound=True)
+        subject._travel_time_matrix = TravelTimeMatrix(['a', 'b', 'c', 'd'], [
+            0, 10, 50, UNREACHABLE,
+            UNREACHABLE, 0, 20, 100,
+            30, UNREACHABLE, 0, 40,
+            5, UNREACHABLE, UNREACHABLE, 0,
+        ])
+
+        # a-b is 10, b-c is 20, and d-a is 5 in their faster directions
+        self.assertEqual(subject._get_minimum_spanning_tree_time('~~a~~b~~c~~d~~', ['a', 'b', 'c', 'd']), 35)
+        self.assertEqual(subject._get_minimum_spanning_tree_time('~~c~~d~~', ['c', 'd']), 40)
+        self.assertEqual(subject._get_minimum_spanning_tree_time('~~d~~', ['d']), 0)
+        self.assertEqual(subject._get_minimum_spanning_tree_time('~~', []), 0)
+
+        subject._travel_time_matrix = None
+        self.assertEqual(subject._get_minimum_spanning_tree_time('~~c~~d~~', ['c', 'd']), 40)
+
+    def test_get_minimum_spanning_tree_time_cache_size(self):
+        subject = Solver(**create_mock_analysis(), data=MockData(), progress_between_pruning_progress_dict=None,
+                         prune_thoroughness=None, stop_join_string='~~', transfer_duration_seconds=None,
+                         transfer_route=None, walk_route=None, walk_speed_mph=None, minimum_spanning_tree_bound=True,
+                         minimum_spanning_tree_cache_size=1)
+        subject._travel_time_matrix = TravelTimeMatrix(['a', 'b'], [0, 10, 20, 0])
+
+        self.assertEqual(subject._get_minimum_spanning_tree_time('~~a~~b~~', ['a', 'b']), 10)
+        self.assertEqual(subject._get_minimum_spanning_tree_time('~~a~~b~~', ['a', 'b']), 10)
+        self.assertEqual(subject._get_minimum_spanning_tree_time('~~b~~', ['b']), 0)
+        self.assertEqual(subject._minimum_spanning_tree_times.stats(), CacheStats(hits=1, misses=2, size=1, max_size=1))
+
+        subject._travel_time_matrix = TravelTimeMatrix(['a', 'b'], [0, 30, 40, 0])
+        self.assertEqual(subject._get_minimum_spanning_tree_time('~~a~~b~~', ['a', 'b']), 30)
 
     def test_get_new_nodes(self):
         def test_after_transfer():
@@ -443,6 +658,39 @@ class TestSolver(unittest.TestCase):
         expected = ['walking data', 'new route data', 'new route data']
         self.assertEqual(expected, actual)
 
+    def test_get_travel_time_matrix(self):
+        def get_subject(travel_time_matrix_file):
+            return Solver(**create_mock_analysis(route_types_to_solve=[1]), data=MockData(),
+                          progress_between_pruning_progress_dict=5, prune_thoroughness=.1, stop_join_string='~~',
+                          transfer_duration_seconds=60, transfer_route='transfer', walk_route='walk',
+                          walk_speed_mph=1, travel_time_matrix_file=travel_time_matrix_file)
+
+        def test_builds_matrix():
+            subject = get_subject(None)
+            actual = subject._get_travel_time_matrix()
+            self.assertEqual(actual.stops(), sorted(subject._data_munger.get_unique_stops_to_solve()))
+            self.assertEqual(actual.travel_time('Wonderland', 'Wonderland'), 0)
+            self.assertEqual(actual.travel_time('Wonderland', 'Lynn'), 4 * 60 * 60)
+            self.assertIs(actual, subject._get_travel_time_matrix())
+
+        def test_caches_matrix_on_disk():
+            with tempfile.TemporaryDirectory() as directory:
+                file_name = os.path.join(directory, 'matrix.bin')
+                expected = get_subject(file_name)._get_travel_time_matrix()
+                self.assertTrue(os.path.exists(file_name))
+
+                with patch.object(TravelTimeMatrix, 'build') as build_patch:
+                    actual = get_subject(file_name)._get_travel_time_matrix()
+                    self.assertEqual(build_patch.call_count, 0)
+
+            for origin in expected.stops():
+                for destination in expected.stops():
+                    self.assertEqual(expected.travel_time(origin, destination),
+                                     actual.travel_time(origin, destination))
+
+        test_builds_matrix()
+        test_caches_matrix_on_disk()
+
     def test_get_walking_data(self):
         def test_after_walking_route():
             subject = Solver(**create_mock_analysis(), data=MockData(), progress_between_pruning_progress_dict=None,
@@ -502,9 +750,7 @@ class TestSolver(unittest.TestCase):
                 station: 0 for station in subject._data_munger.get_all_stop_coordinates().keys()
             }
 
-            expected = set()
-            actual = set(subject._get_walking_data(input_location_status, 10000))
-            self.assertSetEqual(expected, actual)
+            self.assertListEqual([], subject._get_walking_data(input_location_status, 10000))
 
         def test_with_insufficient_time_to_travel():
             subject = Solver(**create_mock_analysis(), data=MockData(), progress_between_pruning_progress_dict=None,
@@ -529,7 +775,7 @@ class TestSolver(unittest.TestCase):
                                                                   coordinates.long, wonderland_coordinates.long))
                              for station, coordinates in stop_coordinates.items()}
 
-            expected = {
+            expected = sorted([
                 (
                     LocationStatusInfo(location=station, arrival_route='walk route', unvisited='~~Lynn~~'),
                     ProgressInfo(duration=input_progress.duration + time, children=None, parent=input_location_status,
@@ -539,9 +785,9 @@ class TestSolver(unittest.TestCase):
                 )
                 for station, time in walking_times
                 if station != 'Heath Street'
-            }
-            actual = set(subject._get_walking_data(input_location_status, 1000000))
-            self.assertSetEqual(expected, actual)
+            ], key=lambda node: node[0])
+            actual = sorted(subject._get_walking_data(input_location_status, 1000000), key=lambda node: node[0])
+            self.assertListEqual(expected, actual)
 
         def test_calculates_correct_result():
             subject = Solver(**create_mock_analysis(), data=MockData(), progress_between_pruning_progress_dict=None,
@@ -564,7 +810,7 @@ class TestSolver(unittest.TestCase):
             walking_times = {(station, subject._walk_time_seconds(coordinates.lat, wonderland_coordinates.lat,
                                                                   coordinates.long, wonderland_coordinates.long))
                              for station, coordinates in stop_coordinates.items()}
-            expected = {
+            expected = sorted([
                 (
                     LocationStatusInfo(location=station, arrival_route='walk route', unvisited='~~Lynn~~'),
                     ProgressInfo(duration=input_progress.duration + time, children=None, parent=input_location_status,
@@ -573,15 +819,127 @@ class TestSolver(unittest.TestCase):
                                  eliminated=False)
                 )
                 for station, time in walking_times
+            ], key=lambda node: node[0])
+            actual = sorted(subject._get_walking_data(input_location_status, 1000000), key=lambda node: node[0])
+            self.assertListEqual(expected, actual)
+
+        def test_footpath_graph():
+            subject = Solver(**create_mock_analysis(), data=MockData(), progress_between_pruning_progress_dict=None,
+                             prune_thoroughness=None, stop_join_string='~~', transfer_duration_seconds=None,
+                             transfer_route=DEFAULT_TRANSFER_ROUTE, walk_route='walk route', walk_speed_mph=3,
+                             footpath_radius_seconds=120000)
+            input_location_status = LocationStatusInfo(
+                location='Wonderland', arrival_route=DEFAULT_TRANSFER_ROUTE, unvisited='~~Lynn~~')
+            input_progress_parent = LocationStatusInfo(location='Wonderland', arrival_route=2, unvisited='~~Lynn~~')
+            input_progress = ProgressInfo(
+                duration=20 * 60, children=None, parent=input_progress_parent, arrival_trip=DEFAULT_TRANSFER_ROUTE,
+                trip_stop_no='1', minimum_remaining_time=60 * 60, expanded=False, eliminated=False)
+            subject._progress_dict[input_location_status] = input_progress
+            subject._time_to_nearest_station = {
+                station: 0 for station in subject._data_munger.get_all_stop_coordinates().keys()
             }
-            actual = set(subject._get_walking_data(input_location_status, 1000000))
-            self.assertSetEqual(expected, actual)
+
+            stop_coordinates = subject._data_munger.get_all_stop_coordinates()
+            wonderland_coordinates = stop_coordinates['Wonderland']
+            expected = sorted([
+                (
+                    LocationStatusInfo(location=station, arrival_route='walk route', unvisited='~~Lynn~~'),
+                    ProgressInfo(duration=input_progress.duration + math.ceil(subject._walk_time_seconds(
+                        stop_coordinates[station].lat, wonderland_coordinates.lat,
+                        stop_coordinates[station].long, wonderland_coordinates.long)), children=None,
+                        parent=input_location_status, arrival_trip='walk route', trip_stop_no='walk route',
+                        minimum_remaining_time=input_progress.minimum_remaining_time, expanded=False,
+                        eliminated=False)
+                )
+                for station in ['Alewife', 'Back of the Hill']
+            ], key=lambda node: node[0])
+            actual = sorted(subject._get_walking_data(input_location_status, 1000000), key=lambda node: node[0])
+            self.assertListEqual(expected, actual)
+
+        def test_max_footpaths_per_stop():
+            subject = Solver(**create_mock_analysis(), data=MockData(), progress_between_pruning_progress_dict=None,
+                             prune_thoroughness=None, stop_join_string='~~', transfer_duration_seconds=None,
+                             transfer_route=DEFAULT_TRANSFER_ROUTE, walk_route='walk route', walk_speed_mph=3,
+                             footpath_radius_seconds=120000, max_footpaths_per_stop=1)
+            input_location_status = LocationStatusInfo(
+                location='Wonderland', arrival_route=DEFAULT_TRANSFER_ROUTE, unvisited='~~Lynn~~')
+            input_progress_parent = LocationStatusInfo(location='Wonderland', arrival_route=2, unvisited='~~Lynn~~')
+            subject._progress_dict[input_location_status] = ProgressInfo(
+                duration=20 * 60, children=None, parent=input_progress_parent, arrival_trip=DEFAULT_TRANSFER_ROUTE,
+                trip_stop_no='1', minimum_remaining_time=60 * 60, expanded=False, eliminated=False)
+            subject._time_to_nearest_station = {
+                station: 0 for station in subject._data_munger.get_all_stop_coordinates().keys()
+            }
+
+            # Back of the Hill is the nearest footpath from Wonderland, but it cannot be walked to
+            self.assertEqual('Back of the Hill', subject._get_footpath_graph().footpaths_from('Wonderland')[0][0])
+            del subject._get_walking_coordinates()['Back of the Hill']
+
+            actual = subject._get_walking_data(input_location_status, 1000000)
+            self.assertEqual(['Alewife'], [location.location for location, _ in actual])
+
+        def test_vectorized_walk_times():
+            def walking_data(vectorized_walk_times):
+                subject = Solver(**create_mock_analysis(), data=MockData(),
+                                 progress_between_pruning_progress_dict=None, prune_thoroughness=None,
+                                 stop_join_string='~~', transfer_duration_seconds=None,
+                                 transfer_route=DEFAULT_TRANSFER_ROUTE, walk_route='walk route', walk_speed_mph=3,
+                                 vectorized_walk_times=vectorized_walk_times)
+                input_location_status = LocationStatusInfo(
+                    location='Wonderland', arrival_route=DEFAULT_TRANSFER_ROUTE, unvisited='~~Lynn~~')
+                input_progress_parent = LocationStatusInfo(location='Wonderland', arrival_route=2,
+                                                           unvisited='~~Lynn~~')
+                subject._progress_dict[input_location_status] = ProgressInfo(
+                    duration=20 * 60, children=None, parent=input_progress_parent,
+                    arrival_trip=DEFAULT_TRANSFER_ROUTE, trip_stop_no='1', minimum_remaining_time=60 * 60,
+                    expanded=False, eliminated=False)
+                subject._time_to_nearest_station = {
+                    station: 0 for station in subject._data_munger.get_all_stop_coordinates().keys()
+                }
+                return {location.location: progress.duration
+                        for location, progress in subject._get_walking_data(input_location_status, 1000000)}
+
+            expected = walking_data(False)
+            actual = walking_data(True)
+            self.assertSetEqual(set(expected.keys()), set(actual.keys()))
+            for stop, duration in expected.items():
+                self.assertAlmostEqual(duration, actual[stop], places=6)
+
+        def test_spatial_walking_index():
+            def walking_data(spatial_walking_index):
+                subject = Solver(**create_mock_analysis(), data=MockData(),
+                                 progress_between_pruning_progress_dict=None, prune_thoroughness=None,
+                                 stop_join_string='~~', transfer_duration_seconds=None,
+                                 transfer_route=DEFAULT_TRANSFER_ROUTE, walk_route='walk route', walk_speed_mph=3,
+                                 spatial_walking_index=spatial_walking_index)
+                input_location_status = LocationStatusInfo(
+                    location='Wonderland', arrival_route=DEFAULT_TRANSFER_ROUTE, unvisited='~~Lynn~~')
+                input_progress_parent = LocationStatusInfo(location='Wonderland', arrival_route=2,
+                                                           unvisited='~~Lynn~~')
+                subject._progress_dict[input_location_status] = ProgressInfo(
+                    duration=20 * 60, children=None, parent=input_progress_parent,
+                    arrival_trip=DEFAULT_TRANSFER_ROUTE, trip_stop_no='1', minimum_remaining_time=60 * 60,
+                    expanded=False, eliminated=False)
+                subject._time_to_nearest_station = {
+                    station: 0 for station in subject._data_munger.get_all_stop_coordinates().keys()
+                }
+                # 100 miles of walking at 3 mph
+                return subject._get_walking_data(input_location_status, 120000 + 20 * 60 + 60 * 60)
+
+            expected = sorted(walking_data(False), key=lambda node: node[0])
+            actual = sorted(walking_data(True), key=lambda node: node[0])
+            self.assertListEqual(expected, actual)
+            self.assertSetEqual({'Alewife', 'Back of the Hill'}, {location.location for location, _ in actual})
 
         test_at_start()
         test_after_walking_route()
         test_with_insufficient_time_to_walk()
         test_with_insufficient_time_to_travel()
         test_calculates_correct_result()
+        test_spatial_walking_index()
+        test_vectorized_walk_times()
+        test_footpath_graph()
+        test_max_footpaths_per_stop()
 
     def test_last_improving_ancestor(self):
         def test_close_to_start():
@@ -719,6 +1077,36 @@ class TestSolver(unittest.TestCase):
         test_faster_path_causes_elimination()
         test_slower_path_does_not_cause_elimination()
 
+    def test_mark_nodes_as_eliminated(self):
+        def progress_info(parent=None, children=None, eliminated=False):
+            return ProgressInfo(duration=10, arrival_trip=None, trip_stop_no=None, parent=parent, children=children,
+                                minimum_remaining_time=10, expanded=False, eliminated=eliminated)
+
+        subject = Solver(**create_mock_analysis(), data=MockData(), progress_between_pruning_progress_dict=None,
+                         prune_thoroughness=None, stop_join_string='~~', transfer_duration_seconds=None,
+                         transfer_route=None, walk_route=None, walk_speed_mph=None)
+        # 1 -> {2, 3}, 2 -> {4}, 4 -> {5, 6}
+        subject._progress_dict = {
+            1: progress_info(children={2, 3}),
+            2: progress_info(parent=1, children={4}),
+            3: progress_info(parent=1),
+            4: progress_info(parent=2, children={5, 6}),
+            5: progress_info(parent=4),
+            6: progress_info(parent=4, eliminated=True),
+        }
+
+        subject._mark_nodes_as_eliminated({5})
+        self.assertTrue(subject._progress_dict[5].eliminated)
+        self.assertFalse(subject._progress_dict[4].eliminated)
+        self.assertSetEqual({6}, subject._progress_dict[4].children)
+
+        subject._mark_nodes_as_eliminated({2, 6})
+        self.assertListEqual([False, True, False, True, True, True],
+                             [subject._progress_dict[node].eliminated for node in range(1, 7)])
+        self.assertSetEqual({3}, subject._progress_dict[1].children)
+        self.assertSetEqual(set(), subject._progress_dict[4].children)
+        self.assertIsNone(subject._progress_dict[4].parent)
+
     def test_mark_slow_nodes_as_eliminated(self):
         new_duration = timedelta(minutes=10)
         valid_progress_info = ProgressInfo(duration=timedelta(minutes=8), arrival_trip=None, trip_stop_no=None,
@@ -744,7 +1132,7 @@ class TestSolver(unittest.TestCase):
         input_progress_dict = {
             1: valid_progress_info,
             2: invalid_progress_info,
-            3: invalid_progress_info,
+            3: invalid_progress_info._replace(children={6}),
             4: valid_progress_info_parent,
             5: valid_progress_info_grandparent,
             6: child_progress_info,
@@ -753,7 +1141,7 @@ class TestSolver(unittest.TestCase):
         expected = {
             1: valid_progress_info,
             2: invalid_progress_info._replace(children=set(), eliminated=True, parent=None),
-            3: invalid_progress_info,
+            3: invalid_progress_info._replace(children={6}),
             4: valid_progress_info_parent._replace(eliminated=True, children=set(), parent=None),
             5: valid_progress_info_grandparent._replace(children={3}, parent=None),
             6: child_progress_info._replace(children=set(), eliminated=True, parent=None),
@@ -857,9 +1245,62 @@ class TestSolver(unittest.TestCase):
             self.assertEqual(len(subject._get_walking_coordinates()), len(coordinates) - 1)
             self.assertTrue('Back of the Hill' not in subject._get_walking_coordinates())
 
+        def test_spatial_walking_index():
+            def walking_coordinates(spatial_walking_index):
+                subject = Solver(**create_mock_analysis(route_types_to_solve=[1]), data=MockData(),
+                                 progress_between_pruning_progress_dict=5, prune_thoroughness=.1,
+                                 stop_join_string='~~', transfer_duration_seconds=1, transfer_route='transfer',
+                                 walk_route='walk', walk_speed_mph=100, spatial_walking_index=spatial_walking_index)
+                subject._start_time = DEFAULT_START_TIME
+                subject._reset_time_to_nearest_station()
+                subject._reset_walking_coordinates(known_best_time=9000 + 3 * 3600)
+                return set(subject._get_walking_coordinates().keys())
+
+            expected = walking_coordinates(False)
+            self.assertTrue(0 < len(expected) < len(MockData().stopLocations))
+            self.assertSetEqual(expected, walking_coordinates(True))
+
+        def test_incremental_reset():
+            def get_subject():
+                subject = Solver(**create_mock_analysis(route_types_to_solve=[1]), data=MockData(),
+                                 progress_between_pruning_progress_dict=5, prune_thoroughness=.1,
+                                 stop_join_string='~~', transfer_duration_seconds=1, transfer_route='transfer',
+                                 walk_route='walk', walk_speed_mph=100)
+                subject._start_time = DEFAULT_START_TIME
+                subject._reset_time_to_nearest_station()
+                return subject
+
+            def walking_coordinates_from_scratch(known_best_time):
+                subject = get_subject()
+                subject._reset_walking_coordinates(known_best_time=known_best_time)
+                return set(subject._get_walking_coordinates().keys())
+
+            subject = get_subject()
+            for known_best_time in [None, 9000 + 3 * 3600, 9000 + 3600, 9000 + 3 * 3600, 9000, None]:
+                subject._reset_walking_coordinates(known_best_time=known_best_time)
+                self.assertSetEqual(walking_coordinates_from_scratch(known_best_time),
+                                    set(subject._get_walking_coordinates().keys()))
+
+            subject._reset_time_to_nearest_station()
+            subject._time_to_nearest_station['Back of the Hill'] = 1000000
+            subject._reset_walking_coordinates(known_best_time=None)
+            self.assertTrue('Back of the Hill' not in subject._get_walking_coordinates())
+
+        def test_budgets_built_first():
+            subject = Solver(**create_mock_analysis(route_types_to_solve=[1]), data=MockData(),
+                             progress_between_pruning_progress_dict=5, prune_thoroughness=.1,
+                             stop_join_string='~~', transfer_duration_seconds=1, transfer_route='transfer',
+                             walk_route='walk', walk_speed_mph=100)
+            subject._get_walking_budgets()
+            self.assertSetEqual({stop for stop, _ in subject._get_walking_budgets()},
+                                set(subject._get_walking_coordinates().keys()))
+
         test_no_known_best_time()
         test_known_best_time()
         test_insufficient_travel_time()
+        test_spatial_walking_index()
+        test_incremental_reset()
+        test_budgets_built_first()
 
     def test_walk_time_seconds(self):
         def get_solver_with_speed(*, mph):
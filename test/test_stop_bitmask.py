@@ -0,0 +1,34 @@
+import unittest
+
+from gtfs_traversal.stop_bitmask import StopBitmask
+
+
+class TestStopBitmask(unittest.TestCase):
+    def test_bit(self):
+        subject = StopBitmask(['Wonderland', 'Alewife', 'Lynn'])
+        self.assertEqual(subject.bit('Alewife'), 1)
+        self.assertEqual(subject.bit('Lynn'), 2)
+        self.assertEqual(subject.bit('Wonderland'), 4)
+        self.assertEqual(subject.bit('Bowdoin'), 0)
+
+    def test_count(self):
+        self.assertEqual(StopBitmask.count(0), 0)
+        self.assertEqual(StopBitmask.count(0b1011), 3)
+        self.assertEqual(StopBitmask.count(1 << 200 | 1), 2)
+
+    def test_decode(self):
+        subject = StopBitmask(['Wonderland', 'Alewife', 'Lynn'])
+        self.assertListEqual(subject.decode(0b101), ['Alewife', 'Wonderland'])
+        self.assertListEqual(subject.decode(0), [])
+
+    def test_eliminate(self):
+        subject = StopBitmask(['Wonderland', 'Alewife', 'Lynn'])
+        self.assertEqual(subject.eliminate('Lynn', 0b111), 0b101)
+        self.assertEqual(subject.eliminate('Lynn', 0b101), 0b101)
+        self.assertEqual(subject.eliminate('Bowdoin', 0b101), 0b101)
+
+    def test_encode(self):
+        subject = StopBitmask(['Wonderland', 'Alewife', 'Lynn'])
+        self.assertEqual(subject.encode(['Wonderland', 'Alewife', 'Lynn']), 0b111)
+        self.assertEqual(subject.encode(['Wonderland', 'Bowdoin']), 0b100)
+        self.assertEqual(subject.encode([]), 0)
@@ -0,0 +1,37 @@
+import unittest
+
+from gtfs_traversal.data_structures import EarthLocation
+from gtfs_traversal.stop_grid import StopGrid
+
+
+class TestStopGrid(unittest.TestCase):
+    def test_stops_within(self):
+        stop_locations = {
+            'Alewife': EarthLocation(lat=42.3954, long=-71.1425),
+            'Davis': EarthLocation(lat=42.3967, long=-71.1218),
+            'Porter': EarthLocation(lat=42.3884, long=-71.1191),
+            'Wonderland': EarthLocation(lat=42.4134, long=-70.9916),
+            'Braintree': EarthLocation(lat=42.2079, long=-71.0011),
+        }
+
+        def test_returns_nearby_stops():
+            subject = StopGrid(stop_locations, cell_degrees=0.01)
+            actual = set(subject.stops_within(42.3954, -71.1425, 1.5))
+            self.assertSetEqual({'Alewife', 'Davis', 'Porter'}, actual)
+
+        def test_returns_all_stops_for_large_radius():
+            subject = StopGrid(stop_locations)
+            self.assertSetEqual(set(stop_locations.keys()), set(subject.stops_within(42.3954, -71.1425, 50)))
+
+        def test_returns_no_stops_for_negative_radius():
+            subject = StopGrid(stop_locations)
+            self.assertListEqual([], subject.stops_within(42.3954, -71.1425, -1))
+
+        def test_covers_antimeridian():
+            subject = StopGrid({'east': EarthLocation(lat=0, long=179.99), 'west': EarthLocation(lat=0, long=-179.99)})
+            self.assertSetEqual({'east', 'west'}, set(subject.stops_within(0, 179.99, 5)))
+
+        test_returns_nearby_stops()
+        test_returns_all_stops_for_large_radius()
+        test_returns_no_stops_for_negative_radius()
+        test_covers_antimeridian()
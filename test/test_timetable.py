@@ -0,0 +1,58 @@
+import unittest
+from array import array
+
+from gtfs_traversal.timetable import Timetable
+
+
+class TestTimetable(unittest.TestCase):
+    def test_departure_seconds(self):
+        subject = Timetable(create_mock_trip_schedules())
+        self.assertEqual(subject.departure_seconds('3-6AM', '1'), 6 * 60 * 60)
+        self.assertEqual(subject.departure_seconds('3-6AM', 3), 10 * 60 * 60)
+        self.assertEqual(subject.departure_seconds('late', '3'), 26 * 60 * 60 + 30)
+
+    def test_seconds_since_midnight(self):
+        def test_handles_before_noon():
+            self.assertEqual(Timetable.seconds_since_midnight('01:32:07'), 5527)
+
+        def test_handles_after_midnight():
+            self.assertEqual(Timetable.seconds_since_midnight('25:32:07'), 91927)
+
+        def test_rounds_to_integer_seconds():
+            self.assertEqual(Timetable.seconds_since_midnight(f'{8 + 2 / 3.0}:00:00'), 31200)
+
+        test_handles_before_noon()
+        test_handles_after_midnight()
+        test_rounds_to_integer_seconds()
+
+    def test_travel_time_seconds(self):
+        subject = Timetable(create_mock_trip_schedules())
+        self.assertEqual(subject.travel_time_seconds('3-6AM', '1', '3'), 4 * 60 * 60)
+        self.assertEqual(subject.travel_time_seconds('3-6AM', '2', '2'), 0)
+        self.assertEqual(subject.travel_time_seconds('late', '1', '3'), 4 * 60 * 60 + 30)
+
+    def test_trip_departure_seconds(self):
+        subject = Timetable(create_mock_trip_schedules())
+        expected = array('i', [22 * 60 * 60, 25 * 60 * 60, 26 * 60 * 60 + 30])
+        self.assertEqual(subject.trip_departure_seconds('late'), expected)
+        self.assertEqual(len(subject), 2)
+
+
+def create_mock_trip_schedules():
+    return {
+        '3-6AM': MockTripInfo(['6:00:00', '9:00:00', '10:00:00']),
+        'late': MockTripInfo(['22:00:00', '25:00:00', '26:00:30']),
+    }
+
+
+class MockTripInfo:
+    def __init__(self, departure_times):
+        self.tripStops = {
+            str(stop_number): MockStopDeparture(departure_time)
+            for stop_number, departure_time in enumerate(departure_times, 1)
+        }
+
+
+class MockStopDeparture:
+    def __init__(self, departure_time):
+        self.departureTime = departure_time
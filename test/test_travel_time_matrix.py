@@ -0,0 +1,77 @@
+import math
+import os
+import tempfile
+import unittest
+
+from gtfs_traversal.travel_time_matrix import TravelTimeMatrix
+
+
+class TestTravelTimeMatrix(unittest.TestCase):
+    def test_build(self):
+        def test_rides_and_transfers():
+            subject = create_subject()
+            self.assertEqual(subject.travel_time('A', 'A'), 0)
+            self.assertEqual(subject.travel_time('A', 'B'), 100)
+            self.assertEqual(subject.travel_time('A', 'C'), 300)
+            self.assertEqual(subject.travel_time('A', 'D'), 100 + 60 + 50)
+            self.assertEqual(subject.travel_time('B', 'A'), math.inf)
+
+        def test_uses_fastest_option():
+            subject = TravelTimeMatrix.build(['A', 'C'], create_route_legs(), {'A': [('C', 250.5)]},
+                                             transfer_seconds=60)
+            self.assertEqual(subject.travel_time('A', 'C'), 250)
+
+        def test_transfers_after_walking():
+            subject = TravelTimeMatrix.build(['A', 'E'], create_route_legs(), {'A': [('D', 10)]},
+                                             transfer_seconds=60)
+            self.assertEqual(subject.travel_time('A', 'E'), 10 + 60 + 70)
+
+        test_rides_and_transfers()
+        test_uses_fastest_option()
+        test_transfers_after_walking()
+
+    def test_cache_key(self):
+        expected = TravelTimeMatrix.cache_key(['A', 'B'], create_route_legs(), {}, 60)
+        self.assertEqual(expected, TravelTimeMatrix.cache_key(['B', 'A'], create_route_legs(), {}, 60))
+        self.assertNotEqual(expected, TravelTimeMatrix.cache_key(['A', 'B'], create_route_legs(), {}, 61))
+        self.assertNotEqual(expected, TravelTimeMatrix.cache_key(['A', 'B'], create_route_legs(),
+                                                                 {'A': [('B', 1)]}, 60))
+
+    def test_save_and_load(self):
+        def test_round_trip():
+            subject = create_subject()
+            with tempfile.TemporaryDirectory() as directory:
+                file_name = os.path.join(directory, 'matrix.bin')
+                subject.save(file_name, 'key')
+                actual = TravelTimeMatrix.load(file_name, 'key')
+
+            self.assertEqual(actual.stops(), subject.stops())
+            for origin in subject.stops():
+                for destination in subject.stops():
+                    self.assertEqual(actual.travel_time(origin, destination),
+                                     subject.travel_time(origin, destination))
+
+        def test_rejects_other_key():
+            with tempfile.TemporaryDirectory() as directory:
+                file_name = os.path.join(directory, 'matrix.bin')
+                create_subject().save(file_name, 'key')
+                self.assertIsNone(TravelTimeMatrix.load(file_name, 'other key'))
+
+        def test_missing_file():
+            with tempfile.TemporaryDirectory() as directory:
+                self.assertIsNone(TravelTimeMatrix.load(os.path.join(directory, 'matrix.bin'), 'key'))
+
+        test_round_trip()
+        test_rejects_other_key()
+        test_missing_file()
+
+
+def create_route_legs():
+    return {
+        'red': {('A', 'B'): 100, ('B', 'C'): 200},
+        'blue': {('B', 'D'): 50, ('D', 'E'): 70},
+    }
+
+
+def create_subject():
+    return TravelTimeMatrix.build(['A', 'B', 'C', 'D'], create_route_legs(), {}, transfer_seconds=60)
@@ -11,6 +11,35 @@ DEFAULT_START_TIME = datetime.strptime(DEFAULT_START_DATE, '%Y-%m-%d')
 
 
 class TestSolver(unittest.TestCase):
+    def test_find_time_to_nearest_station(self):
+        subject = Traverser(**create_mock_analysis(route_types_to_solve=[1]), data=MockData(),
+                            progress_between_pruning_progress_dict=None, prune_thoroughness=None,
+                            stop_join_string='~~', transfer_duration_seconds=60, transfer_route='transfer',
+                            walk_route='walk', walk_speed_mph=1)
+
+        expected = {
+            'Alewife': 3 * 60 * 60,
+            'Wonderland': 0,
+            'Back of the Hill': 1000000,
+            'Heath Street': 1000000,
+            'Lechmere': 1000000,
+            'Bowdoin': 0,
+            'Lynn': 0,
+        }
+        with patch('gtfs_traversal.solver.Solver._walk_time_seconds', return_value=1000000):
+            subject._reset_time_to_nearest_station()
+        self.assertDictEqual(expected, subject._get_time_to_nearest_station())
+
+    def test_get_nearest_station_finder(self):
+        subject = Traverser(**create_mock_analysis(route_types_to_solve=[1]), data=MockData(),
+                            progress_between_pruning_progress_dict=None, prune_thoroughness=None,
+                            stop_join_string='~~', transfer_duration_seconds=60, transfer_route='transfer',
+                            walk_route='walk', walk_speed_mph=1)
+
+        finder = subject._get_nearest_station_finder()
+        self.assertIs(finder._data_munger.get_timetable(), subject._data_munger.get_timetable())
+        self.assertIs(finder._data_munger.get_route_network(), subject._data_munger.get_route_network())
+
     def test_initialize_progress_dict(self):
         def test_start_of_route():
             subject = Traverser(**create_mock_analysis(), data=MockData(), progress_between_pruning_progress_dict=None,
@@ -107,9 +136,48 @@ class TestSolver(unittest.TestCase):
             self.assertDictEqual(actual_dict, expected_dict)
             self.assertEqual(expected_start_time, actual_start_time)
 
+        def test_new_node_table_per_search():
+            subject = Traverser(**create_mock_analysis(), data=MockData(), progress_between_pruning_progress_dict=None,
+                                prune_thoroughness=None, stop_join_string='~~', transfer_duration_seconds=None,
+                                transfer_route=None, walk_route=None, walk_speed_mph=None, intern_node_ids=True)
+            subject.initialize_progress_dict(DEFAULT_START_TIME)
+            subject._node_key(LocationStatusInfo(location='Alewife', arrival_route=1, unvisited='~~'))
+            num_nodes = len(subject._node_table)
+
+            subject.initialize_progress_dict(DEFAULT_START_TIME)
+            self.assertEqual(num_nodes - 1, len(subject._node_table))
+            self.assertTrue(all(0 <= node_id < len(subject._node_table) for node_id in subject._progress_dict))
+
         test_start_of_route()
         test_middle_of_route()
         test_no_valid_departures()
+        test_new_node_table_per_search()
+
+    def test_print_path(self):
+        subject = Traverser(**create_mock_analysis(), data=MockData(), progress_between_pruning_progress_dict=None,
+                            prune_thoroughness=None, stop_join_string='~~', transfer_duration_seconds=None,
+                            transfer_route=None, walk_route=None, walk_speed_mph=None, intern_node_ids=True)
+        location_1 = subject._node_key(LocationStatusInfo(location='Alewife', arrival_route=1, unvisited='~~a~~'))
+        location_2 = subject._node_key(LocationStatusInfo(location='Wonderland', arrival_route=1, unvisited='~~'))
+        subject._progress_dict = {
+            location_1: ProgressInfo(duration=0, arrival_trip=None, trip_stop_no=None, parent=None,
+                                     children={location_2}, minimum_remaining_time=0, expanded=True,
+                                     eliminated=False),
+            location_2: ProgressInfo(duration=1, arrival_trip=None, trip_stop_no=None, parent=location_1,
+                                     children=None, minimum_remaining_time=0, expanded=False, eliminated=False),
+        }
+        with patch('builtins.print') as mock_print:
+            subject.print_path(subject._progress_dict)
+        self.assertListEqual([('solution:',), ((1, 'Alewife'),), ((1, 'Wonderland'),)],
+                             [print_call[0] for print_call in mock_print.call_args_list])
+
+        # Paths found before the next search still print after it
+        solution_paths = subject.solution_paths(subject._progress_dict)
+        subject.initialize_progress_dict(DEFAULT_START_TIME)
+        with patch('builtins.print') as mock_print:
+            subject.print_solution_paths(solution_paths)
+        self.assertListEqual([('solution:',), ((1, 'Alewife'),), ((1, 'Wonderland'),)],
+                             [print_call[0] for print_call in mock_print.call_args_list])
 
     def test_prune_progress_dict(self):
         subject = Traverser(data=None, progress_between_pruning_progress_dict=None,
@@ -0,0 +1,68 @@
+import unittest
+
+from gtfs_traversal.data_structures import EarthLocation
+from gtfs_traversal.solver import Solver
+from gtfs_traversal.walk_time_engine import WalkTimeEngine, numpy
+
+
+class TestWalkTimeEngine(unittest.TestCase):
+    def test_walk_times_from(self):
+        def test_matches_solver(use_numpy):
+            subject = WalkTimeEngine(create_mock_stop_locations(), walk_speed_mph=3, use_numpy=use_numpy)
+            origin = EarthLocation(lat=42.2402, long=-70.89)
+            stops = ['Quincy Center', 'Braintree', 'Alewife']
+
+            actual = subject.walk_times_from(origin, stops)
+            expected = [expected_walk_time(origin, create_mock_stop_locations()[stop]) for stop in stops]
+            self.assertEqual(len(expected), len(actual))
+            for expected_time, actual_time in zip(expected, actual):
+                self.assertAlmostEqual(expected_time, actual_time, places=6)
+
+        def test_no_stops(use_numpy):
+            subject = WalkTimeEngine(create_mock_stop_locations(), walk_speed_mph=3, use_numpy=use_numpy)
+            self.assertListEqual([], subject.walk_times_from(EarthLocation(lat=42.2402, long=-70.89), []))
+
+        test_matches_solver(use_numpy=False)
+        test_no_stops(use_numpy=False)
+        if numpy is not None:
+            test_matches_solver(use_numpy=True)
+            test_no_stops(use_numpy=True)
+
+    def test_walk_time_matrix(self):
+        def test_matches_walk_times_from(use_numpy):
+            subject = WalkTimeEngine(create_mock_stop_locations(), walk_speed_mph=3, use_numpy=use_numpy)
+            origins = ['Alewife', 'Braintree']
+            destinations = ['Quincy Center', 'Braintree', 'Alewife']
+
+            actual = subject.walk_time_matrix(origins, destinations)
+            self.assertEqual(len(origins), len(actual))
+            for origin, row in zip(origins, actual):
+                expected = subject.walk_times_from(create_mock_stop_locations()[origin], destinations)
+                for expected_time, actual_time in zip(expected, row):
+                    self.assertAlmostEqual(expected_time, actual_time, places=6)
+            self.assertEqual(0, actual[0][2])
+
+        test_matches_walk_times_from(use_numpy=False)
+        if numpy is not None:
+            test_matches_walk_times_from(use_numpy=True)
+
+    @unittest.skipIf(numpy is not None, "NumPy is installed")
+    def test_requires_numpy_to_vectorize(self):
+        with self.assertRaises(ImportError):
+            WalkTimeEngine(create_mock_stop_locations(), walk_speed_mph=3, use_numpy=True)
+
+
+def create_mock_stop_locations():
+    return {
+        'Alewife': EarthLocation(lat=42.3954, long=-71.1425),
+        'Braintree': EarthLocation(lat=42.2079, long=-71.0011),
+        'Quincy Center': EarthLocation(lat=42.2449, long=-70.8715),
+    }
+
+
+def expected_walk_time(origin, destination):
+    solver = Solver(walk_speed_mph=3, data=None, progress_between_pruning_progress_dict=None,
+                    prune_thoroughness=None, stop_join_string=None, transfer_duration_seconds=None,
+                    transfer_route=None, walk_route=None, end_date=None, route_types_to_solve=None,
+                    stops_to_solve=None)
+    return solver._walk_time_seconds(origin.lat, destination.lat, origin.long, destination.long)